@@ -0,0 +1,130 @@
+# benchmarks/bench_openai_provider.py
+"""
+Compare per-call latency of a fresh OpenAI client per request (the old
+behaviour) against the pooled ``OpenAIProvider`` client.
+
+Runs against a local fake chat-completions server, so no API key or network
+access is needed:
+
+    python benchmarks/bench_openai_provider.py --calls 200 --connect-delay-ms 20
+
+``--connect-delay-ms`` makes the server stall on every new connection to
+approximate the TCP/TLS handshake cost of a real endpoint.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import openai  # noqa: E402
+
+from agentx.providers.openai_provider import OpenAIProvider  # noqa: E402
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-3.5-turbo",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+def make_handler(connect_delay: float):
+    body = json.dumps(COMPLETION).encode()
+
+    class FakeChatHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if connect_delay:
+                time.sleep(connect_delay)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeChatHandler
+
+
+def time_calls(call, calls: int):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<22} mean={statistics.mean(latencies):7.2f}ms "
+        f"p50={statistics.median(latencies):7.2f}ms p95={p95:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--connect-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), make_handler(args.connect_delay_ms / 1000)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    messages = [{"role": "user", "content": "ping"}]
+
+    def fresh_client_call():
+        client = openai.OpenAI(base_url=base_url)
+        client.chat.completions.create(
+            model="gpt-3.5-turbo", messages=messages, temperature=0.3
+        )
+        client.close()
+
+    try:
+        with OpenAIProvider(base_url=base_url) as provider:
+
+            def pooled_call():
+                provider.generate_response(messages, "gpt-3.5-turbo", 0.3)
+
+            # Warm up both paths so imports and the first connection are excluded
+            fresh_client_call()
+            pooled_call()
+
+            report("client per call", time_calls(fresh_client_call, args.calls))
+            report("pooled provider", time_calls(pooled_call, args.calls))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+# benchmarks/bench_pipeline.py
+"""
+Orchestration benchmarks for the consultancy pipeline, run against the
+deterministic ``FakeProvider`` so no API key or network access is needed.
+
+    python benchmarks/bench_pipeline.py --sessions 10,100,1000 --save
+
+Scenarios: broadcast routing, topic analysis, history growth, report
+collation, and end-to-end runs of ``main.py`` consultations and
+``AIConsultancy`` requests at each session count. With ``--latency 0`` (the
+default) the numbers are pure orchestration overhead.
+
+Each run can be appended to a history file (``--save``) and is compared
+against the last saved run with the same settings; metrics that got worse
+by more than ``--tolerance`` are flagged, and ``--fail-on-regression`` turns
+them into a non-zero exit status for CI.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+# main.py uses script-style imports, so its directory goes on the path too
+sys.path.insert(0, str(ROOT / "src" / "agentx"))
+sys.path.insert(0, str(ROOT / "src"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import main as consultation  # noqa: E402
+from providers.cached_provider import CachingProvider  # noqa: E402
+from providers.fake_provider import LATENCY_DISTRIBUTIONS, FakeProvider  # noqa: E402
+
+DEFAULT_HISTORY = ROOT / ".benchmarks" / "history.jsonl"
+
+Metrics = Dict[str, float]
+
+
+def median_us(call: Callable[[], object], repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def responses(provider: FakeProvider, count: int) -> List[str]:
+    return [
+        provider.generate_response([{"role": "user", "content": f"brief {i}"}], "gpt-4", 0.7)
+        for i in range(count)
+    ]
+
+
+def build_manager(provider, **options):
+    agents = consultation.build_agents(provider)
+    return agents, consultation.CommunicationManager(agents=agents, ai_provider=provider, **options)
+
+
+def bench_routing(provider: FakeProvider, args) -> Metrics:
+    agents, manager = build_manager(provider, topic_router=consultation.build_topic_router())
+    texts = responses(provider, 200)
+    sender = agents[0]
+
+    def broadcast_all():
+        for text in texts:
+            manager.broadcast_message(sender, text)
+        # Keep agent prompts from growing across repeats
+        for agent in agents:
+            del agent.messages[1:]
+
+    return {"broadcast_us": median_us(broadcast_all, args.repeats) / len(texts)}
+
+
+def bench_topic_analysis(provider: FakeProvider, args) -> Metrics:
+    _, keyword_only = build_manager(provider)
+    _, with_router = build_manager(provider, topic_router=consultation.build_topic_router())
+    texts = responses(provider, 200)
+    metrics = {
+        "keywords_us": median_us(
+            lambda: [keyword_only._match_keywords(text) for text in texts], args.repeats
+        ) / len(texts),
+    }
+    if with_router.topic_router is not None:
+        # Text without keyword hits goes to the vector router
+        plain = [" ".join(text.split()[:3]) + " general update" for text in texts]
+        metrics["router_us"] = median_us(
+            lambda: [with_router._route_locally(text) for text in plain], args.repeats
+        ) / len(texts)
+    return metrics
+
+
+def bench_history_growth(provider: FakeProvider, args) -> Metrics:
+    agents, manager = build_manager(provider, history_window=consultation.HISTORY_WINDOW)
+    texts = responses(provider, 50)
+    sender, recipient = agents[0], agents[1]
+    count = args.history_messages
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        manager.broadcast_message(sender, texts[i % len(texts)])
+        timings.append(time.perf_counter() - start)
+    tenth = max(1, count // 10)
+    return {
+        "first_broadcast_us": statistics.median(timings[:tenth]) * 1e6,
+        "last_broadcast_us": statistics.median(timings[-tenth:]) * 1e6,
+        "history_query_us": median_us(manager.get_message_history, args.repeats),
+        "interactions_query_us": median_us(
+            lambda: manager.get_agent_interactions(recipient.name), args.repeats
+        ),
+        "agent_messages": float(max(len(agent.messages) for agent in agents)),
+    }
+
+
+def bench_report_collation(provider: FakeProvider, args) -> Metrics:
+    agents, manager = build_manager(provider)
+    for agent, text in zip(agents, responses(provider, len(agents))):
+        agent.latest_response = text
+    return {"collate_us": median_us(manager.review_and_collate_responses, args.repeats)}
+
+
+def bench_end_to_end(provider: FakeProvider, sessions: int) -> Metrics:
+    """``sessions`` consultations at once on one event loop, sharing one batcher."""
+    classifier = CachingProvider(provider)
+    batcher = consultation.ClassificationBatcher(classifier)
+    router = consultation.build_topic_router()
+    latencies: List[float] = []
+
+    async def one(number: int):
+        start = time.perf_counter()
+        await consultation.run_consultation_async(
+            provider, f"Client {number}: improve data security and scalability.", classifier,
+            classification_batcher=batcher, topic_router=router,
+        )
+        latencies.append(time.perf_counter() - start)
+
+    async def run_all():
+        await asyncio.gather(*(one(number) for number in range(sessions)))
+
+    calls = provider.stats["calls"]
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    wall = time.perf_counter() - start
+    return session_metrics(wall, latencies, provider.stats["calls"] - calls)
+
+
+class FakeOpenAIClient:
+    """Just enough of ``openai.OpenAI`` for ``ai_consultancy_agents.AIAgent``."""
+
+    def __init__(self, provider: FakeProvider):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self._provider = provider
+
+    def _create(self, model, messages, temperature, **kwargs):
+        content = self._provider.generate_response(messages, model, temperature)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def bench_consultancy(provider: FakeProvider, sessions: int, workers: int) -> Metrics:
+    """``AIConsultancy`` requests on a thread pool, one fresh roster per session."""
+    import ai_consultancy_agents
+
+    client = FakeOpenAIClient(provider)
+    latencies: List[float] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ai_consultancy_agents.ConversationStore(Path(tmp) / "conversations.jsonl")
+
+        def one(number: int):
+            start = time.perf_counter()
+            with ai_consultancy_agents.AIConsultancy(
+                str(ROOT / "config.yaml"),
+                conversation_store=store,
+                session_id=f"bench-{number}",
+                client=client,
+            ) as consultancy:
+                consultancy.process_client_request(f"Client {number}: scale our platform.")
+            latencies.append(time.perf_counter() - start)
+
+        calls = provider.stats["calls"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(sessions, workers)) as executor:
+            list(executor.map(one, range(sessions)))
+        wall = time.perf_counter() - start
+        store.close()
+    return session_metrics(wall, latencies, provider.stats["calls"] - calls)
+
+
+def session_metrics(wall: float, latencies: List[float], calls: int) -> Metrics:
+    return {
+        "wall_s": wall,
+        "sessions_per_s": len(latencies) / wall,
+        "session_p50_ms": percentile(latencies, 50) * 1000,
+        "session_p95_ms": percentile(latencies, 95) * 1000,
+        "provider_calls": float(calls),
+    }
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_s")
+
+
+def compare(results: Dict[str, Metrics], baseline: Optional[dict], tolerance: float) -> List[str]:
+    """Print every metric next to the baseline; return the regressed ones."""
+    previous = baseline["results"] if baseline else {}
+    if baseline:
+        print(f"Compared with {baseline['commit'] or 'unknown commit'} ({baseline['timestamp']})")
+    regressions = []
+    for scenario, metrics in results.items():
+        print(f"\n{scenario}")
+        for metric, value in metrics.items():
+            line = f"  {metric:<24} {value:12.2f}"
+            old = previous.get(scenario, {}).get(metric)
+            if old and metric != "provider_calls":
+                change = (value - old) / old
+                worse = -change if higher_is_better(metric) else change
+                line += f"  {change:+7.1%} vs {old:.2f}"
+                if worse > tolerance:
+                    line += "  REGRESSION"
+                    regressions.append(f"{scenario}.{metric}")
+            print(line)
+    return regressions
+
+
+def load_baseline(path: Path, settings: dict) -> Optional[dict]:
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    matching = [run for run in runs if run["settings"] == settings]
+    return matching[-1] if matching else None
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", default="10,100,1000",
+                        help="comma-separated concurrent session counts for end-to-end runs")
+    parser.add_argument("--workers", type=int, default=32,
+                        help="thread pool size for AIConsultancy sessions")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean fake call latency (s)")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="constant")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--history-messages", type=int, default=5000)
+    parser.add_argument("--only", help="comma-separated scenario name prefixes to run")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--save", action="store_true", help="append this run to the history")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative slowdown flagged as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    settings = {
+        "sessions": args.sessions,
+        "latency": args.latency,
+        "distribution": args.distribution,
+        "failure_rate": args.failure_rate,
+        "history_messages": args.history_messages,
+    }
+
+    def fake() -> FakeProvider:
+        return FakeProvider(
+            latency=args.latency, distribution=args.distribution, failure_rate=args.failure_rate
+        )
+
+    scenarios: Dict[str, Callable[[], Metrics]] = {
+        "routing": lambda: bench_routing(fake(), args),
+        "topic_analysis": lambda: bench_topic_analysis(fake(), args),
+        "history_growth": lambda: bench_history_growth(fake(), args),
+        "report_collation": lambda: bench_report_collation(fake(), args),
+    }
+    for sessions in (int(n) for n in args.sessions.split(",")):
+        scenarios[f"end_to_end_{sessions}"] = lambda n=sessions: bench_end_to_end(fake(), n)
+        scenarios[f"consultancy_{sessions}"] = (
+            lambda n=sessions: bench_consultancy(fake(), n, args.workers)
+        )
+    if args.only:
+        prefixes = args.only.split(",")
+        scenarios = {
+            name: run for name, run in scenarios.items()
+            if any(name.startswith(prefix) for prefix in prefixes)
+        }
+
+    results = {}
+    for name, run in scenarios.items():
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = run()
+
+    regressions = compare(results, load_baseline(args.history, settings), args.tolerance)
+    if args.save:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "commit": current_commit(),
+                "python": platform.python_version(),
+                "settings": settings,
+                "results": results,
+            }) + "\n")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
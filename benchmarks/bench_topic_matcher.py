@@ -0,0 +1,89 @@
+# benchmarks/bench_topic_matcher.py
+"""
+Micro-benchmark of topic keyword analysis on multi-KB agent responses:
+the old per-keyword substring scan against the compiled single-pass matcher.
+
+    python benchmarks/bench_topic_matcher.py --size-kb 8 --iterations 2000
+
+``--extra-keywords N`` pads every category with N synthetic keywords to show
+how both approaches scale with a larger YAML-configured table.
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from agentx.communication_manager import (  # noqa: E402
+    DEFAULT_TOPIC_KEYWORDS,
+    KeywordTopicMatcher,
+)
+
+FILLER = (
+    "the team reviewed the proposal and agreed to revisit the open questions "
+    "with the client before the next workshop while documenting assumptions "
+).split()
+
+
+def make_response(size_kb: int, seed: int, keyword_rate: float) -> str:
+    rng = random.Random(seed)
+    keywords = [k for ks in DEFAULT_TOPIC_KEYWORDS.values() for k in ks]
+    words = []
+    length = 0
+    while length < size_kb * 1024:
+        word = rng.choice(keywords) if rng.random() < keyword_rate else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def with_extra_keywords(count: int):
+    rng = random.Random(0)
+    return {
+        category: keywords + [
+            "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12)))
+            for _ in range(count)
+        ]
+        for category, keywords in DEFAULT_TOPIC_KEYWORDS.items()
+    }
+
+
+def naive_match(keywords, content: str):
+    # The pre-compilation implementation: one substring scan per keyword
+    topics = set()
+    content_lower = content.lower()
+    for category, category_keywords in keywords.items():
+        if any(keyword in content_lower for keyword in category_keywords):
+            topics.add(category)
+    return topics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size-kb", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--extra-keywords", type=int, default=0)
+    args = parser.parse_args()
+
+    keywords = with_extra_keywords(args.extra_keywords)
+    matcher = KeywordTopicMatcher(keywords)
+    print(f"{sum(len(k) for k in keywords.values())} keywords")
+    cases = {
+        "keyword-dense": make_response(args.size_kb, 1, keyword_rate=0.05),
+        "keyword-sparse": make_response(args.size_kb, 2, keyword_rate=0.0005),
+        "no keywords": make_response(args.size_kb, 3, keyword_rate=0.0),
+    }
+    for label, text in cases.items():
+        naive = timeit.timeit(lambda: naive_match(keywords, text), number=args.iterations)
+        compiled = timeit.timeit(lambda: matcher.match(text), number=args.iterations)
+        print(
+            f"{label:<15} {len(text) / 1024:5.1f}KB  naive={naive / args.iterations * 1e6:8.1f}us"
+            f"  compiled={compiled / args.iterations * 1e6:8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
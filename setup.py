@@ -11,6 +11,12 @@ setup(
         "python-dotenv>=0.19.0",
     ],
     extras_require={
+        "tokenizer": [
+            "tiktoken>=0.5.0",
+        ],
+        "vectors": [
+            "numpy>=1.20.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
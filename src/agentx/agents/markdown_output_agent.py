@@ -23,7 +23,11 @@ class MarkdownOutputAgent(AIAgent):
         formatted_content = f"# Final Report\n\n{content}"
         return formatted_content
 
-    def get_response(self, aggregated_content: str) -> str:
-        # Override to directly format the aggregated content
-        self.latest_response = self.format_to_markdown(aggregated_content)
-        return self.latest_response
\ No newline at end of file
+    def get_response(self, user_input: str = "") -> str:
+        # Override to directly format the aggregated content passed as input
+        self.latest_response = self.format_to_markdown(user_input)
+        return self.latest_response
+
+    async def get_response_async(self, user_input: str = "") -> str:
+        # Formatting is local, so there is nothing to await
+        return self.get_response(user_input)
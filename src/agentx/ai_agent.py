@@ -1,7 +1,18 @@
 # ai_agent.py
 
-from typing import List, Dict
+import contextvars
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Generator, Iterator, List, Dict, Optional
 from agentx.ai_model_provider import AIModelProvider
+from agentx.context_window import (
+    CompactionPlan,
+    HistoryCompactor,
+    TokenCounter,
+    TrimPolicy,
+    trim_history,
+)
+from agentx.metrics import call_labels
+from agentx.tracing import span
 import logging
 
 
@@ -14,16 +25,30 @@ class AIAgent:
         model: str,
         ai_provider: AIModelProvider,
         temperature: float = 0.7,
-    ):
+        max_context_tokens: Optional[int] = None,
+        trim_policy: Optional[TrimPolicy] = None,
+        compactor: Optional[HistoryCompactor] = None,
+    ) -> None:
         self.name = name
         self.role_description = role_description
         self.responsibilities = responsibilities
         self.model = model
         self.temperature = temperature
-        self.messages: List[Dict[str, str]] = []
+        self.messages: List[Dict[str, Any]] = []
         self.ai_provider = ai_provider
         self.latest_response: str = ""
 
+        # Optional token budget for the history sent on each call. Token
+        # counts are kept per message with a running total, so each call only
+        # tokenizes the messages added since the previous one.
+        self.max_context_tokens = max_context_tokens
+        self.trim_policy = trim_policy
+        # Optional rolling summarization of older broadcasts (runs before trimming)
+        self.compactor = compactor
+        self.token_counter = TokenCounter(model)
+        self._token_counts: List[int] = []
+        self.context_tokens = 0
+
     def generate_system_message(self) -> Dict[str, str]:
         # Construct the system prompt
         system_content = f"You are {self.name}, {self.role_description}\n"
@@ -33,31 +58,202 @@ class AIAgent:
         return {"role": "system", "content": system_content}
 
     def get_response(self, user_input: str = "") -> str:
-        # Prepare messages
-        if not self.messages:
+        self._start_turn(user_input)
+        with self._turn():
+            self._compact()
+            assistant_message = self.ai_provider.generate_response(
+                messages=self._prepare_messages(),
+                model=self.model,
+                temperature=self.temperature,
+            )
+        return self._record_response(assistant_message)
+
+    async def get_response_async(self, user_input: str = "") -> str:
+        """Awaitable variant of ``get_response`` for use on an event loop."""
+        self._start_turn(user_input)
+        with self._turn():
+            await self._compact_async()
+            assistant_message = await self.ai_provider.generate_response_async(
+                messages=self._prepare_messages(),
+                model=self.model,
+                temperature=self.temperature,
+            )
+        return self._record_response(assistant_message)
+
+    def stream_response(self, user_input: str = "") -> Iterator[str]:
+        """
+        Like ``get_response``, but yields the reply as text deltas while the
+        model generates it. The full reply is recorded in the history once
+        the stream is exhausted.
+        """
+        self._start_turn(user_input)
+        # Every step runs in the turn's own context, so the agent's labels and
+        # span cover the whole stream without leaking into the consumer's
+        # code between deltas
+        context = contextvars.copy_context()
+        stream = self._stream_turn()
+        try:
+            while True:
+                try:
+                    delta = context.run(next, stream)
+                except StopIteration:
+                    return
+                yield delta
+        finally:
+            context.run(stream.close)
+
+    def _stream_turn(self) -> Generator[str, None, None]:
+        deltas = []
+        with self._turn():
+            self._compact()
+            for delta in self.ai_provider.stream_response(
+                messages=self._prepare_messages(),
+                model=self.model,
+                temperature=self.temperature,
+            ):
+                deltas.append(delta)
+                yield delta
+        self._record_response("".join(deltas).strip())
+
+    async def stream_response_async(self, user_input: str = "") -> AsyncIterator[str]:
+        """Async generator variant of ``stream_response``."""
+        self._start_turn(user_input)
+        deltas = []
+        # The consuming task's context holds the labels and span until the
+        # stream is exhausted or closed
+        with self._turn():
+            await self._compact_async()
+            async for delta in self.ai_provider.stream_response_async(
+                messages=self._prepare_messages(),
+                model=self.model,
+                temperature=self.temperature,
+            ):
+                deltas.append(delta)
+                yield delta
+        self._record_response("".join(deltas).strip())
+
+    @contextmanager
+    def _turn(self) -> Iterator[None]:
+        # Provider calls made for this turn (including compaction) are
+        # attributed to this agent in call metrics and traces
+        with call_labels(agent=self.name):
+            with span(f"agent {self.name}", "agent", model=self.model):
+                yield
+
+    def _start_turn(self, user_input: str) -> None:
+        # Broadcasts may arrive before the agent's first turn, so check the
+        # head of the history rather than whether it is empty
+        if not self.messages or self.messages[0]["role"] != "system":
             system_message = self.generate_system_message()
-            self.messages.append(system_message)
-            logging.debug(f"{self.name} system message: {system_message['content']}")
+            self.messages.insert(0, system_message)
+            if self._token_counts:
+                count = self.token_counter.count_message(system_message)
+                self._token_counts.insert(0, count)
+                self.context_tokens += count
+            logging.debug("%s system message: %s", self.name, system_message['content'])
 
         if user_input:
             user_message = {"role": "user", "content": user_input}
             self.messages.append(user_message)
-            logging.debug(f"User input to {self.name}: {user_input}")
+            logging.debug("User input to %s: %s", self.name, user_input)
 
-        assistant_message = self.ai_provider.generate_response(
-            messages=self.messages,
-            model=self.model,
-            temperature=self.temperature,
-        )
+    def _prepare_messages(self) -> List[Dict[str, str]]:
+        if self.max_context_tokens is not None:
+            self._enforce_token_budget(self.max_context_tokens)
+
+        # Snapshot of the chat fields only, so broadcasts delivered while the
+        # call is in flight (and routing metadata) stay out of this request
+        return [{"role": m["role"], "content": m["content"]} for m in self.messages]
 
+    def _record_response(self, assistant_message: str) -> str:
         # Append assistant's response
         self.messages.append({"role": "assistant", "content": assistant_message})
         self.latest_response = assistant_message
-        logging.debug(f"{self.name} response: {assistant_message}")
+        logging.debug("%s response: %s", self.name, assistant_message)
 
         return assistant_message
 
-    def receive_message(self, message: Dict[str, str]):
+    def _enforce_token_budget(self, budget: int) -> None:
+        self._sync_token_counts()
+        if self.context_tokens <= budget:
+            return
+
+        counted = len(self._token_counts)
+        keep = trim_history(
+            self.messages[:counted], self._token_counts, budget, self.trim_policy
+        )
+        # Replace only the counted prefix in place, so a broadcast delivered
+        # concurrently by receive_message is not lost
+        self.messages[:counted] = [self.messages[i] for i in keep]
+        self._token_counts = [self._token_counts[i] for i in keep]
+        self.context_tokens = sum(self._token_counts)
+        logging.info(
+            "%s history trimmed from %s to %s messages (%s/%s tokens)",
+            self.name, counted, len(keep), self.context_tokens, budget,
+        )
+
+    def _compact(self) -> None:
+        """Fold older broadcasts into the running summary, if due."""
+        compactor = self.compactor
+        plan = self._plan_compaction(compactor)
+        if compactor is not None and plan is not None:
+            with span("compact history", "agent", messages=len(plan.new_messages)):
+                self._apply_compaction(compactor, plan, compactor.summarize(plan))
+
+    async def _compact_async(self) -> None:
+        compactor = self.compactor
+        plan = self._plan_compaction(compactor)
+        if compactor is not None and plan is not None:
+            with span("compact history", "agent", messages=len(plan.new_messages)):
+                summary = await compactor.summarize_async(plan)
+                self._apply_compaction(compactor, plan, summary)
+
+    def _plan_compaction(
+        self, compactor: Optional[HistoryCompactor]
+    ) -> Optional[CompactionPlan]:
+        if compactor is None:
+            return None
+        self._sync_token_counts()
+        counted = len(self._token_counts)
+        return compactor.plan(self.messages[:counted], self.context_tokens)
+
+    def _apply_compaction(
+        self, compactor: HistoryCompactor, plan: CompactionPlan, summary: Optional[str]
+    ) -> None:
+        if summary is None:
+            return
+        counted = len(self._token_counts)
+        dropped = set(plan.indices)
+        kept = [i for i in range(counted) if i not in dropped]
+        messages = [self.messages[i] for i in kept]
+        counts = [self._token_counts[i] for i in kept]
+
+        # The running summary sits right after the system prompt
+        summary_message = compactor.summary_message(summary)
+        messages.insert(1, summary_message)
+        counts.insert(1, self.token_counter.count_message(summary_message))
+
+        before = self.context_tokens
+        self.messages[:counted] = messages
+        self._token_counts = counts
+        self.context_tokens = sum(counts)
+        logging.info(
+            "%s compacted %s messages into summary (%s -> %s tokens)",
+            self.name, len(plan.new_messages), before, self.context_tokens,
+        )
+
+    def _sync_token_counts(self) -> None:
+        # History only grows at the tail between calls; if it was replaced
+        # from outside, start over
+        if len(self._token_counts) > len(self.messages):
+            self._token_counts = []
+            self.context_tokens = 0
+        for message in self.messages[len(self._token_counts):]:
+            count = self.token_counter.count_message(message)
+            self._token_counts.append(count)
+            self.context_tokens += count
+
+    def receive_message(self, message: Dict[str, Any]) -> None:
         # Agents can receive messages from others
         self.messages.append(message)
-        logging.debug(f"{self.name} received message: {message['content']}")
\ No newline at end of file
+        logging.debug("%s received message: %s", self.name, message['content'])
@@ -1,35 +1,33 @@
 # ai_consultancy_agents.py
 
-from openai import OpenAI
-from typing import List, Dict, Optional
+import argparse
+from typing import (
+    Any, Deque, Iterator, List, Dict, Optional, TextIO, Tuple, Type, Union
+)
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import json
 import os
+import threading
+import time
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
-import yaml
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('ai_consultancy.log'),
-        logging.StreamHandler()
-    ]
-)
+from types import TracebackType
+
+from agentx.batch import Brief, BatchReport, load_briefs, run_batch
+from agentx.logging_config import configure_logging
+from agentx.providers.openai_provider import load_env
+
 
 class ModelType(Enum):
     GPT4 = "gpt-4"
     GPT35 = "gpt-3.5-turbo"
     GPT4_TURBO = "gpt-4-turbo-preview"
 
+
 @dataclass
 class AgentConfig:
     name: str
@@ -39,44 +37,185 @@ class AgentConfig:
     temperature: float = 0.7
     max_tokens: int = 1000
 
+
+DEFAULT_CONVERSATION_LOG = "conversations/conversations.jsonl"
+
+
+class ConversationStore:
+    """
+    Append-only JSON Lines log of conversation messages, one record per line
+    tagged with its session. Writes go through a buffered file handle and are
+    fsynced at most every ``fsync_interval`` seconds (and on ``close``), so
+    each turn costs O(new messages) I/O.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        buffer_size: int = 64 * 1024,
+        fsync_interval: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.fsync_interval = fsync_interval
+        self._file: Optional[TextIO] = None
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        if not messages:
+            return
+        timestamp = datetime.now().isoformat()
+        lines = "".join(
+            json.dumps({"session": session_id, "timestamp": timestamp, **message})
+            + "\n"
+            for message in messages
+        )
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(
+                    self.path, "a", buffering=self.buffer_size, encoding="utf-8"
+                )
+            self._file.write(lines)
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync(self._file)
+
+    def flush(self) -> None:
+        """Write buffered records and fsync them to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._sync(self._file)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._sync(self._file)
+                self._file.close()
+                self._file = None
+
+    def _sync(self, file: TextIO) -> None:
+        file.flush()
+        os.fsync(file.fileno())
+        self._last_sync = time.monotonic()
+
+    def read(self, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream the records of one session (or all of them), oldest first."""
+        for record, _ in self._scan(0):
+            if record is not None and session_id in (None, record["session"]):
+                yield record
+
+    def tail(
+        self,
+        session_id: Optional[str] = None,
+        lines: int = 10,
+        follow: bool = False,
+        poll_interval: float = 0.5,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the last ``lines`` records of a session; with ``follow``, keep
+        yielding new records as they are appended.
+        """
+        recent: Deque[Dict[str, Any]] = deque(maxlen=lines)
+        position = 0
+        for record, position in self._scan(position):
+            if record is not None and session_id in (None, record["session"]):
+                recent.append(record)
+        yield from recent
+
+        while follow:
+            time.sleep(poll_interval)
+            for record, position in self._scan(position):
+                if record is not None and session_id in (None, record["session"]):
+                    yield record
+
+    def _scan(self, position: int) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+        """Yield ``(record, offset after it)`` per complete line from ``position``."""
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(position)
+            for line in iter(f.readline, ""):
+                # A partial line is still being written; pick it up next time
+                if not line.endswith("\n"):
+                    return
+                yield self._parse(line), f.tell()
+
+    @staticmethod
+    def _parse(line: str) -> Optional[Dict[str, Any]]:
+        try:
+            record: Dict[str, Any] = json.loads(line)
+            return record
+        except ValueError:
+            # A torn final line after a crash
+            return None
+
+
 class ConversationHistory:
-    def __init__(self):
+    def __init__(self) -> None:
         self.messages: List[Dict[str, str]] = []
         self.timestamp = datetime.now()
+        self._persisted = 0
 
-    def add_message(self, role: str, content: str):
+    def add_message(self, role: str, content: str) -> None:
         self.messages.append({"role": role, "content": content})
 
-    def get_messages_for_api(self):
+    def get_messages_for_api(self) -> List[Dict[str, str]]:
         return [{"role": m["role"], "content": m["content"]} for m in self.messages]
 
-    def save_to_file(self, filename: str):
-        Path("conversations").mkdir(exist_ok=True)
-        filepath = Path("conversations") / filename
-        with open(filepath, 'w') as f:
-            json.dump({
-                "messages": self.messages,
-                "timestamp": str(self.timestamp)
-            }, f, indent=2)
+    def persist(self, store: ConversationStore, session_id: str) -> None:
+        """Append the messages added since the last call to ``store``."""
+        new_messages = self.messages[self._persisted:]
+        store.append(session_id, new_messages)
+        self._persisted += len(new_messages)
+
+
+# One OpenAI client (and connection pool) per API key for the whole process,
+# shared by the agents of every consultancy; created on first use, so the
+# openai SDK is not imported with this module.
+# Calls are not coalesced (see CoalescingProvider): every system message
+# names its agent, so one consultancy never sends two identical requests,
+# and merging sampled calls across duplicate briefs would give them one
+# shared answer
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def shared_openai_client() -> Any:
+    load_env()
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OpenAI API key not found in environment variables")
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            from openai import OpenAI
+
+            # agent_timeout bounds one request; SDK retries would multiply it
+            client = _clients[api_key] = OpenAI(api_key=api_key, max_retries=0)
+        return client
+
 
 class AIAgent:
-    def __init__(self, config: AgentConfig):
+    def __init__(self, config: AgentConfig, client: Any = None) -> None:
         self.config = config
         self.conversation = ConversationHistory()
         self.logger = logging.getLogger(f"Agent_{self.config.name}")
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OpenAI API key not found in environment variables")
-        self.client = OpenAI(api_key=api_key)
+        self.client = client or shared_openai_client()
 
     def generate_system_message(self) -> str:
         return (
             f"You are {self.config.name}, {self.config.role_description}.\n"
             "Your responsibilities include:\n"
-            + "\n".join(f"{idx}. {resp}" for idx, resp in enumerate(self.config.responsibilities, 1))
+            + "\n".join(
+                f"{idx}. {resp}"
+                for idx, resp in enumerate(self.config.responsibilities, 1)
+            )
         )
 
-    def get_response(self, user_input: Optional[str] = None) -> str:
+    def get_response(
+        self, user_input: Optional[str] = None, timeout: Optional[float] = None
+    ) -> str:
         try:
             # Initialize conversation with system message if empty
             if not self.conversation.messages:
@@ -89,15 +228,17 @@ class AIAgent:
             # Get messages in correct format for API
             messages = self.conversation.get_messages_for_api()
 
-            # Make API call
+            # Make API call; the timeout bounds this agent's request only
+            request_options = {"timeout": timeout} if timeout is not None else {}
             response = self.client.chat.completions.create(
                 model=self.config.model.value,
                 messages=messages,
                 temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
+                max_tokens=self.config.max_tokens,
+                **request_options
             )
 
-            assistant_message = response.choices[0].message.content.strip()
+            assistant_message: str = response.choices[0].message.content.strip()
             self.conversation.add_message("assistant", assistant_message)
             return assistant_message
 
@@ -106,25 +247,56 @@ class AIAgent:
             self.logger.error(error_msg)
             raise RuntimeError(error_msg)
 
+
 class AIConsultancy:
-    def __init__(self, config_path: str):
+    def __init__(
+        self,
+        config_path: str,
+        max_concurrency: Optional[int] = None,
+        agent_timeout: Optional[float] = None,
+        conversation_log: Optional[str] = None,
+        conversation_store: Optional[ConversationStore] = None,
+        session_id: Optional[str] = None,
+        client: Any = None
+    ):
         self.logger = logging.getLogger("AIConsultancy")
+        # An OpenAI-compatible client for every agent; the process-wide
+        # shared client by default
+        self.client = client
         self.load_config(config_path)
+        # Explicit arguments win over the optional `execution` config section
+        execution = self.config.get('execution') or {}
+        if max_concurrency is None:
+            max_concurrency = execution.get('max_concurrency', 1)
+        if agent_timeout is None:
+            agent_timeout = execution.get('agent_timeout')
+        self.max_concurrency = max_concurrency
+        self.agent_timeout = agent_timeout
+        # Every agent's turns are appended to one shared log, keyed by session;
+        # a store passed in (e.g. shared by a batch) is left open on close()
+        self._owns_store = conversation_store is None
+        self.conversation_store = conversation_store or ConversationStore(
+            conversation_log
+            or execution.get('conversation_log', DEFAULT_CONVERSATION_LOG)
+        )
+        self.session_id = session_id or datetime.now().strftime('%Y%m%d_%H%M%S')
         self.agents: Dict[str, AIAgent] = {}
         self.initialize_agents()
 
-    def load_config(self, config_path: str):
+    def load_config(self, config_path: str) -> None:
+        import yaml
+
         try:
             with open(config_path, 'r') as f:
                 self.config = yaml.safe_load(f)
         except FileNotFoundError:
-            self.logger.error(f"Configuration file not found: {config_path}")
+            self.logger.error("Configuration file not found: %s", config_path)
             raise
         except yaml.YAMLError as e:
-            self.logger.error(f"Error parsing configuration file: {e}")
+            self.logger.error("Error parsing configuration file: %s", e)
             raise
 
-    def initialize_agents(self):
+    def initialize_agents(self) -> None:
         for agent_config in self.config['agents']:
             try:
                 config = AgentConfig(
@@ -135,44 +307,150 @@ class AIConsultancy:
                     temperature=agent_config.get('temperature', 0.7),
                     max_tokens=agent_config.get('max_tokens', 1000)
                 )
-                self.agents[config.name] = AIAgent(config)
-                self.logger.info(f"Initialized agent: {config.name}")
+                self.agents[config.name] = AIAgent(config, client=self.client)
+                self.logger.info("Initialized agent: %s", config.name)
             except Exception as e:
-                self.logger.error(f"Error initializing agent {agent_config.get('name', 'unknown')}: {str(e)}")
+                self.logger.error(
+                    "Error initializing agent %s: %s",
+                    agent_config.get('name', 'unknown'), e,
+                )
                 raise
 
     def process_client_request(self, client_input: str) -> Dict[str, str]:
-        responses = {}
-        for agent_name, agent in self.agents.items():
-            try:
-                self.logger.info(f"Processing with {agent_name}")
-                response = agent.get_response(client_input)
-                responses[agent_name] = response
+        """
+        Send the client input to every agent. Agents are independent, so with
+        max_concurrency > 1 they run in a thread pool; the result keeps the
+        roster order either way.
+        """
+        if self.max_concurrency <= 1 or len(self.agents) <= 1:
+            return {
+                agent_name: self._process_with_agent(agent_name, agent, client_input)
+                for agent_name, agent in self.agents.items()
+            }
 
-                filename = f"conversation_{agent_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                agent.conversation.save_to_file(filename)
-                self.logger.info(f"Saved conversation history for {agent_name}")
-            except Exception as e:
-                error_msg = f"Error processing request with {agent_name}: {str(e)}"
-                self.logger.error(error_msg)
-                responses[agent_name] = f"Error: {error_msg}"
+        workers = min(self.max_concurrency, len(self.agents))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent")
+        with executor:
+            futures = {
+                agent_name: executor.submit(
+                    self._process_with_agent, agent_name, agent, client_input
+                )
+                for agent_name, agent in self.agents.items()
+            }
+            return {
+                agent_name: future.result() for agent_name, future in futures.items()
+            }
+
+    def _process_with_agent(
+        self, agent_name: str, agent: AIAgent, client_input: str
+    ) -> str:
+        try:
+            self.logger.info("Processing with %s", agent_name)
+            response = agent.get_response(client_input, timeout=self.agent_timeout)
+
+            agent.conversation.persist(
+                self.conversation_store, self.agent_session(agent_name)
+            )
+            self.logger.info("Saved conversation history for %s", agent_name)
+            return response
+        except Exception as e:
+            error_msg = f"Error processing request with {agent_name}: {str(e)}"
+            self.logger.error(error_msg)
+            return f"Error: {error_msg}"
+
+    def agent_session(self, agent_name: str) -> str:
+        """Session key of an agent's conversation in the conversation log."""
+        return f"{agent_name}_{self.session_id}"
+
+    def close(self) -> None:
+        """Flush the conversation log, closing it if this consultancy opened it."""
+        if self._owns_store:
+            self.conversation_store.close()
+        else:
+            self.conversation_store.flush()
 
-        return responses
+    def __enter__(self) -> "AIConsultancy":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+def format_responses(responses: Dict[str, str]) -> str:
+    return "\n\n".join(
+        f"## {agent_name}\n\n{response}" for agent_name, response in responses.items()
+    )
+
+
+def run_batch_requests(
+    briefs_path: str, output_dir: str, workers: int, config_path: str = "config.yaml"
+) -> BatchReport:
+    """
+    Run every brief in a JSONL or CSV file, each with a fresh agent roster,
+    on ``workers`` threads. All briefs append to one conversation log.
+    """
+    import yaml
+
+    briefs = load_briefs(briefs_path)
+    with open(config_path, 'r') as f:
+        execution = (yaml.safe_load(f) or {}).get('execution') or {}
+    store = ConversationStore(
+        execution.get('conversation_log', DEFAULT_CONVERSATION_LOG)
+    )
+
+    def run_brief(brief: Brief) -> str:
+        consultancy = AIConsultancy(
+            config_path, conversation_store=store, session_id=brief.id
+        )
+        with consultancy:
+            responses = consultancy.process_client_request(brief.text)
+        if all(response.startswith("Error: ") for response in responses.values()):
+            raise RuntimeError(f"every agent failed for brief {brief.id}")
+        return format_responses(responses)
+
+    try:
+        return run_batch(briefs, run_brief, output_dir, max_workers=workers)
+    finally:
+        store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the AI consultancy agents.")
+    parser.add_argument(
+        "--batch", metavar="BRIEFS", help="run every brief in a JSONL or CSV file"
+    )
+    parser.add_argument(
+        "--output-dir", default="batch_results", help="where batch results are written"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="briefs run concurrently in batch mode"
+    )
+    args = parser.parse_args(argv)
+    # Logging is configured here, by the entry point, not on import
+    configure_logging("ai_consultancy.log")
 
-def main():
     try:
         # Ensure config.yaml exists in the current directory
         if not Path("config.yaml").exists():
             raise FileNotFoundError("config.yaml not found in current directory")
 
-        # Initialize the consultancy
-        consultancy = AIConsultancy("config.yaml")
+        if args.batch:
+            report = run_batch_requests(args.batch, args.output_dir, args.workers)
+            print(report.summary())
+            return
 
-        # Example client input
-        client_input = "I want to build a scalable crypto currency app that can have the highest chance of winning"
+        # Initialize the consultancy
+        with AIConsultancy("config.yaml") as consultancy:
+            # Example client input
+            client_input = "I want to build a scalable crypto currency app that can have the highest chance of winning"
 
-        # Process the request
-        responses = consultancy.process_client_request(client_input)
+            # Process the request
+            responses = consultancy.process_client_request(client_input)
 
         # Print responses
         for agent_name, response in responses.items():
@@ -180,8 +458,9 @@ def main():
             print(response)
 
     except Exception as e:
-        logging.error(f"Main execution error: {str(e)}")
+        logging.error("Main execution error: %s", e)
         raise
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,31 @@
 # ai_model_provider.py
 
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from types import TracebackType
+from typing import (
+    Any, AsyncIterator, Coroutine, Iterator, List, Dict, Optional, Type, TypeVar
+)
+
+_T = TypeVar("_T")
+_P = TypeVar("_P", bound="AIModelProvider")
+_A = TypeVar("_A", bound="AsyncAIModelProvider")
+
+
+def request_key(messages: List[Dict[str, str]], model: str, temperature: float) -> str:
+    """Stable content hash of a provider request, used to deduplicate calls."""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 class AIModelProvider(ABC):
@@ -19,4 +43,133 @@ class AIModelProvider(ABC):
         Returns:
             str: The assistant's response.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        """Awaitable variant of ``generate_response``.
+
+        Blocking providers run the call in the event loop's default executor,
+        in a copy of the caller's context so tracing spans and metric labels
+        carry over; asyncio-native providers override this (see
+        ``AsyncAIModelProvider``).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                contextvars.copy_context().run,
+                self.generate_response,
+                messages=messages,
+                model=model,
+                temperature=temperature,
+            ),
+        )
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        """Generate a response as a sequence of text deltas.
+
+        Providers without a streaming endpoint yield the whole response once.
+        """
+        yield self.generate_response(
+            messages=messages, model=model, temperature=temperature
+        )
+
+    async def stream_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> AsyncIterator[str]:
+        """Awaitable variant of ``stream_response``."""
+        yield await self.generate_response_async(
+            messages=messages, model=model, temperature=temperature
+        )
+
+    def close(self) -> None:
+        """Release any resources (e.g. pooled connections) held by the provider."""
+        pass
+
+    def __enter__(self: _P) -> _P:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+class AsyncAIModelProvider(AIModelProvider):
+    """Base class for providers implemented natively on asyncio.
+
+    Subclasses implement ``generate_response_async``; the blocking
+    ``generate_response`` is a thin wrapper that runs the coroutine on a
+    private event loop thread owned by the provider, so sync callers share
+    one set of pooled connections instead of spinning up a loop per call.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    @abstractmethod
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        pass
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        return self._run_sync(
+            self.generate_response_async(
+                messages=messages, model=model, temperature=temperature
+            )
+        )
+
+    async def aclose(self) -> None:
+        """Release resources bound to the running event loop."""
+        pass
+
+    def close(self) -> None:
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
+
+    async def __aenter__(self: _A) -> _A:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+    def _run_sync(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name=f"{type(self).__name__}-loop",
+                    daemon=True,
+                )
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+            return self._loop
@@ -0,0 +1,167 @@
+# batch.py
+
+import csv
+from collections import Counter
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from agentx.tracing import span
+
+# Field names accepted for the brief text in JSONL objects and CSV headers
+BRIEF_FIELDS = ("brief", "client_input", "input", "text")
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass
+class Brief:
+    id: str
+    text: str
+
+
+@dataclass
+class BriefResult:
+    id: str
+    ok: bool
+    latency: float
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    results: List[BriefResult] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def failures(self) -> List[BriefResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def throughput(self) -> float:
+        """Completed briefs per second of wall time."""
+        return len(self.results) / self.wall_time if self.wall_time else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        latencies = sorted(result.latency for result in self.results)
+        if not latencies:
+            return 0.0
+        last = len(latencies) - 1
+        index = min(last, int(round(percentile / 100 * last)))
+        return latencies[index]
+
+    def summary(self) -> str:
+        lines = [
+            f"Briefs: {len(self.results)}  failed: {len(self.failures)}",
+            f"Wall time: {self.wall_time:.2f}s  "
+            f"throughput: {self.throughput:.2f} briefs/s",
+            f"Latency p50: {self.latency_percentile(50):.2f}s  "
+            f"p95: {self.latency_percentile(95):.2f}s  "
+            f"max: {self.latency_percentile(100):.2f}s",
+        ]
+        for result in self.failures:
+            lines.append(f"  FAILED {result.id}: {result.error}")
+        return "\n".join(lines)
+
+
+def load_briefs(path: Union[str, Path]) -> List[Brief]:
+    """
+    Read briefs from a ``.csv`` file (a header row with an ``id`` column and
+    a brief column) or JSON Lines (objects with an optional ``id`` and a
+    brief field, or plain strings). Briefs without an id are numbered.
+    """
+    path = Path(path)
+    # JSON Lines rows may be plain strings as well as objects
+    rows: List[Union[str, Dict[str, Any]]]
+    if path.suffix.lower() == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = [dict(row) for row in csv.DictReader(f)]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    briefs = []
+    for number, row in enumerate(rows, start=1):
+        if isinstance(row, str):
+            row = {"brief": row}
+        text = next((row[name] for name in BRIEF_FIELDS if row.get(name)), None)
+        if text is None:
+            raise ValueError(
+                f"{path}: brief {number} has none of the fields {BRIEF_FIELDS}"
+            )
+        briefs.append(Brief(id=str(row.get("id") or f"brief-{number:04d}"), text=text))
+
+    counts = Counter(brief.id for brief in briefs)
+    duplicates = sorted(id for id, count in counts.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"{path}: duplicate brief ids {duplicates}")
+    return briefs
+
+
+def run_batch(
+    briefs: List[Brief],
+    run_brief: Callable[[Brief], str],
+    output_dir: Union[str, Path],
+    max_workers: int = 4,
+) -> BatchReport:
+    """
+    Run ``run_brief`` for every brief on a bounded thread pool. Each result
+    is written to ``<output_dir>/<id>.md`` and appended to
+    ``results.jsonl`` as soon as it finishes, so a slow brief never holds
+    back the others; ``summary.json`` is written at the end. Rerunning into
+    the same directory starts ``results.jsonl`` afresh.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report = BatchReport()
+    start = time.perf_counter()
+
+    def run_one(brief: Brief) -> BriefResult:
+        started = time.perf_counter()
+        output_path = output_dir / f"{_UNSAFE_FILENAME.sub('_', brief.id)}.md"
+        try:
+            with span(f"brief {brief.id}", "batch"):
+                output = run_brief(brief)
+            output_path.write_text(output, encoding="utf-8")
+        except Exception as e:
+            # A failed brief (or report write) never aborts the rest of the batch
+            logging.error("Brief %s failed: %s", brief.id, e)
+            latency = time.perf_counter() - started
+            return BriefResult(brief.id, False, latency, error=str(e))
+        latency = time.perf_counter() - started
+        return BriefResult(brief.id, True, latency, str(output_path))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="brief")
+    with executor, open(
+        output_dir / "results.jsonl", "w", encoding="utf-8"
+    ) as results_file:
+        futures = [executor.submit(run_one, brief) for brief in briefs]
+        for future in as_completed(futures):
+            result = future.result()
+            report.results.append(result)
+            results_file.write(json.dumps(asdict(result)) + "\n")
+            results_file.flush()
+            logging.info(
+                "Brief %s %s in %.2fs (%s/%s)",
+                result.id, "done" if result.ok else "failed",
+                result.latency, len(report.results), len(briefs),
+            )
+
+    report.wall_time = time.perf_counter() - start
+    with open(output_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "briefs": len(report.results),
+            "failed": len(report.failures),
+            "wall_time": report.wall_time,
+            "throughput": report.throughput,
+            "latency_p50": report.latency_percentile(50),
+            "latency_p95": report.latency_percentile(95),
+            "latency_max": report.latency_percentile(100),
+        }, f, indent=2)
+    return report
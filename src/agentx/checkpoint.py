@@ -0,0 +1,146 @@
+# checkpoint.py
+
+import json
+import logging
+import os
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from agentx.ai_agent import AIAgent
+from agentx.pipeline import StageResult
+
+DEFAULT_RUNS_DIRECTORY = ".agentx_runs"
+
+
+def new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _write_json(path: Path, data: Any) -> None:
+    # Write then rename, so a crash never leaves a half-written checkpoint
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class RunCheckpoint:
+    """
+    On-disk checkpoint of one pipeline run, under ``<directory>/<run_id>/``:
+    the run's client input, one JSON file per finished stage, and a snapshot
+    of every agent's message state taken after each stage. Resuming a run
+    restores the agents and skips the stages that already finished.
+    """
+
+    def __init__(
+        self, run_id: str, directory: Union[str, Path] = DEFAULT_RUNS_DIRECTORY
+    ):
+        self.run_id = run_id
+        self.path = Path(directory) / run_id
+        self._stages_path = self.path / "stages"
+        self._agents_path = self.path / "agents.json"
+        self._meta_path = self.path / "run.json"
+        # Agents whose stage has finished, loaded from disk on first save
+        self._finished_agents: Optional[Set[str]] = None
+
+    @classmethod
+    def create(
+        cls, client_input: str, directory: Union[str, Path] = DEFAULT_RUNS_DIRECTORY
+    ) -> "RunCheckpoint":
+        checkpoint = cls(new_run_id(), directory)
+        checkpoint._stages_path.mkdir(parents=True)
+        _write_json(checkpoint._meta_path, {
+            "run_id": checkpoint.run_id,
+            "client_input": client_input,
+            "created": datetime.now().isoformat(),
+        })
+        return checkpoint
+
+    @classmethod
+    def load(
+        cls, run_id: str, directory: Union[str, Path] = DEFAULT_RUNS_DIRECTORY
+    ) -> "RunCheckpoint":
+        checkpoint = cls(run_id, directory)
+        if not checkpoint._meta_path.exists():
+            raise FileNotFoundError(
+                f"No checkpoint found for run {run_id} in {directory}"
+            )
+        return checkpoint
+
+    @property
+    def client_input(self) -> str:
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            client_input: str = json.load(f)["client_input"]
+        return client_input
+
+    def save_stage(self, result: StageResult, agents: List[AIAgent]) -> None:
+        """
+        Record a finished stage (after its broadcast) and the agents' state.
+        Broadcasts from stages still running are left out of the snapshot:
+        they may have reached only some recipients, and are sent again when
+        their stage is re-run after a resume.
+        """
+        if self._finished_agents is None:
+            self._finished_agents = {
+                r.agent_name for r in self.completed_stages().values()
+            }
+        self._finished_agents.add(result.agent_name)
+        finished = self._finished_agents
+        _write_json(self._agents_path, {
+            agent.name: {
+                "messages": [
+                    m for m in list(agent.messages)
+                    if "sender" not in m or m["sender"] in finished
+                ],
+                "latest_response": agent.latest_response,
+            }
+            for agent in agents
+        })
+        # The stage file is written last: it marks the stage as done
+        _write_json(self._stages_path / f"{result.name}.json", asdict(result))
+        logging.info("Checkpointed stage %s of run %s", result.name, self.run_id)
+
+    def completed_stages(self) -> Dict[str, StageResult]:
+        results = {}
+        for path in sorted(self._stages_path.glob("*.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                result = StageResult(**json.load(f))
+            results[result.name] = result
+        return results
+
+    def restore_agents(
+        self,
+        agents: List[AIAgent],
+        completed: Optional[Dict[str, StageResult]] = None,
+    ) -> None:
+        """
+        Load the saved message state into freshly built agents. Agents whose
+        stage has not finished keep only their system prompt and received
+        broadcasts, so their turn starts cleanly when it is re-run.
+        """
+        if not self._agents_path.exists():
+            return
+        with open(self._agents_path, "r", encoding="utf-8") as f:
+            state: Dict[str, Dict[str, Any]] = json.load(f)
+        if completed is None:
+            completed = self.completed_stages()
+        finished = {result.agent_name for result in completed.values()}
+
+        for agent in agents:
+            saved = state.get(agent.name)
+            if saved is None:
+                continue
+            messages = saved["messages"]
+            if agent.name not in finished:
+                messages = [
+                    m for m in messages if m["role"] == "system" or "sender" in m
+                ]
+                agent.latest_response = ""
+            else:
+                agent.latest_response = saved["latest_response"]
+            agent.messages = messages
@@ -1,10 +1,29 @@
 # communication_manager.py
 
-from typing import List, Dict, Set
+from abc import ABC, abstractmethod
+from typing import (
+    TYPE_CHECKING, Any, Deque, Iterable, List, Dict, FrozenSet, Optional, Set, TextIO,
+    Tuple,
+)
 from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider
+from agentx.message_store import SQLiteMessageStore
+from agentx.tracing import annotate, span
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+import asyncio
+import contextvars
+import functools
+import json
 import logging
 from enum import Enum
 import re
+import threading
+import uuid
+import zlib
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class TopicCategory(Enum):
@@ -18,256 +37,1097 @@ class TopicCategory(Enum):
     DEVOPS = "devops"
 
 
+# Keywords for each category
+DEFAULT_TOPIC_KEYWORDS: Dict[TopicCategory, List[str]] = {
+    TopicCategory.BUSINESS: [
+        "business", "cost", "roi", "stakeholder", "requirement",
+        "process", "workflow", "budget"
+    ],
+    TopicCategory.TECHNICAL: [
+        "technical", "technology", "system", "software", "database",
+        "api", "integration"
+    ],
+    TopicCategory.SECURITY: [
+        "security", "authentication", "authorization", "encryption",
+        "vulnerability", "threat"
+    ],
+    TopicCategory.INFRASTRUCTURE: [
+        "infrastructure", "cloud", "server", "network", "hosting",
+        "scaling", "deployment"
+    ],
+    TopicCategory.DEVELOPMENT: [
+        "development", "coding", "programming", "testing", "git",
+        "version control", "code review"
+    ],
+    TopicCategory.PROJECT_MANAGEMENT: [
+        "timeline", "milestone", "resource", "planning", "coordination",
+        "schedule", "risk"
+    ],
+    TopicCategory.ARCHITECTURE: [
+        "architecture", "design pattern", "system design", "scalability",
+        "microservice", "component"
+    ],
+    TopicCategory.DEVOPS: [
+        "devops", "ci/cd", "pipeline", "automation", "monitoring",
+        "deployment", "container"
+    ]
+}
+
+
+# Plural and verb endings a keyword may carry before the word ends
+_KEYWORD_END = r"(?=(?:s|es|ed|ing|er|ers)?(?!\w))"
+
+
+class KeywordTopicMatcher:
+    """
+    Single-pass topic matcher compiled from a keyword table.
+
+    All keywords are folded into one prefix-trie regex anchored at word starts
+    and ends. A keyword may carry a common inflection (so "requirements"
+    still matches "requirement"), but "digital" does not match "git" and
+    "apiary" does not match "api". Every category is found in one scan of
+    the text, and the scan cost stays flat as the keyword table grows.
+    """
+
+    def __init__(self, keywords: Dict[TopicCategory, List[str]]):
+        self.keywords = keywords
+        categories_by_keyword: Dict[str, Set[TopicCategory]] = {}
+        for category, category_keywords in keywords.items():
+            for keyword in category_keywords:
+                categories_by_keyword.setdefault(keyword.lower(), set()).add(category)
+
+        # The regex consumes the longest keyword at each position, so a match
+        # also carries the categories of keywords nested inside it
+        # ("system design" implies "system").
+        self._categories: Dict[str, FrozenSet[TopicCategory]] = {}
+        for keyword in categories_by_keyword:
+            nested = set()
+            for other, other_categories in categories_by_keyword.items():
+                if re.search(r"\b" + re.escape(other) + _KEYWORD_END, keyword):
+                    nested |= other_categories
+            self._categories[keyword] = frozenset(nested)
+
+        self._pattern = (
+            re.compile(
+                r"\b" + self._trie_pattern(categories_by_keyword) + _KEYWORD_END
+            )
+            if categories_by_keyword else None
+        )
+        self._category_count = len({c for cs in self._categories.values() for c in cs})
+
+    @staticmethod
+    def _trie_pattern(keywords: Iterable[str]) -> str:
+        # Share common prefixes so the regex engine does not retry every
+        # keyword at each word start
+        trie: Dict[str, dict] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: Dict[str, dict]) -> str:
+            # Longer continuations first, so the longest keyword wins
+            branches = [
+                re.escape(char) + build(child)
+                for char, child in sorted(node.items()) if char
+            ]
+            if not branches:
+                return ""
+            if len(branches) == 1:
+                pattern = branches[0]
+            else:
+                pattern = "(?:" + "|".join(branches) + ")"
+            return f"(?:{pattern})?" if "" in node else pattern
+
+        return build(trie)
+
+    def match(self, content: str) -> Set[TopicCategory]:
+        topics: Set[TopicCategory] = set()
+        if self._pattern is None:
+            return topics
+        for match in self._pattern.finditer(content.lower()):
+            topics |= self._categories[match.group(0)]
+            if len(topics) == self._category_count:
+                break
+        return topics
+
+
+def load_topic_keywords(path: str) -> Dict[TopicCategory, List[str]]:
+    """
+    Load a keyword table from YAML, either at the top level or under a
+    ``topic_keywords`` key, e.g. ``{"security": ["security", "threat"]}``.
+    """
+    import yaml
+
+    with open(path, 'r') as f:
+        data = yaml.safe_load(f) or {}
+    table = data.get('topic_keywords', data)
+    return {
+        TopicCategory(category): [str(keyword).lower() for keyword in keywords]
+        for category, keywords in table.items()
+    }
+
+
+DEFAULT_TOPIC_MATCHER = KeywordTopicMatcher(DEFAULT_TOPIC_KEYWORDS)
+
+
+class TopicRouter(ABC):
+    """
+    Local topic classifier consulted when no keyword matches, before the
+    LLM fallback.
+    """
+
+    @abstractmethod
+    def route(self, content: str) -> Optional[Set[TopicCategory]]:
+        """Return the topics for ``content``, or None to escalate to the LLM."""
+        pass
+
+
+# Extra vocabulary per category for the vector router's centroids, on top of
+# the keyword table
+DEFAULT_TOPIC_EXAMPLES: Dict[TopicCategory, List[str]] = {
+    TopicCategory.BUSINESS: [
+        "revenue profit market customers pricing investment value sales strategy",
+        "business goals expenses return on investment commercial objectives",
+    ],
+    TopicCategory.TECHNICAL: [
+        "technical stack applications data storage interfaces protocols legacy systems",
+        "software platform backend services queries endpoints upgrade",
+    ],
+    TopicCategory.SECURITY: [
+        "secure encrypted data protection access control compliance breach attack",
+        "firewall credentials passwords privacy audit intrusion malware",
+    ],
+    TopicCategory.INFRASTRUCTURE: [
+        "servers cloud capacity load balancing data center storage bandwidth",
+        "hardware virtual machines availability regions failover backups",
+    ],
+    TopicCategory.DEVELOPMENT: [
+        "developers code implementation refactoring unit tests debugging",
+        "feature branches repository pull requests libraries frameworks",
+    ],
+    TopicCategory.PROJECT_MANAGEMENT: [
+        "project plan deadlines deliverables staffing team allocation phases",
+        "roadmap estimates progress tracking dependencies sprint",
+    ],
+    TopicCategory.ARCHITECTURE: [
+        "architectural layers services modules boundaries patterns scalable design",
+        "event driven decoupled distributed systems interfaces components",
+    ],
+    TopicCategory.DEVOPS: [
+        "continuous integration delivery automated builds releases observability",
+        "containers orchestration kubernetes docker alerts logs infrastructure as code",
+    ],
+}
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_features(word: str, n_features: int) -> Tuple[int, ...]:
+    # The word itself plus its character 3- to 5-grams, so inflections
+    # ("encrypted" / "encryption") share most of their features
+    padded = f"<{word}>"
+    grams = [padded]
+    for size in (3, 4, 5):
+        grams.extend(padded[i:i + size] for i in range(len(padded) - size + 1))
+    return tuple(zlib.crc32(gram.encode("utf-8")) % n_features for gram in grams)
+
+
+class VectorTopicRouter(TopicRouter):
+    """
+    Zero-network topic router: hashed TF-IDF vectors of word and character
+    n-grams, scored by cosine similarity against one precomputed centroid
+    per category. Routing a message is a bincount and one small matrix
+    product.
+
+    Categories scoring at least ``threshold`` (and within ``spread`` of the
+    best score) are returned; if even the best category is below
+    ``threshold``, the message is escalated. Requires NumPy
+    (``pip install agentx[vectors]``).
+    """
+
+    def __init__(
+        self,
+        keywords: Optional[Dict[TopicCategory, List[str]]] = None,
+        examples: Optional[Dict[TopicCategory, List[str]]] = None,
+        threshold: float = 0.12,
+        spread: float = 0.8,
+        n_features: int = 1 << 14,
+    ):
+        import numpy as np
+
+        self._np = np
+        self.threshold = threshold
+        self.spread = spread
+        self.n_features = n_features
+        self.stats: Dict[str, int] = {"routed": 0, "escalated": 0}
+        self._stats_lock = threading.Lock()
+
+        keywords = DEFAULT_TOPIC_KEYWORDS if keywords is None else keywords
+        examples = DEFAULT_TOPIC_EXAMPLES if examples is None else examples
+        self.categories = sorted(set(keywords) | set(examples), key=lambda c: c.value)
+        documents = [
+            " ".join(keywords.get(category, []) + examples.get(category, []))
+            for category in self.categories
+        ]
+        counts = np.stack([self._counts(document) for document in documents])
+
+        # Smoothed IDF over the category documents: features shared by every
+        # category carry little weight
+        document_frequency = (counts > 0).sum(axis=0)
+        self._idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1.0
+        self._centroids = np.stack([self._weigh(row) for row in counts])
+
+    def route(self, content: str) -> Optional[Set[TopicCategory]]:
+        scores = self.scores(content)
+        best = max(scores.values(), default=0.0)
+        with self._stats_lock:
+            self.stats["routed" if best >= self.threshold else "escalated"] += 1
+        if best < self.threshold:
+            return None
+        cutoff = max(self.threshold, best * self.spread)
+        return {category for category, score in scores.items() if score >= cutoff}
+
+    def scores(self, content: str) -> Dict[TopicCategory, float]:
+        """Cosine similarity of ``content`` to each category centroid."""
+        np = self._np
+        # Sparse: only the features present in the message are touched
+        indices, counts = np.unique(self._features(content), return_counts=True)
+        if not len(indices):
+            return {}
+        weights = np.log1p(counts) * self._idf[indices]
+        scores = self._centroids[:, indices] @ weights / np.linalg.norm(weights)
+        return dict(zip(self.categories, scores.tolist()))
+
+    def _features(self, text: str) -> "np.ndarray":
+        return self._np.fromiter(
+            (
+                index
+                for word in _WORDS.findall(text.lower())
+                for index in _word_features(word, self.n_features)
+            ),
+            dtype=self._np.int64,
+        )
+
+    def _counts(self, text: str) -> "np.ndarray":
+        return self._np.bincount(self._features(text), minlength=self.n_features)
+
+    def _weigh(self, counts: "np.ndarray") -> "np.ndarray":
+        # Sublinear term frequency, IDF, then unit length for cosine scoring
+        vector: "np.ndarray" = self._np.log1p(counts) * self._idf
+        norm = self._np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+# Model used for LLM topic classification when keywords find nothing
+DEFAULT_CLASSIFICATION_MODEL = "gpt-3.5-turbo"
+
+_CATEGORY_LIST = """
+        - Business
+        - Technical
+        - Security
+        - Infrastructure
+        - Development
+        - Project Management
+        - Architecture
+        - DevOps
+"""
+
+
+def _analysis_messages(content: str) -> List[Dict[str, str]]:
+    prompt = f"""
+        Analyze the following content and categorize it into one or more of these categories:{_CATEGORY_LIST}
+        Content: {content}
+
+        Return only the category names, separated by commas.
+        """
+    return [{"role": "user", "content": prompt}]
+
+
+def _batch_analysis_messages(contents: List[str]) -> List[Dict[str, str]]:
+    items = "\n\n".join(
+        f"{number}. {content}" for number, content in enumerate(contents, 1)
+    )
+    prompt = f"""
+        Analyze each numbered item below and categorize it into one or more of these categories:{_CATEGORY_LIST}
+        Return only a JSON object mapping every item number to a list of category
+        names, for example: {{"1": ["Business"], "2": ["Technical", "Security"]}}
+
+        {items}
+        """
+    return [{"role": "user", "content": prompt}]
+
+
+def _parse_categories(response: str) -> Set[TopicCategory]:
+    # Convert AI response to TopicCategory enum values
+    categories = set()
+    for category in response.split(','):
+        category = category.strip().lower().replace(' ', '_')
+        try:
+            categories.add(TopicCategory(category))
+        except ValueError:
+            logging.warning("Invalid category received from AI: %s", category)
+
+    return categories
+
+
+def _parse_batch_categories(response: str, count: int) -> Dict[int, Set[TopicCategory]]:
+    """
+    Parse a batch classification reply into categories per item (0-based).
+    Items missing from the reply are left out; raises ValueError if the
+    reply is not a JSON object.
+    """
+    start, end = response.find("{"), response.rfind("}")
+    parsed = json.loads(response[start:end + 1]) if start != -1 else None
+    if not isinstance(parsed, dict):
+        raise ValueError("Batch classification reply is not a JSON object")
+
+    results: Dict[int, Set[TopicCategory]] = {}
+    for number in range(1, count + 1):
+        names = parsed.get(str(number))
+        if isinstance(names, str):
+            names = [names]
+        if isinstance(names, list):
+            results[number - 1] = _parse_categories(
+                ",".join(str(name) for name in names)
+            )
+    return results
+
+
+class ClassificationBatcher:
+    """
+    Micro-batcher for LLM topic classification, shareable by any number of
+    CommunicationManagers.
+
+    Requests are collected for up to ``max_wait`` seconds or
+    ``max_batch_size`` items and sent as one numbered prompt asking for
+    JSON output. Each caller gets its own item's topics back; items the
+    reply does not cover (or every item, if the reply fails to parse or
+    the call fails) fall back to a single classification call made by the
+    waiting caller. Full batches are sent on a small pool of
+    ``max_senders`` threads owned by the batcher; ``close`` sends what is
+    pending and stops them.
+    """
+
+    def __init__(
+        self,
+        ai_provider: AIModelProvider,
+        model: str = DEFAULT_CLASSIFICATION_MODEL,
+        max_batch_size: int = 16,
+        max_wait: float = 0.01,
+        temperature: float = 0.3,
+        max_senders: int = 4,
+    ):
+        self.ai_provider = ai_provider
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.temperature = temperature
+        self.stats: Dict[str, int] = {"requests": 0, "batches": 0, "fallbacks": 0}
+        self._pending: List[Tuple[str, "Future[Optional[Set[TopicCategory]]]"]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._senders = ThreadPoolExecutor(
+            max_workers=max_senders, thread_name_prefix="classify-batch"
+        )
+        self._closed = False
+
+    def classify(self, content: str) -> Set[TopicCategory]:
+        topics = self._submit(content).result()
+        if topics is None:
+            topics = self._classify_one(content)
+        return topics
+
+    async def classify_async(self, content: str) -> Set[TopicCategory]:
+        topics = await asyncio.wrap_future(self._submit(content))
+        if topics is None:
+            topics = _parse_categories(await self.ai_provider.generate_response_async(
+                messages=_analysis_messages(content),
+                model=self.model,
+                temperature=self.temperature,
+            ))
+        return topics
+
+    def flush(self) -> None:
+        """Send whatever is pending now, e.g. before shutting down."""
+        self._send(self._take_pending())
+
+    def close(self) -> None:
+        """Send pending requests and stop the sender threads; later requests
+        fall back to single calls."""
+        with self._lock:
+            self._closed = True
+        self.flush()
+        self._senders.shutdown(wait=True)
+
+    def _submit(self, content: str) -> "Future[Optional[Set[TopicCategory]]]":
+        future: "Future[Optional[Set[TopicCategory]]]" = Future()
+        batch = None
+        with self._lock:
+            self.stats["requests"] += 1
+            if self._closed:
+                future.set_result(None)
+                return future
+            self._pending.append((content, future))
+            if len(self._pending) >= self.max_batch_size:
+                batch = self._take_pending_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch is not None:
+            # Send off the caller's thread so event-loop callers never block
+            try:
+                self._senders.submit(self._send, batch)
+            except RuntimeError:
+                # Closed meanwhile: every caller makes its own call
+                for _, pending in batch:
+                    pending.set_result(None)
+        return future
+
+    def _take_pending(self) -> List[Tuple[str, "Future[Optional[Set[TopicCategory]]]"]]:
+        with self._lock:
+            return self._take_pending_locked()
+
+    def _take_pending_locked(
+        self,
+    ) -> List[Tuple[str, "Future[Optional[Set[TopicCategory]]]"]]:
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _send(
+        self, batch: List[Tuple[str, "Future[Optional[Set[TopicCategory]]]"]]
+    ) -> None:
+        if not batch:
+            return
+        if len(batch) == 1:
+            # A lone item uses the single-item prompt (and its cache entries)
+            batch[0][1].set_result(None)
+            return
+
+        results: Dict[int, Set[TopicCategory]] = {}
+        try:
+            # Runs on a timer or sender thread, so the span is a root of its own
+            with span("classify batch", "broadcast", items=len(batch)):
+                response = self.ai_provider.generate_response(
+                    messages=_batch_analysis_messages(
+                        [content for content, _ in batch]
+                    ),
+                    model=self.model,
+                    temperature=self.temperature,
+                )
+            results = _parse_batch_categories(response, len(batch))
+        except Exception as e:
+            logging.warning(
+                "Batch classification of %s items failed: %s", len(batch), e
+            )
+
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["fallbacks"] += len(batch) - len(results)
+        for index, (_, future) in enumerate(batch):
+            future.set_result(results.get(index))
+
+    def _classify_one(self, content: str) -> Set[TopicCategory]:
+        response = self.ai_provider.generate_response(
+            messages=_analysis_messages(content),
+            model=self.model,
+            temperature=self.temperature,
+        )
+        return _parse_categories(response)
+
+
+class _Mailbox:
+    """
+    Serial delivery queue for one recipient. At most one drain task per
+    recipient runs on the executor at a time, so messages reach each agent
+    in broadcast order while different recipients are served concurrently.
+    Each message is delivered in the context of the broadcast that queued
+    it, so its span and call labels follow that broadcast even when an
+    earlier broadcast's drain delivers it.
+    """
+
+    def __init__(self, agent: AIAgent, executor: Executor):
+        self.agent = agent
+        self.executor = executor
+        self._queue: Deque[
+            Tuple[Dict[str, str], "Future[None]", contextvars.Context]
+        ] = deque()
+        self._lock = threading.Lock()
+        self._draining = False
+
+    def put(self, message: Dict[str, str]) -> "Future[None]":
+        future: "Future[None]" = Future()
+        entry = (message, future, contextvars.copy_context())
+        with self._lock:
+            self._queue.append(entry)
+            if self._draining:
+                return future
+            self._draining = True
+        try:
+            self.executor.submit(self._drain)
+        except RuntimeError as e:
+            with self._lock:
+                self._draining = False
+                self._queue.remove(entry)
+            future.set_exception(e)
+        return future
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._draining = False
+                    return
+                message, future, context = self._queue.popleft()
+            context.run(self._deliver, message, future)
+
+    def _deliver(self, message: Dict[str, str], future: "Future[None]") -> None:
+        try:
+            with span(f"receive {self.agent.name}", "deliver"):
+                self.agent.receive_message(message)
+            future.set_result(None)
+        except Exception as e:
+            future.set_exception(e)
+
+
+# Report sections in document order
+REPORT_SECTIONS = [
+    "Business Analysis",
+    "Technical Assessment",
+    "Architecture & Design",
+    "Implementation & DevOps",
+    "Project Management",
+]
+
+REPORT_NEXT_STEPS = (
+    "\n## Next Steps\n\n"
+    "1. Review and approve proposed solutions\n"
+    "2. Define implementation timeline\n"
+    "3. Allocate resources\n"
+    "4. Begin implementation phase\n\n"
+)
+
+
+def _report_section(agent: AIAgent) -> Optional[Tuple[str, str]]:
+    """Return the (section, entry heading) an agent's response is filed under."""
+    if "Business Analyst" in agent.name:
+        return "Business Analysis", "Business Analysis"
+    if "IT Consultant" in agent.name:
+        return "Technical Assessment", "Technical Assessment"
+    if "Solution Architect" in agent.name or "Tech Lead" in agent.name:
+        return "Architecture & Design", f"{agent.name} Assessment"
+    if "DevOps Lead" in agent.name:
+        return "Implementation & DevOps", "DevOps Strategy"
+    if "Project Manager" in agent.name:
+        return "Project Management", "Project Planning"
+    return None
+
+
+class ReportWriter:
+    """
+    Collates agent responses into the consultancy report, writing it to
+    ``outputs`` section by section. A section is written as soon as every
+    agent filed under it (and under the sections before it) has reported,
+    so readers see the report grow while later agents are still working.
+    """
+
+    def __init__(
+        self, agents: List[AIAgent], outputs: Iterable[TextIO] = (), header: str = ""
+    ) -> None:
+        # (agent, section, entry heading) for every agent that reports
+        self._entries: List[Tuple[AIAgent, str, str]] = []
+        for agent in agents:
+            section = _report_section(agent)
+            if section is not None:
+                self._entries.append((agent, section[0], section[1]))
+        self.agents = [agent for agent, _, _ in self._entries]
+        self.outputs = list(outputs)
+        self._parts: List[str] = []
+        self._finished: Set[str] = set()
+        self._next_section = 0
+        self._report: Optional[str] = None
+        self._lock = threading.Lock()
+        self._write(header + "# IT Consultancy Report\n\n## Executive Summary\n\n")
+
+    def agent_finished(self, agent_name: str) -> None:
+        """
+        Mark an agent's latest response as final and write any sections now
+        complete.
+        """
+        with self._lock:
+            self._finished.add(agent_name)
+            self._flush(final=False)
+
+    def finish(self) -> str:
+        """Write the remaining sections and return the full report."""
+        with self._lock:
+            if self._report is None:
+                self._flush(final=True)
+                self._write(REPORT_NEXT_STEPS)
+                self._report = "".join(self._parts)
+            return self._report
+
+    def _flush(self, final: bool) -> None:
+        while self._next_section < len(REPORT_SECTIONS):
+            title = REPORT_SECTIONS[self._next_section]
+            contributors = [
+                (agent, heading) for agent, section, heading in self._entries
+                if section == title
+            ]
+            if not final and any(
+                agent.name not in self._finished for agent, _ in contributors
+            ):
+                return
+            entries = [
+                f"### {heading}\n{agent.latest_response}"
+                for agent, heading in contributors
+                if getattr(agent, "latest_response", None)
+            ]
+            if entries:
+                self._write(f"## {title}\n\n" + "\n\n".join(entries) + "\n\n")
+            self._next_section += 1
+
+    def _write(self, text: str) -> None:
+        self._parts.append(text)
+        for output in self.outputs:
+            output.write(text)
+            output.flush()
+
+
 class CommunicationManager:
-    def __init__(self, agents: List[AIAgent], ai_provider):
-        self.agents = agents
-        self.messages: List[Dict[str, str]] = []
+    def __init__(
+        self,
+        agents: List[AIAgent],
+        ai_provider: AIModelProvider,
+        topic_keywords: Optional[Dict[TopicCategory, List[str]]] = None,
+        delivery_executor: Optional[Executor] = None,
+        delivery_timeout: Optional[float] = None,
+        classification_model: str = DEFAULT_CLASSIFICATION_MODEL,
+        classification_batcher: Optional[ClassificationBatcher] = None,
+        topic_router: Optional[TopicRouter] = None,
+        message_store: Optional[SQLiteMessageStore] = None,
+        session_id: Optional[str] = None,
+        history_window: Optional[int] = None,
+    ):
+        # In-memory history is the hot window of the most recent
+        # ``history_window`` messages (unbounded by default). With a
+        # message_store, every message is also persisted under session_id
+        # and history queries go to the store.
+        self.messages: List[Dict[str, Any]] = []
+        self._agent_message_ids: Dict[str, Deque[int]] = {}
+        self._next_message_id = 0
+        self._history_lock = threading.Lock()
+        self.history_window = history_window
+        self.message_store = message_store
+        self.session_id = session_id or uuid.uuid4().hex
+        if message_store is not None:
+            message_store.start_session(self.session_id)
+            # A resumed session continues after the ids it already holds
+            self._next_message_id = message_store.next_message_id(self.session_id)
         self.ai_provider = ai_provider
-        self.agent_topics = self._initialize_agent_topics()
+        self.topic_matcher = (
+            KeywordTopicMatcher(topic_keywords) if topic_keywords is not None
+            else DEFAULT_TOPIC_MATCHER
+        )
+        # Messages with no keyword hit go to the local router first, then to
+        # the LLM; a shared batcher folds concurrent LLM fallbacks into one call
+        self.topic_router = topic_router
+        self.classification_model = classification_model
+        self.classification_batcher = classification_batcher
+
+        # Routing index: topic -> names of subscribed agents. Agents with no
+        # topics (e.g. the Markdown Output Agent) never receive broadcasts.
+        self.agents: List[AIAgent] = []
+        self.agent_topics: Dict[str, Set[TopicCategory]] = {}
+        self._default_agent_topics = self._initialize_agent_topics()
+        self._topic_subscribers: Dict[TopicCategory, Set[str]] = {
+            topic: set() for topic in TopicCategory
+        }
+        self._agents_by_name: Dict[str, AIAgent] = {}
+        self._registration_order: Dict[str, int] = {}
+        self._registrations = 0
+        self._routing_lock = threading.Lock()
+
+        # Optional concurrent fan-out: each recipient gets a mailbox drained on
+        # the executor; delivery_timeout bounds how long a broadcast waits
+        self.delivery_executor = delivery_executor
+        self.delivery_timeout = delivery_timeout
+        self._mailboxes: Dict[str, _Mailbox] = {}
+
+        for agent in agents:
+            self.register_agent(agent)
 
     def _initialize_agent_topics(self) -> Dict[str, Set[TopicCategory]]:
         """Initialize which topics each agent is interested in."""
         return {
             "AI Business Analyst": {
-                TopicCategory.BUSINESS, 
+                TopicCategory.BUSINESS,
                 TopicCategory.PROJECT_MANAGEMENT
             },
             "AI IT Consultant": {
-                TopicCategory.TECHNICAL, 
-                TopicCategory.SECURITY, 
+                TopicCategory.TECHNICAL,
+                TopicCategory.SECURITY,
                 TopicCategory.BUSINESS
             },
             "AI Solution Architect": {
-                TopicCategory.ARCHITECTURE, 
-                TopicCategory.TECHNICAL, 
+                TopicCategory.ARCHITECTURE,
+                TopicCategory.TECHNICAL,
                 TopicCategory.SECURITY
             },
             "AI Project Manager": {
-                TopicCategory.PROJECT_MANAGEMENT, 
+                TopicCategory.PROJECT_MANAGEMENT,
                 TopicCategory.BUSINESS
             },
             "AI DevOps Lead": {
-                TopicCategory.DEVOPS, 
-                TopicCategory.INFRASTRUCTURE, 
+                TopicCategory.DEVOPS,
+                TopicCategory.INFRASTRUCTURE,
                 TopicCategory.SECURITY
             },
             "AI Tech Lead": {
-                TopicCategory.DEVELOPMENT, 
-                TopicCategory.TECHNICAL, 
+                TopicCategory.DEVELOPMENT,
+                TopicCategory.TECHNICAL,
                 TopicCategory.ARCHITECTURE
             },
             "AI Markdown Output Agent": set()  # Receives final compiled output only
         }
 
+    def register_agent(
+        self, agent: AIAgent, topics: Optional[Set[TopicCategory]] = None
+    ) -> None:
+        """
+        Add an agent to the roster, subscribing it to ``topics`` (by default
+        the topics configured for its name). Re-registering a name replaces
+        the previous agent.
+        """
+        if topics is None:
+            topics = self._default_agent_topics.get(agent.name, set())
+        with self._routing_lock:
+            self._remove_agent(agent.name)
+            self.agents.append(agent)
+            self._agents_by_name[agent.name] = agent
+            self._registration_order[agent.name] = self._registrations
+            self._registrations += 1
+            self.agent_topics[agent.name] = set(topics)
+            for topic in topics:
+                self._topic_subscribers[topic].add(agent.name)
+
+    def unregister_agent(self, agent_name: str) -> None:
+        """
+        Remove an agent from the roster and routing index.
+        """
+        with self._routing_lock:
+            self._remove_agent(agent_name)
+
+    def _remove_agent(self, agent_name: str) -> None:
+        agent = self._agents_by_name.pop(agent_name, None)
+        if agent is None:
+            return
+        self.agents.remove(agent)
+        del self._registration_order[agent_name]
+        self._mailboxes.pop(agent_name, None)
+        for topic in self.agent_topics.pop(agent_name, set()):
+            self._topic_subscribers[topic].discard(agent_name)
+
+    def _match_keywords(self, content: str) -> Set[TopicCategory]:
+        """
+        Determine topics from keyword matches alone.
+        """
+        return self.topic_matcher.match(content)
+
     def _analyze_message_content(self, content: str) -> Set[TopicCategory]:
         """
         Analyze message content to determine relevant topics.
         Uses keyword matching and potentially AI analysis for complex content.
         """
-        topics = set()
-
-        # Keywords for each category
-        keywords = {
-            TopicCategory.BUSINESS: [
-                "business", "cost", "roi", "stakeholder", "requirement", 
-                "process", "workflow", "budget"
-            ],
-            TopicCategory.TECHNICAL: [
-                "technical", "technology", "system", "software", "database", 
-                "api", "integration"
-            ],
-            TopicCategory.SECURITY: [
-                "security", "authentication", "authorization", "encryption", 
-                "vulnerability", "threat"
-            ],
-            TopicCategory.INFRASTRUCTURE: [
-                "infrastructure", "cloud", "server", "network", "hosting", 
-                "scaling", "deployment"
-            ],
-            TopicCategory.DEVELOPMENT: [
-                "development", "coding", "programming", "testing", "git", 
-                "version control", "code review"
-            ],
-            TopicCategory.PROJECT_MANAGEMENT: [
-                "timeline", "milestone", "resource", "planning", "coordination", 
-                "schedule", "risk"
-            ],
-            TopicCategory.ARCHITECTURE: [
-                "architecture", "design pattern", "system design", "scalability", 
-                "microservice", "component"
-            ],
-            TopicCategory.DEVOPS: [
-                "devops", "ci/cd", "pipeline", "automation", "monitoring", 
-                "deployment", "container"
-            ]
-        }
-
-        # Check for keywords in content
-        content_lower = content.lower()
-        for category, category_keywords in keywords.items():
-            if any(keyword in content_lower for keyword in category_keywords):
-                topics.add(category)
+        topics = self._match_keywords(content) or self._route_locally(content)
 
-        # If no topics were identified through keywords, use AI analysis
+        # If no topics were identified locally, use AI analysis
         if not topics:
-            topics = self._ai_analyze_content(content)
+            with span("llm fallback", "broadcast"):
+                topics = self._ai_analyze_content(content)
 
+        annotate(topics=",".join(sorted(topic.value for topic in topics)))
         return topics
 
-    def _ai_analyze_content(self, content: str) -> Set[TopicCategory]:
+    async def _analyze_message_content_async(self, content: str) -> Set[TopicCategory]:
         """
-        Use AI to analyze content when keyword matching is insufficient.
+        Awaitable variant of ``_analyze_message_content``.
         """
-        prompt = f"""
-        Analyze the following content and categorize it into one or more of these categories:
-        - Business
-        - Technical
-        - Security
-        - Infrastructure
-        - Development
-        - Project Management
-        - Architecture
-        - DevOps
-
-        Content: {content}
+        topics = self._match_keywords(content) or self._route_locally(content)
+        if not topics:
+            with span("llm fallback", "broadcast"):
+                topics = await self._ai_analyze_content_async(content)
+        annotate(topics=",".join(sorted(topic.value for topic in topics)))
+        return topics
 
-        Return only the category names, separated by commas.
+    def _route_locally(self, content: str) -> Set[TopicCategory]:
         """
+        Topics from the local topic router, or an empty set when there is no
+        router or it is not confident enough.
+        """
+        if self.topic_router is None:
+            return set()
+        return self.topic_router.route(content) or set()
 
+    def _ai_analyze_content(self, content: str) -> Set[TopicCategory]:
+        """
+        Use AI to analyze content when keyword matching is insufficient.
+        """
         try:
+            if self.classification_batcher is not None:
+                return self.classification_batcher.classify(content)
             response = self.ai_provider.generate_response(
-                messages=[{"role": "user", "content": prompt}],
-                model="gpt-3.5-turbo",
+                messages=_analysis_messages(content),
+                model=self.classification_model,
                 temperature=0.3
             )
-
-            # Convert AI response to TopicCategory enum values
-            categories = set()
-            for category in response.split(','):
-                category = category.strip().lower().replace(' ', '_')
-                try:
-                    categories.add(TopicCategory(category))
-                except ValueError:
-                    logging.warning(f"Invalid category received from AI: {category}")
-
-            return categories
+            return _parse_categories(response)
         except Exception as e:
-            logging.error(f"Error in AI content analysis: {e}")
+            logging.error("Error in AI content analysis: %s", e)
             # Return empty set if AI analysis fails
             return set()
 
-    def _get_relevant_agents(self, topics: Set[TopicCategory], sender: AIAgent) -> List[AIAgent]:
+    async def _ai_analyze_content_async(self, content: str) -> Set[TopicCategory]:
         """
-        Determine which agents should receive the message based on topics.
+        Awaitable variant of ``_ai_analyze_content``.
         """
-        relevant_agents = []
-        for agent in self.agents:
-            # Skip the sender and Markdown Output Agent
-            if agent == sender or agent.name == "AI Markdown Output Agent":
-                continue
+        try:
+            if self.classification_batcher is not None:
+                return await self.classification_batcher.classify_async(content)
+            response = await self.ai_provider.generate_response_async(
+                messages=_analysis_messages(content),
+                model=self.classification_model,
+                temperature=0.3
+            )
+            return _parse_categories(response)
+        except Exception as e:
+            logging.error("Error in AI content analysis: %s", e)
+            return set()
 
-            # Check if agent's topics overlap with message topics
-            agent_topics = self.agent_topics.get(agent.name, set())
-            if agent_topics & topics:  # Set intersection
-                relevant_agents.append(agent)
+    def _get_relevant_agents(
+        self, topics: Set[TopicCategory], sender: Optional[AIAgent]
+    ) -> List[AIAgent]:
+        """
+        Determine which agents should receive the message based on topics:
+        the union of each topic's subscribers, minus the sender, in
+        registration order.
+        """
+        with self._routing_lock:
+            names: Set[str] = set()
+            for topic in topics:
+                names |= self._topic_subscribers.get(topic, set())
+            if sender is not None:
+                names.discard(sender.name)
+            return [
+                self._agents_by_name[name]
+                for name in sorted(names, key=self._registration_order.__getitem__)
+            ]
 
-        return relevant_agents
+    def broadcast_message(self, sender: AIAgent, content: str) -> None:
+        """
+        Intelligently broadcast message to relevant agents based on content
+        analysis.
+        """
+        with span(f"broadcast {sender.name}", "broadcast", chars=len(content)):
+            # Analyze message content
+            with span("classify", "broadcast"):
+                topics = self._analyze_message_content(content)
+            with span("route", "broadcast"):
+                message, relevant_agents = self._route(sender, content, topics)
 
-    def broadcast_message(self, sender: AIAgent, content: str):
+            with span("deliver", "broadcast", recipients=len(relevant_agents)):
+                executor = self.delivery_executor
+                if executor is None:
+                    self._deliver_serially(message, relevant_agents)
+                    return
+                deliveries = self._enqueue_deliveries(
+                    executor, message, relevant_agents
+                )
+                wait(list(deliveries.values()), timeout=self.delivery_timeout)
+                self._log_deliveries(message, deliveries)
+
+    async def broadcast_message_async(self, sender: AIAgent, content: str) -> None:
         """
-        Intelligently broadcast message to relevant agents based on content analysis.
+        Awaitable variant of ``broadcast_message``; topic analysis and
+        concurrent delivery are awaited instead of blocking the loop.
         """
-        message = {'role': 'assistant', 'content': content, 'sender': sender.name}
-        self.messages.append(message)
+        with span(f"broadcast {sender.name}", "broadcast", chars=len(content)):
+            with span("classify", "broadcast"):
+                topics = await self._analyze_message_content_async(content)
+            with span("route", "broadcast"):
+                message, relevant_agents = self._route(sender, content, topics)
+
+            with span("deliver", "broadcast", recipients=len(relevant_agents)):
+                executor = self.delivery_executor
+                if executor is None:
+                    self._deliver_serially(message, relevant_agents)
+                    return
+                deliveries = self._enqueue_deliveries(
+                    executor, message, relevant_agents
+                )
+                if deliveries:
+                    await asyncio.wait(
+                        [asyncio.wrap_future(future) for future in deliveries.values()],
+                        timeout=self.delivery_timeout,
+                    )
+                self._log_deliveries(message, deliveries)
 
-        # Analyze message content
-        topics = self._analyze_message_content(content)
-        logging.info(f"Message topics identified: {[topic.value for topic in topics]}")
+    def _route(
+        self, sender: AIAgent, content: str, topics: Set[TopicCategory]
+    ) -> Tuple[Dict[str, str], List[AIAgent]]:
+        # Routing runs for every message; skip building the log arguments
+        # when INFO is off
+        log_routing = logging.getLogger().isEnabledFor(logging.INFO)
+        if log_routing:
+            logging.info(
+                "Message topics identified: %s", [topic.value for topic in topics]
+            )
 
         # Get relevant agents
         relevant_agents = self._get_relevant_agents(topics, sender)
-        logging.info(f"Relevant agents for message: {[agent.name for agent in relevant_agents]}")
+        if log_routing:
+            logging.info(
+                "Relevant agents for message: %s",
+                [agent.name for agent in relevant_agents],
+            )
 
+        record = self._record_message(sender, content, topics, relevant_agents)
+        message = {
+            'role': 'assistant',
+            'content': content,
+            'sender': sender.name,
+            'topics': record['topics'],
+        }
+        return message, relevant_agents
+
+    def _deliver_serially(
+        self, message: Dict[str, str], relevant_agents: List[AIAgent]
+    ) -> None:
         # Broadcast to relevant agents
         for agent in relevant_agents:
             try:
-                agent.receive_message(message)
-                logging.info(f"Message from {sender.name} sent to {agent.name}")
+                with span(f"receive {agent.name}", "deliver"):
+                    agent.receive_message(message)
+                logging.info(
+                    "Message from %s sent to %s", message['sender'], agent.name
+                )
             except Exception as e:
-                logging.error(f"Error sending message to {agent.name}: {e}")
-
-    def review_and_collate_responses(self) -> str:
-        """
-        Aggregate and organize responses from all agents into a coherent output.
-        """
-        sections = {
-            "Business Analysis": [],
-            "Technical Assessment": [],
-            "Architecture & Design": [],
-            "Implementation & DevOps": [],
-            "Project Management": [],
-        }
+                logging.error("Error sending message to %s: %s", agent.name, e)
 
-        # Categorize responses into sections
-        for agent in self.agents:
-            if not hasattr(agent, 'latest_response') or not agent.latest_response:
-                continue
+    def _enqueue_deliveries(
+        self,
+        executor: Executor,
+        message: Dict[str, str],
+        relevant_agents: List[AIAgent],
+    ) -> Dict[str, "Future[None]"]:
+        with self._routing_lock:
+            mailboxes = [
+                self._mailboxes.setdefault(agent.name, _Mailbox(agent, executor))
+                for agent in relevant_agents
+            ]
+        return {mailbox.agent.name: mailbox.put(message) for mailbox in mailboxes}
 
-            response = agent.latest_response
-            if "Business Analyst" in agent.name:
-                sections["Business Analysis"].append(
-                    f"### Business Analysis\n{response}"
+    def _log_deliveries(
+        self, message: Dict[str, str], deliveries: Dict[str, "Future[None]"]
+    ) -> None:
+        for agent_name, future in deliveries.items():
+            if not future.done():
+                # The mailbox keeps the message queued, so order is preserved
+                logging.warning(
+                    "Delivery from %s to %s timed out after %ss; "
+                    "continuing in background",
+                    message['sender'], agent_name, self.delivery_timeout,
                 )
-            elif "IT Consultant" in agent.name:
-                sections["Technical Assessment"].append(
-                    f"### Technical Assessment\n{response}"
+            elif future.exception() is not None:
+                logging.error(
+                    "Error sending message to %s: %s", agent_name, future.exception()
                 )
-            elif "Solution Architect" in agent.name or "Tech Lead" in agent.name:
-                sections["Architecture & Design"].append(
-                    f"### {agent.name} Assessment\n{response}"
+            else:
+                logging.info(
+                    "Message from %s sent to %s", message['sender'], agent_name
                 )
-            elif "DevOps Lead" in agent.name:
-                sections["Implementation & DevOps"].append(
-                    f"### DevOps Strategy\n{response}"
-                )
-            elif "Project Manager" in agent.name:
-                sections["Project Management"].append(
-                    f"### Project Planning\n{response}"
-                )
-
-        # Compile final report
-        final_report = "# IT Consultancy Report\n\n"
-        final_report += "## Executive Summary\n\n"
 
-        # Add sections with content
-        for section_title, content_list in sections.items():
-            if content_list:
-                final_report += f"## {section_title}\n\n"
-                final_report += "\n\n".join(content_list) + "\n\n"
+    def _record_message(
+        self,
+        sender: AIAgent,
+        content: str,
+        topics: Set[TopicCategory],
+        recipients: List[AIAgent],
+    ) -> Dict[str, Any]:
+        """
+        Store the message with the topics and recipients computed at broadcast
+        time, and index it under every agent involved, so history queries
+        never re-classify content.
+        """
+        with self._history_lock:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+            record: Dict[str, Any] = {
+                'id': message_id,
+                'role': 'assistant',
+                'content': content,
+                'sender': sender.name,
+                'topics': sorted(topic.value for topic in topics),
+                'recipients': [agent.name for agent in recipients],
+            }
+            self.messages.append(record)
+            for agent_name in [sender.name] + record['recipients']:
+                ids = self._agent_message_ids.setdefault(agent_name, deque())
+                ids.append(message_id)
+            self._evict_cold_messages()
+        if self.message_store is not None:
+            self.message_store.add(self.session_id, record)
+        return record
 
-        final_report += "\n## Next Steps\n\n"
-        final_report += "1. Review and approve proposed solutions\n"
-        final_report += "2. Define implementation timeline\n"
-        final_report += "3. Allocate resources\n"
-        final_report += "4. Begin implementation phase\n\n"
+    def _evict_cold_messages(self) -> None:
+        if self.history_window is None or len(self.messages) <= self.history_window:
+            return
+        evicted = self.messages[:len(self.messages) - self.history_window]
+        del self.messages[:len(evicted)]
+        # Ids are indexed in increasing order, so evicted ids sit at the front
+        for record in evicted:
+            for agent_name in [record['sender']] + record['recipients']:
+                ids = self._agent_message_ids[agent_name]
+                ids.popleft()
+                if not ids:
+                    del self._agent_message_ids[agent_name]
 
-        return final_report
+    def review_and_collate_responses(
+        self, outputs: Optional[List[TextIO]] = None
+    ) -> str:
+        """
+        Aggregate and organize responses from all agents into a coherent output.
+        The report is also written to each stream in ``outputs``.
+        """
+        return ReportWriter(self.agents, outputs or ()).finish()
 
-    def get_message_history(self) -> List[Dict[str, str]]:
+    def get_message_history(self) -> List[Dict[str, Any]]:
         """
-        Return the complete message history.
+        Return the complete message history (from the message store, if any).
         """
+        if self.message_store is not None:
+            return self.message_store.messages(session_id=self.session_id)
         return self.messages
 
-    def get_agent_interactions(self, agent_name: str) -> List[Dict[str, str]]:
+    def get_agent_interactions(self, agent_name: str) -> List[Dict[str, Any]]:
         """
-        Get all messages related to a specific agent.
+        Get all messages sent or received by a specific agent.
         """
-        return [
-            msg for msg in self.messages 
-            if msg.get('sender') == agent_name or 
-            agent_name in self._get_relevant_agents(
-                self._analyze_message_content(msg['content']),
-                None
+        if self.message_store is not None:
+            return self.message_store.agent_interactions(
+                agent_name, session_id=self.session_id
             )
-        ]
\ No newline at end of file
+        with self._history_lock:
+            if not self.messages:
+                return []
+            first_id = self.messages[0]['id']
+            return [
+                self.messages[i - first_id]
+                for i in self._agent_message_ids.get(agent_name, ())
+            ]
@@ -0,0 +1,266 @@
+# context_window.py
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from agentx.ai_model_provider import AIModelProvider
+
+# Per-message framing overhead charged by the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """
+    Counts tokens locally. Uses tiktoken's encoding for the model when the
+    optional ``tiktoken`` package is installed, otherwise a word/punctuation
+    approximation that is close enough for budgeting.
+    """
+
+    def __init__(self, model: str = "gpt-4"):
+        self.model = model
+        self._encoding: Any = None
+        self._encoding_loaded = False
+
+    def count(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text))
+        return len(_WORD_PIECES.findall(text))
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        return self.count(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+    def _get_encoding(self) -> Any:
+        if not self._encoding_loaded:
+            self._encoding_loaded = True
+            try:
+                import tiktoken
+
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except Exception:
+                # Not installed, unknown model, or no cached vocabulary
+                self._encoding = None
+        return self._encoding
+
+
+class TrimPolicy(ABC):
+    """Chooses which messages survive when a history exceeds its token budget."""
+
+    @abstractmethod
+    def select(
+        self, messages: List[Dict[str, Any]], token_counts: List[int], budget: int
+    ) -> List[int]:
+        """Return the sorted indices of the messages to keep.
+
+        Args:
+            messages (List[Dict[str, Any]]): The agent's history, oldest first.
+            token_counts (List[int]): Token count of each message.
+            budget (int): Maximum total tokens to keep.
+        """
+        pass
+
+
+class RecentMessagesPolicy(TrimPolicy):
+    """Keep the system prompt plus the longest run of recent messages that fits."""
+
+    def select(
+        self, messages: List[Dict[str, Any]], token_counts: List[int], budget: int
+    ) -> List[int]:
+        keep: List[int] = []
+        used = 0
+        start = 0
+        if messages and messages[0].get("role") == "system":
+            keep.append(0)
+            used = token_counts[0]
+            start = 1
+
+        recent: List[int] = []
+        for index in range(len(messages) - 1, start - 1, -1):
+            # The newest message is always kept, even if it alone is over budget
+            if recent and used + token_counts[index] > budget:
+                break
+            recent.append(index)
+            used += token_counts[index]
+        return keep + list(reversed(recent))
+
+
+class TopicRelevancePolicy(TrimPolicy):
+    """
+    Drop received broadcasts that are least relevant to the agent's topics
+    first (oldest first among equals), then fall back to keeping the most
+    recent messages if the history is still over budget.
+    """
+
+    def __init__(self, topics: Iterable[Any]):
+        self.topics = {getattr(topic, "value", topic) for topic in topics}
+
+    def select(
+        self, messages: List[Dict[str, Any]], token_counts: List[int], budget: int
+    ) -> List[int]:
+        total = sum(token_counts)
+        broadcasts = [
+            index for index, message in enumerate(messages[:-1]) if "sender" in message
+        ]
+        broadcasts.sort(key=lambda index: (self._relevance(messages[index]), index))
+
+        dropped = set()
+        for index in broadcasts:
+            if total <= budget:
+                break
+            dropped.add(index)
+            total -= token_counts[index]
+
+        keep = [index for index in range(len(messages)) if index not in dropped]
+        if total <= budget:
+            return keep
+        fallback = RecentMessagesPolicy().select(
+            [messages[i] for i in keep], [token_counts[i] for i in keep], budget
+        )
+        return [keep[i] for i in fallback]
+
+    def _relevance(self, message: Dict[str, Any]) -> int:
+        return len(self.topics.intersection(message.get("topics", ())))
+
+
+def trim_history(
+    messages: List[Dict[str, Any]],
+    token_counts: List[int],
+    budget: int,
+    policy: Optional[TrimPolicy] = None,
+) -> List[int]:
+    """Apply ``policy`` (default: most recent messages) and return kept indices."""
+    if sum(token_counts) <= budget:
+        return list(range(len(messages)))
+    keep = (policy or RecentMessagesPolicy()).select(messages, token_counts, budget)
+    logging.debug(
+        "Trimmed %s messages to fit %s tokens", len(messages) - len(keep), budget
+    )
+    return keep
+
+
+@dataclass
+class CompactionPlan:
+    """Messages selected for folding into an agent's running summary."""
+
+    indices: List[int]
+    previous_summary: Optional[str]
+    new_messages: List[Dict[str, Any]]
+
+
+class HistoryCompactor:
+    """
+    Rolling summarization of an agent's received broadcasts.
+
+    Once the history passes ``threshold_tokens``, broadcasts older than the
+    ``keep_recent`` most recent messages are folded into a single summary
+    message by a cheap model. Later compactions only send the previous
+    summary plus the newly aged broadcasts, so the summary is updated
+    incrementally instead of being rebuilt from the full history.
+    """
+
+    SUMMARY_HEADER = "Summary of earlier messages from the team:\n"
+
+    def __init__(
+        self,
+        ai_provider: AIModelProvider,
+        model: str = "gpt-3.5-turbo",
+        threshold_tokens: int = 3000,
+        keep_recent: int = 4,
+        temperature: float = 0.2,
+    ):
+        self.ai_provider = ai_provider
+        self.model = model
+        self.threshold_tokens = threshold_tokens
+        self.keep_recent = keep_recent
+        self.temperature = temperature
+
+    def plan(
+        self, messages: List[Dict[str, Any]], total_tokens: int
+    ) -> Optional[CompactionPlan]:
+        """Return what to compact, or None if the history is under the threshold."""
+        if total_tokens <= self.threshold_tokens:
+            return None
+        cutoff = len(messages) - self.keep_recent
+        indices = [
+            index for index, message in enumerate(messages[:max(cutoff, 0)])
+            if "sender" in message
+        ]
+        if not indices:
+            return None
+
+        previous = None
+        summary_index = next(
+            (
+                index for index, message in enumerate(messages)
+                if message.get("summary")
+            ),
+            None,
+        )
+        if summary_index is not None:
+            previous = messages[summary_index]["content"][len(self.SUMMARY_HEADER):]
+            indices = sorted(indices + [summary_index])
+        return CompactionPlan(
+            indices, previous, [messages[i] for i in indices if i != summary_index]
+        )
+
+    def summarize(self, plan: CompactionPlan) -> Optional[str]:
+        try:
+            return self.ai_provider.generate_response(
+                messages=self._build_prompt(plan),
+                model=self.model,
+                temperature=self.temperature,
+            )
+        except Exception as e:
+            logging.warning("History compaction failed, keeping full history: %s", e)
+            return None
+
+    async def summarize_async(self, plan: CompactionPlan) -> Optional[str]:
+        try:
+            return await self.ai_provider.generate_response_async(
+                messages=self._build_prompt(plan),
+                model=self.model,
+                temperature=self.temperature,
+            )
+        except Exception as e:
+            logging.warning("History compaction failed, keeping full history: %s", e)
+            return None
+
+    def summary_message(self, summary: str) -> Dict[str, Any]:
+        return {
+            "role": "system",
+            "content": self.SUMMARY_HEADER + summary,
+            "summary": True,
+        }
+
+    def _build_prompt(self, plan: CompactionPlan) -> List[Dict[str, str]]:
+        new_content = "\n\n".join(
+            f"[{message.get('sender', message['role'])}]\n{message['content']}"
+            for message in plan.new_messages
+        )
+        if plan.previous_summary:
+            instruction = (
+                "Update the running summary below with the new messages. Keep every "
+                "decision, requirement, risk and open question; drop repetition.\n\n"
+                f"Current summary:\n{plan.previous_summary}\n\n"
+                f"New messages:\n{new_content}"
+            )
+        else:
+            instruction = (
+                "Summarize the following messages from other consultants. Keep every "
+                "decision, requirement, risk and open question; drop repetition.\n\n"
+                f"Messages:\n{new_content}"
+            )
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You maintain concise running summaries of team discussions."
+                ),
+            },
+            {"role": "user", "content": instruction},
+        ]
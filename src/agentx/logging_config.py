@@ -0,0 +1,89 @@
+# logging_config.py
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from pathlib import Path
+from typing import List, Optional, Union
+
+DEFAULT_LOG_PATH = "ai_consultancy.log"
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Rotate at 10 MB, keeping five old files
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# The listener draining the queue of the current configuration, if any
+_listener: Optional[logging.handlers.QueueListener] = None
+_handlers: List[logging.Handler] = []
+
+
+def configure_logging(
+    path: Optional[Union[str, Path]] = DEFAULT_LOG_PATH,
+    level: int = logging.INFO,
+    fmt: str = DEFAULT_FORMAT,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    non_blocking: bool = True,
+    console: bool = True,
+) -> logging.Logger:
+    """
+    Configure the root logger for an entry point: a rotating log file at
+    ``path`` (None for none) plus the console.
+
+    With ``non_blocking`` the root logger only gets a ``QueueHandler``, and a
+    ``QueueListener`` thread does the formatting and disk I/O, so logging in
+    the broadcast hot path never waits on the file. Call ``shutdown_logging``
+    (also run at exit) to flush the queue. Reconfiguring replaces the
+    previous setup.
+    """
+    global _listener
+    shutdown_logging()
+
+    formatter = logging.Formatter(fmt)
+    handlers: List[logging.Handler] = []
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        ))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    if non_blocking:
+        log_queue: queue.Queue = queue.Queue(-1)
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        root.addHandler(queue_handler)
+        # The file and console handlers belong to the listener, but are
+        # still closed on shutdown
+        _handlers.extend([queue_handler, *handlers])
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+        _handlers.extend(handlers)
+    return root
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and detach the handlers configure_logging added."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    root = logging.getLogger()
+    for handler in _handlers:
+        root.removeHandler(handler)
+        handler.close()
+    _handlers.clear()
+
+
+atexit.register(shutdown_logging)
@@ -1,35 +1,271 @@
 # main.py
 
+import argparse
 import logging
-from providers.openai_provider import OpenAIProvider
-from communication_manager import CommunicationManager
-from agents.business_analyst_agent import BusinessAnalystAgent
-from agents.it_consultant_agent import ITConsultantAgent
-from agents.solution_architect_agent import SolutionArchitectAgent
-from agents.project_manager_agent import ProjectManagerAgent
-from agents.devops_lead_agent import DevOpsLeadAgent
-from agents.tech_lead_agent import TechLeadAgent
-from agents.markdown_output_agent import MarkdownOutputAgent
-
-def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler("ai_consultancy.log"),
-            logging.StreamHandler()
-        ]
-    )
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+from agentx.agents.business_analyst_agent import BusinessAnalystAgent
+from agentx.agents.devops_lead_agent import DevOpsLeadAgent
+from agentx.agents.it_consultant_agent import ITConsultantAgent
+from agentx.agents.markdown_output_agent import MarkdownOutputAgent
+from agentx.agents.project_manager_agent import ProjectManagerAgent
+from agentx.agents.solution_architect_agent import SolutionArchitectAgent
+from agentx.agents.tech_lead_agent import TechLeadAgent
+from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider
+from agentx.batch import Brief, load_briefs, run_batch
+from agentx.checkpoint import RunCheckpoint
+from agentx.communication_manager import (
+    ClassificationBatcher,
+    CommunicationManager,
+    ReportWriter,
+    TopicRouter,
+    VectorTopicRouter,
+)
+from agentx.context_window import HistoryCompactor, TopicRelevancePolicy
+from agentx.logging_config import configure_logging
+from agentx.message_store import SQLiteMessageStore
+# Call labels and annotations from the agents and provider layers live in
+# agentx.metrics' context variables, so every module is imported by
+# package name: a script-style import would load a second copy
+from agentx.metrics import (
+    HistogramSink,
+    InstrumentedProvider,
+    JSONLTraceSink,
+    MetricsRecorder,
+    MetricsSink,
+    PrometheusSink,
+)
+from agentx.pipeline import Pipeline, PipelineError, PipelineStage, StageResult
+from agentx.providers.cached_provider import CachingProvider
+from agentx.providers.coalescing_provider import CoalescingProvider
+from agentx.providers.openai_provider import OpenAIProvider
+from agentx.providers.rate_limited_provider import RateLimitedProvider
+from agentx.tracing import TracedProvider, trace_to
+
+
+# Rotated at 10 MB (see agentx.logging_config)
+LOG_PATH = "ai_consultancy.log"
+
+# Only near-deterministic calls (classification) are coalesced, like the
+# response cache; sampled agent turns are always sent, so identical briefs
+# in a batch still get independent reports
+COALESCE_MAX_TEMPERATURE = 0.3
+
+# On-disk tier for cached low-temperature calls (topic classification)
+RESPONSE_CACHE_PATH = ".agentx_cache/responses.sqlite3"
+
+# Each run checkpoints finished stages here so a failed run can be resumed
+RUNS_DIRECTORY = ".agentx_runs"
+
+# Call metrics: Prometheus text (rewritten at exit; also served with
+# --metrics-port) and a JSON-lines trace of every provider call
+METRICS_PROMETHEUS_PATH = ".agentx_metrics/metrics.prom"
+METRICS_TRACE_PATH = ".agentx_metrics/calls.jsonl"
+
+# Batch mode: one report per brief plus results.jsonl and summary.json
+BATCH_OUTPUT_DIRECTORY = "batch_results"
+BATCH_WORKERS = 4
+
+# Persistent broadcast history; each process keeps only a bounded hot window
+# of recent messages in memory
+MESSAGE_STORE_PATH = ".agentx_cache/messages.sqlite3"
+HISTORY_WINDOW = 200
+
+# Client-side quota shared by every agent in the process; set to the API
+# key's limits so parallel consultations slow down instead of failing on 429s
+REQUESTS_PER_MINUTE = 500
+TOKENS_PER_MINUTE = 200000
+
+# Per-agent prompt budget; broadcasts least relevant to an agent's topics are
+# trimmed first once its history grows past it
+CONTEXT_TOKEN_BUDGET = 6000
+
+# Older broadcasts are folded into a running summary past this size, keeping
+# per-turn prompts roughly constant without losing context for later stages
+COMPACTION_THRESHOLD_TOKENS = 3000
+
+# Client input
+CLIENT_INPUT = (
+    "We are facing issues with data security and need to improve our system's "
+    "scalability."
+)
+
+# Each stage starts once the stages it lists as inputs have broadcast their
+# responses; independent stages run in parallel
+CONSULTATION_PIPELINE = Pipeline([
+    # Business Analyst processes the client input
+    PipelineStage("business_analysis", "AI Business Analyst"),
+    # IT Consultant and Solution Architect only need the business analysis
+    PipelineStage(
+        "it_assessment", "AI IT Consultant", inputs=["business_analysis"]
+    ),
+    PipelineStage(
+        "solution_design", "AI Solution Architect", inputs=["business_analysis"]
+    ),
+    # Tech Lead and DevOps Lead build on the proposed design
+    PipelineStage(
+        "technical_direction", "AI Tech Lead", inputs=["solution_design"]
+    ),
+    PipelineStage("devops_strategy", "AI DevOps Lead", inputs=["solution_design"]),
+    # Project Manager plans once every other stage has reported
+    PipelineStage(
+        "project_plan",
+        "AI Project Manager",
+        inputs=["it_assessment", "technical_direction", "devops_strategy"],
+    ),
+])
 
-def main():
-    setup_logging()
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    # Log records are queued and written to the rotating log file by a
+    # background thread, off the broadcast hot path
+    configure_logging(LOG_PATH, fmt="%(asctime)s - %(levelname)s - %(message)s")
     logging.info("Starting AI Consultancy Agents")
 
-    # Initialize AI provider
-    ai_provider = OpenAIProvider()
+    # Every provider call is recorded with its agent, stage, latency, queue
+    # wait, tokens and estimated cost
+    histograms = HistogramSink()
+    metrics_sinks: List[MetricsSink] = [
+        histograms,
+        PrometheusSink(METRICS_PROMETHEUS_PATH, port=args.metrics_port),
+        JSONLTraceSink(METRICS_TRACE_PATH),
+    ]
+
+    # Initialize AI provider (one pooled client and one rate limiter shared by
+    # every agent, with identical in-flight classifications coalesced); only
+    # topic classification goes through the response cache.
+    # With --trace, spans of the run (stages, agent turns, broadcasts and
+    # provider calls) are written as a Chrome trace when it finishes.
+    # The SDK's own retries are off: every HTTP request must take a limiter
+    # reservation, and 429s must reach the limiter's adaptive backoff
+    with trace_to(args.trace), MetricsRecorder(metrics_sinks) as recorder, \
+            OpenAIProvider(max_retries=0) as openai_provider, \
+            RateLimitedProvider(
+                TracedProvider(openai_provider),
+                requests_per_minute=REQUESTS_PER_MINUTE,
+                tokens_per_minute=TOKENS_PER_MINUTE,
+            ) as rate_limited_provider, \
+            CoalescingProvider(
+                rate_limited_provider, max_temperature=COALESCE_MAX_TEMPERATURE
+            ) as coalescing_provider, \
+            CachingProvider(
+                coalescing_provider, disk_path=RESPONSE_CACHE_PATH
+            ) as caching_provider, \
+            SQLiteMessageStore(MESSAGE_STORE_PATH) as message_store:
+        ai_provider = InstrumentedProvider(coalescing_provider, recorder)
+        classifier_provider = InstrumentedProvider(
+            caching_provider, recorder, component="classifier"
+        )
+        if args.batch:
+            run_batch_consultations(
+                args, ai_provider, classifier_provider, message_store
+            )
+        else:
+            run_single_consultation(
+                args, ai_provider, classifier_provider, message_store
+            )
+
+        print("\n--- Provider Calls ---")
+        print(histograms.summary_table())
+        logging.info("Classification cache stats: %s", caching_provider.stats)
+        logging.info(
+            "Rate limiter stats: %s, retries: %s",
+            rate_limited_provider.limiter.stats, rate_limited_provider.stats,
+        )
+        logging.info(
+            "Coalesced provider calls saved: %s", coalescing_provider.saved_calls
+        )
+
+    logging.info("AI Consultancy Agents interaction completed.")
+
+
+def run_single_consultation(
+    args: argparse.Namespace,
+    ai_provider: AIModelProvider,
+    classifier_provider: AIModelProvider,
+    message_store: SQLiteMessageStore,
+) -> None:
+    if args.resume:
+        checkpoint = RunCheckpoint.load(args.resume, RUNS_DIRECTORY)
+        client_input = checkpoint.client_input
+    else:
+        checkpoint = RunCheckpoint.create(CLIENT_INPUT, RUNS_DIRECTORY)
+        client_input = CLIENT_INPUT
+    logging.info("Run id: %s", checkpoint.run_id)
+
+    # The report is written to disk and stdout section by section as
+    # the agents behind each section finish
+    print("\n--- Final Report ---")
+    classification_batcher = ClassificationBatcher(classifier_provider)
+    with open("final_report.md", "w") as f:
+        try:
+            run_consultation(
+                ai_provider, client_input, classifier_provider,
+                report_outputs=[f, sys.stdout],
+                classification_batcher=classification_batcher,
+                topic_router=build_topic_router(),
+                message_store=message_store,
+                checkpoint=checkpoint,
+            )
+        except PipelineError as e:
+            logging.error(
+                "%s; completed stages are checkpointed. "
+                "Retry with: python main.py --resume %s",
+                e, checkpoint.run_id,
+            )
+            sys.exit(1)
+        finally:
+            classification_batcher.close()
+
+
+def run_batch_consultations(
+    args: argparse.Namespace,
+    ai_provider: AIModelProvider,
+    classifier_provider: AIModelProvider,
+    message_store: SQLiteMessageStore,
+) -> None:
+    # Every brief gets its own agents and message session; the provider
+    # chain, classification batcher and topic router are shared, so
+    # concurrent briefs pool their classification calls and rate limit
+    briefs = load_briefs(args.batch)
+    classification_batcher = ClassificationBatcher(classifier_provider)
+    topic_router = build_topic_router()
+    logging.info("Running %s briefs with %s workers", len(briefs), args.workers)
+
+    def run_brief(brief: Brief) -> str:
+        return run_consultation(
+            ai_provider, brief.text, classifier_provider,
+            classification_batcher=classification_batcher,
+            topic_router=topic_router,
+            message_store=message_store,
+        )
+
+    try:
+        report = run_batch(
+            briefs, run_brief, args.output_dir, max_workers=args.workers
+        )
+    finally:
+        classification_batcher.close()
+    logging.info("Batch results in %s:\n%s", args.output_dir, report.summary())
+    if report.failures:
+        sys.exit(1)
+
 
-    # Initialize agents
-    agents = [
+def build_topic_router() -> Optional[TopicRouter]:
+    # Local classification needs NumPy; without it every message that has no
+    # keyword hit goes to the LLM
+    try:
+        return VectorTopicRouter()
+    except ImportError:
+        logging.info("NumPy not installed; local topic routing disabled")
+        return None
+
+
+def build_agents(ai_provider: AIModelProvider) -> List[AIAgent]:
+    return [
         BusinessAnalystAgent(ai_provider=ai_provider),
         ITConsultantAgent(ai_provider=ai_provider),
         SolutionArchitectAgent(ai_provider=ai_provider),
@@ -39,63 +275,176 @@ def main():
         MarkdownOutputAgent(ai_provider=ai_provider),
     ]
 
-    # Initialize communication manager with AI provider
+
+def configure_context_windows(
+    agents: List[AIAgent], communication_manager: CommunicationManager
+) -> None:
+    # Summaries are low-temperature calls, so they share the classification
+    # cache
+    compactor = HistoryCompactor(
+        communication_manager.ai_provider, threshold_tokens=COMPACTION_THRESHOLD_TOKENS
+    )
+    for agent in agents:
+        agent.max_context_tokens = CONTEXT_TOKEN_BUDGET
+        agent.compactor = compactor
+        agent.trim_policy = TopicRelevancePolicy(
+            communication_manager.agent_topics.get(agent.name, set())
+        )
+
+
+def build_report_writer(
+    agents: List[AIAgent], report_outputs: Iterable[TextIO] = ()
+) -> ReportWriter:
+    # The Markdown Output Agent's formatting becomes the report header
+    md_output_agent = next(
+        agent for agent in agents if isinstance(agent, MarkdownOutputAgent)
+    )
+    header = md_output_agent.format_to_markdown("")
+    return ReportWriter(agents, report_outputs, header=header)
+
+
+def run_consultation(
+    ai_provider: AIModelProvider,
+    client_input: str,
+    classifier_provider: Optional[AIModelProvider] = None,
+    report_outputs: Iterable[TextIO] = (),
+    classification_batcher: Optional[ClassificationBatcher] = None,
+    topic_router: Optional[TopicRouter] = None,
+    message_store: Optional[SQLiteMessageStore] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+) -> str:
+    """
+    Run a consultation and return the final report. The report is also
+    written incrementally to each stream in ``report_outputs``. Concurrent
+    consultations can share one ``classification_batcher`` and
+    ``topic_router``. With a ``checkpoint``, every finished stage is saved
+    and stages already in the checkpoint are skipped.
+    """
+    agents, communication_manager, report, run_options = setup_consultation(
+        ai_provider, client_input, classifier_provider, report_outputs,
+        classification_batcher, topic_router, message_store, checkpoint,
+    )
+    result = CONSULTATION_PIPELINE.run(
+        agents, communication_manager, client_input, **run_options
+    )
+    logging.info(result.summary())
+    return report.finish()
+
+
+async def run_consultation_async(
+    ai_provider: AIModelProvider,
+    client_input: str,
+    classifier_provider: Optional[AIModelProvider] = None,
+    report_outputs: Iterable[TextIO] = (),
+    classification_batcher: Optional[ClassificationBatcher] = None,
+    topic_router: Optional[TopicRouter] = None,
+    message_store: Optional[SQLiteMessageStore] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+) -> str:
+    """
+    Awaitable variant of ``run_consultation``. Many consultations can run
+    concurrently on one event loop, e.g. with ``asyncio.gather``.
+    """
+    agents, communication_manager, report, run_options = setup_consultation(
+        ai_provider, client_input, classifier_provider, report_outputs,
+        classification_batcher, topic_router, message_store, checkpoint,
+    )
+    result = await CONSULTATION_PIPELINE.run_async(
+        agents, communication_manager, client_input, **run_options
+    )
+    logging.info(result.summary())
+    return report.finish()
+
+
+def setup_consultation(
+    ai_provider: AIModelProvider,
+    client_input: str,
+    classifier_provider: Optional[AIModelProvider],
+    report_outputs: Iterable[TextIO],
+    classification_batcher: Optional[ClassificationBatcher],
+    topic_router: Optional[TopicRouter],
+    message_store: Optional[SQLiteMessageStore],
+    checkpoint: Optional[RunCheckpoint],
+) -> Tuple[List[AIAgent], CommunicationManager, ReportWriter, Dict[str, Any]]:
+    agents = build_agents(ai_provider)
     communication_manager = CommunicationManager(
         agents=agents,
-        ai_provider=ai_provider  # Add this line to pass the ai_provider
+        ai_provider=classifier_provider or ai_provider,
+        classification_batcher=classification_batcher,
+        topic_router=topic_router,
+        message_store=message_store,
+        # A resumed run continues the same stored session
+        session_id=checkpoint.run_id if checkpoint is not None else None,
+        history_window=HISTORY_WINDOW if message_store is not None else None,
     )
+    configure_context_windows(agents, communication_manager)
+    logging.info("Client input: %s", client_input)
 
-    # Client input
-    client_input = (
-        "We are facing issues with data security and need to improve our system's scalability."
-    )
-    logging.info(f"Client input: {client_input}")
-
-    # Business Analyst processes initial input
-    ba_agent = next(agent for agent in agents if isinstance(agent, BusinessAnalystAgent))
-    ba_response = ba_agent.get_response(client_input)
-    communication_manager.broadcast_message(ba_agent, ba_response)
-
-    # IT Consultant processes the information
-    it_agent = next(agent for agent in agents if isinstance(agent, ITConsultantAgent))
-    it_response = it_agent.get_response()
-    communication_manager.broadcast_message(it_agent, it_response)
-
-    # Solution Architect provides design input
-    sa_agent = next(agent for agent in agents if isinstance(agent, SolutionArchitectAgent))
-    sa_response = sa_agent.get_response()
-    communication_manager.broadcast_message(sa_agent, sa_response)
-
-    # Tech Lead provides technical direction
-    tech_lead_agent = next(agent for agent in agents if isinstance(agent, TechLeadAgent))
-    tech_lead_response = tech_lead_agent.get_response()
-    communication_manager.broadcast_message(tech_lead_agent, tech_lead_response)
-
-    # DevOps Lead provides infrastructure and deployment strategy
-    devops_lead_agent = next(agent for agent in agents if isinstance(agent, DevOpsLeadAgent))
-    devops_response = devops_lead_agent.get_response()
-    communication_manager.broadcast_message(devops_lead_agent, devops_response)
-
-    # Project Manager provides project planning and coordination
-    pm_agent = next(agent for agent in agents if isinstance(agent, ProjectManagerAgent))
-    pm_response = pm_agent.get_response()
-    communication_manager.broadcast_message(pm_agent, pm_response)
-
-    # Compile responses
-    aggregated_content = communication_manager.review_and_collate_responses()
-
-    # Format final output using Markdown Output Agent
-    md_output_agent = next(agent for agent in agents if isinstance(agent, MarkdownOutputAgent))
-    final_output = md_output_agent.get_response(aggregated_content)
-
-    # Save the final report
-    with open("final_report.md", "w") as f:
-        f.write(final_output)
+    report = build_report_writer(agents, report_outputs)
+    completed: Dict[str, StageResult] = {}
+    if checkpoint is not None:
+        completed = checkpoint.completed_stages()
+        checkpoint.restore_agents(agents, completed)
+        for stage in completed.values():
+            report.agent_finished(stage.agent_name)
 
-    print("\n--- Final Report Generated ---")
-    print(final_output)
+    def on_stage_finished(stage: StageResult) -> None:
+        if checkpoint is not None:
+            checkpoint.save_stage(stage, agents)
+        report.agent_finished(stage.agent_name)
+
+    run_options = {"on_stage_finished": on_stage_finished, "completed": completed}
+    return agents, communication_manager, report, run_options
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run an AI consultancy session.")
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="resume a failed run, skipping the stages it already completed",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="BRIEFS",
+        help=(
+            "run every brief in a JSONL or CSV file instead of the built-in "
+            "client input"
+        ),
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=BATCH_OUTPUT_DIRECTORY,
+        help=f"where batch reports are written (default: {BATCH_OUTPUT_DIRECTORY})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BATCH_WORKERS,
+        help=f"briefs run concurrently in batch mode (default: {BATCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help=(
+            "serve Prometheus metrics on http://127.0.0.1:PORT/metrics while "
+            "running"
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help=(
+            "write a Chrome trace of the run to PATH (open in Perfetto or "
+            "chrome://tracing)"
+        ),
+    )
+    args = parser.parse_args(argv)
+    if args.batch and args.resume:
+        parser.error("--resume cannot be combined with --batch")
+    return args
 
-    logging.info("AI Consultancy Agents interaction completed.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,247 @@
+# message_store.py
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+# Joins topic and recipient lists in queries (ASCII unit separator)
+_SEPARATOR = "\x1f"
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " id TEXT PRIMARY KEY,"
+    " started REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS messages ("
+    " session_id TEXT NOT NULL,"
+    " id INTEGER NOT NULL,"
+    " role TEXT NOT NULL,"
+    " content TEXT NOT NULL,"
+    " sender TEXT,"
+    " created REAL NOT NULL,"
+    " PRIMARY KEY (session_id, id))",
+    "CREATE TABLE IF NOT EXISTS message_topics ("
+    " session_id TEXT NOT NULL,"
+    " message_id INTEGER NOT NULL,"
+    " topic TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS message_recipients ("
+    " session_id TEXT NOT NULL,"
+    " message_id INTEGER NOT NULL,"
+    " recipient TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS messages_sender ON messages (sender, session_id)",
+    "CREATE INDEX IF NOT EXISTS message_topics_topic"
+    " ON message_topics (topic, session_id)",
+    "CREATE INDEX IF NOT EXISTS message_topics_message"
+    " ON message_topics (session_id, message_id)",
+    "CREATE INDEX IF NOT EXISTS message_recipients_recipient"
+    " ON message_recipients (recipient, session_id)",
+    "CREATE INDEX IF NOT EXISTS message_recipients_message"
+    " ON message_recipients (session_id, message_id)",
+]
+
+
+class SQLiteMessageStore:
+    """Persistent broadcast history in a SQLite file (WAL mode).
+
+    Sessions, messages, topics and recipients live in separate tables with
+    indexes on sender, recipient, topic and session. Records are buffered
+    and written in one transaction once ``batch_size`` are pending or
+    ``flush_interval`` seconds have passed; queries flush first, so they
+    always see every record added so far.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[str, Dict[str, Any], float]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        # WAL lets readers run alongside the writer; NORMAL sync is safe in WAL
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def start_session(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sessions (id, started) VALUES (?, ?)",
+                (session_id, time.time()),
+            )
+            self._conn.commit()
+
+    def add(self, session_id: str, record: Dict[str, Any]) -> None:
+        """Queue a message record (``id``, ``role``, ``content``, ``sender``,
+        ``topics``, ``recipients``) for the next batched write."""
+        with self._lock:
+            self._pending.append((session_id, record, time.time()))
+            if (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def next_message_id(self, session_id: str) -> int:
+        """The first unused message id of ``session_id`` (0 for a new session)."""
+        with self._lock:
+            self._flush()
+            row = self._conn.execute(
+                "SELECT MAX(id) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM sessions ORDER BY started"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def messages(
+        self,
+        session_id: Optional[str] = None,
+        sender: Optional[str] = None,
+        recipient: Optional[str] = None,
+        topic: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Messages matching every given filter, oldest first."""
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("m.session_id = ?")
+            params.append(session_id)
+        if sender is not None:
+            clauses.append("m.sender = ?")
+            params.append(sender)
+        if recipient is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM message_recipients r WHERE r.recipient = ?"
+                " AND r.session_id = m.session_id AND r.message_id = m.id)"
+            )
+            params.append(recipient)
+        if topic is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM message_topics t WHERE t.topic = ?"
+                " AND t.session_id = m.session_id AND t.message_id = m.id)"
+            )
+            params.append(topic)
+        return self._select(clauses, params, limit)
+
+    def agent_interactions(
+        self, agent_name: str, session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Messages sent or received by ``agent_name``, oldest first."""
+        clauses = [
+            "(m.sender = ? OR EXISTS (SELECT 1 FROM message_recipients r"
+            " WHERE r.recipient = ?"
+            " AND r.session_id = m.session_id AND r.message_id = m.id))"
+        ]
+        params: List[Any] = [agent_name, agent_name]
+        if session_id is not None:
+            clauses.append("m.session_id = ?")
+            params.append(session_id)
+        return self._select(clauses, params, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def __enter__(self) -> "SQLiteMessageStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _select(
+        self, clauses: List[str], params: List[Any], limit: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        query = (
+            "SELECT m.session_id, m.id, m.role, m.content, m.sender,"
+            " (SELECT group_concat(topic, char(31)) FROM message_topics t"
+            "  WHERE t.session_id = m.session_id AND t.message_id = m.id),"
+            " (SELECT group_concat(recipient, char(31)) FROM message_recipients r"
+            "  WHERE r.session_id = m.session_id AND r.message_id = m.id)"
+            " FROM messages m"
+        )
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY m.created, m.session_id, m.id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params = params + [limit]
+
+        with self._lock:
+            self._flush()
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                'id': message_id,
+                'session_id': session_id,
+                'role': role,
+                'content': content,
+                'sender': sender,
+                'topics': sorted(topics.split(_SEPARATOR)) if topics else [],
+                'recipients': recipients.split(_SEPARATOR) if recipients else [],
+            }
+            for (
+                session_id, message_id, role, content, sender, topics, recipients
+            ) in rows
+        ]
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages"
+                " (session_id, id, role, content, sender, created)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        session_id, r['id'], r['role'], r['content'], r.get('sender'),
+                        created,
+                    )
+                    for session_id, r, created in pending
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO message_topics (session_id, message_id, topic)"
+                " VALUES (?, ?, ?)",
+                [
+                    (session_id, r['id'], topic)
+                    for session_id, r, _ in pending
+                    for topic in r.get('topics', ())
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO message_recipients (session_id, message_id, recipient)"
+                " VALUES (?, ?, ?)",
+                [
+                    (session_id, r['id'], recipient)
+                    for session_id, r, _ in pending
+                    for recipient in r.get('recipients', ())
+                ],
+            )
+        self._last_flush = time.monotonic()
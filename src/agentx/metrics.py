@@ -0,0 +1,552 @@
+# metrics.py
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from agentx.ai_model_provider import AIModelProvider
+from agentx.context_window import TokenCounter
+
+# USD per million (prompt, completion) tokens; the longest matching model
+# prefix wins, and unknown models are costed at zero
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prefix = max(
+        (p for p in MODEL_PRICES if model.startswith(p)), key=len, default=None
+    )
+    if prefix is None:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[prefix]
+    cost = prompt_tokens * prompt_price + completion_tokens * completion_price
+    return cost / 1_000_000
+
+
+@dataclass
+class CallRecord:
+    """One provider call as seen by the caller."""
+
+    agent: str
+    stage: Optional[str]
+    model: str
+    started: float
+    queue_wait: float
+    latency: float
+    prompt_tokens: int
+    completion_tokens: int
+    cache_hit: bool = False
+    coalesced: bool = False
+    cost: float = 0.0
+    error: Optional[str] = None
+
+
+# Labels attached to every call made in the current thread or task, and the
+# in-progress call that inner provider layers annotate
+_call_labels: ContextVar[Dict[str, str]] = ContextVar("agentx_call_labels", default={})
+_active_call: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "agentx_active_call", default=None
+)
+
+
+@contextmanager
+def call_labels(**labels: str) -> Iterator[None]:
+    """Label provider calls made inside the block (e.g. ``agent``, ``stage``)."""
+    token = _call_labels.set({**_call_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _call_labels.reset(token)
+
+
+def note_queue_wait(seconds: float) -> None:
+    """Called by rate-limiting layers with time spent waiting to send."""
+    call = _active_call.get()
+    if call is not None:
+        call["queue_wait"] += seconds
+
+
+def note_cache_hit() -> None:
+    call = _active_call.get()
+    if call is not None:
+        call["cache_hit"] = True
+
+
+def note_coalesced() -> None:
+    call = _active_call.get()
+    if call is not None:
+        call["coalesced"] = True
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are interpolated within buckets."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percentile: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = percentile / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """``(le, count)`` pairs in Prometheus order, ending with ``+Inf``."""
+        pairs: List[Tuple[str, int]] = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((f"{bound:g}", total))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class MetricsSink(ABC):
+    @abstractmethod
+    def record(self, call: CallRecord) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class _CallStats:
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.queue_wait = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    def add(self, call: CallRecord) -> None:
+        self.latency.observe(call.latency)
+        self.queue_wait.observe(call.queue_wait)
+        self.calls += 1
+        self.errors += call.error is not None
+        self.cache_hits += call.cache_hit or call.coalesced
+        self.prompt_tokens += call.prompt_tokens
+        self.completion_tokens += call.completion_tokens
+        self.cost += call.cost
+
+
+class HistogramSink(MetricsSink):
+    """In-memory latency and queue-wait histograms per (stage, agent)."""
+
+    def __init__(self) -> None:
+        self.groups: Dict[Tuple[str, str], _CallStats] = {}
+        self.total = _CallStats()
+        self._lock = threading.Lock()
+
+    def record(self, call: CallRecord) -> None:
+        with self._lock:
+            key = (call.stage or "-", call.agent)
+            self.groups.setdefault(key, _CallStats()).add(call)
+            self.total.add(call)
+
+    def summary_table(self) -> str:
+        """Per stage/agent calls, latency, tokens and cost, slowest first."""
+        header = (
+            f"{'stage':<20} {'agent':<24} {'calls':>5} {'err':>4} {'cached':>6} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'wait ms':>8} {'prompt':>8} {'compl':>7} "
+            f"{'cost $':>8}"
+        )
+        with self._lock:
+            groups = sorted(self.groups.items(), key=lambda item: -item[1].latency.sum)
+            rows = [self._row(stage, agent, stats) for (stage, agent), stats in groups]
+            rows.append(self._row("total", "", self.total))
+        return "\n".join([header, "-" * len(header)] + rows)
+
+    @staticmethod
+    def _row(stage: str, agent: str, stats: _CallStats) -> str:
+        mean_wait = stats.queue_wait.sum / stats.calls if stats.calls else 0.0
+        return (
+            f"{stage[:20]:<20} {agent[:24]:<24} {stats.calls:>5} {stats.errors:>4} "
+            f"{stats.cache_hits:>6} {stats.latency.percentile(50) * 1000:>8.0f} "
+            f"{stats.latency.percentile(95) * 1000:>8.0f} {mean_wait * 1000:>8.0f} "
+            f"{stats.prompt_tokens:>8} {stats.completion_tokens:>7} {stats.cost:>8.4f}"
+        )
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Prometheus text exposition of call counts, latency, queue wait, tokens
+    and cost, labelled by agent and model. Written to ``path`` on every
+    ``flush`` and/or served on ``http://<host>:<port>/metrics``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+    ):
+        self.path = Path(path) if path is not None else None
+        self._series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        if port is not None:
+            self._serve(host, port)
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._server.server_port if self._server is not None else None
+
+    def record(self, call: CallRecord) -> None:
+        with self._lock:
+            series = self._series.setdefault((call.agent, call.model), {
+                "calls": {"hit": 0, "miss": 0},
+                "errors": 0,
+                "latency": Histogram(),
+                "queue_wait": Histogram(),
+                "tokens": {"prompt": 0, "completion": 0},
+                "cost": 0.0,
+            })
+            series["calls"]["hit" if call.cache_hit or call.coalesced else "miss"] += 1
+            series["errors"] += call.error is not None
+            series["latency"].observe(call.latency)
+            series["queue_wait"].observe(call.queue_wait)
+            series["tokens"]["prompt"] += call.prompt_tokens
+            series["tokens"]["completion"] += call.completion_tokens
+            series["cost"] += call.cost
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP agentx_{name} {help_text}")
+            lines.append(f"# TYPE agentx_{name} {kind}")
+
+        with self._lock:
+            series = sorted(self._series.items())
+            metric(
+                "provider_calls_total", "counter", "Provider calls by cache outcome."
+            )
+            for (agent, model), s in series:
+                labels = _labels(agent, model)
+                for cache, count in s["calls"].items():
+                    lines.append(
+                        f'agentx_provider_calls_total{{{labels},cache="{cache}"}} '
+                        f"{count}"
+                    )
+            metric("provider_errors_total", "counter", "Provider calls that raised.")
+            for (agent, model), s in series:
+                labels = _labels(agent, model)
+                lines.append(f"agentx_provider_errors_total{{{labels}}} {s['errors']}")
+            for name, help_text in (
+                ("latency", "Provider call latency excluding queue wait."),
+                ("queue_wait", "Time spent waiting on the rate limiter."),
+            ):
+                metric(f"provider_{name}_seconds", "histogram", help_text)
+                for (agent, model), s in series:
+                    histogram, labels = s[name], _labels(agent, model)
+                    prefix = f"agentx_provider_{name}_seconds"
+                    for le, count in histogram.cumulative():
+                        lines.append(f'{prefix}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f"{prefix}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{prefix}_count{{{labels}}} {histogram.count}")
+            metric("provider_tokens_total", "counter", "Prompt and completion tokens.")
+            for (agent, model), s in series:
+                labels = _labels(agent, model)
+                for kind, count in s["tokens"].items():
+                    lines.append(
+                        f'agentx_provider_tokens_total{{{labels},kind="{kind}"}} '
+                        f"{count}"
+                    )
+            metric("provider_cost_dollars_total", "counter", "Estimated spend in USD.")
+            for (agent, model), s in series:
+                labels = _labels(agent, model)
+                lines.append(
+                    f"agentx_provider_cost_dollars_total{{{labels}}} {s['cost']}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        self.flush()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _serve(self, host: str, port: int) -> None:
+        sink = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = sink.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        logging.info("Serving metrics on http://%s:%s/metrics", host, self.port)
+
+
+def _labels(agent: str, model: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return f'agent="{escape(agent)}",model="{escape(model)}"'
+
+
+class JSONLTraceSink(MetricsSink):
+    """Appends every call as one JSON object per line."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, call: CallRecord) -> None:
+        line = json.dumps(asdict(call), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class MetricsRecorder:
+    """Fans call records out to every sink; a failing sink is logged, not raised."""
+
+    def __init__(self, sinks: Sequence[MetricsSink] = ()):
+        self.sinks = list(sinks)
+
+    def record(self, call: CallRecord) -> None:
+        for sink in self.sinks:
+            try:
+                sink.record(call)
+            except Exception as e:
+                logging.warning("Metrics sink %s failed: %s", type(sink).__name__, e)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self) -> "MetricsRecorder":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+class InstrumentedProvider(AIModelProvider):
+    """Records a ``CallRecord`` for every call through any ``AIModelProvider``.
+
+    Latency is the caller-observed time minus queue wait reported by inner
+    rate-limiting layers; cache hits and coalesced calls are flagged by the
+    layers that serve them and cost nothing. Tokens are counted locally.
+    Calls are labelled with the ``agent`` and ``stage`` set by
+    ``call_labels``, falling back to ``component`` for the agent.
+    """
+
+    def __init__(
+        self,
+        provider: AIModelProvider,
+        recorder: MetricsRecorder,
+        component: str = "provider",
+    ):
+        self.provider = provider
+        self.recorder = recorder
+        self.component = component
+        self._counters: Dict[str, TokenCounter] = {}
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        call, token = self._begin()
+        try:
+            response = self.provider.generate_response(messages, model, temperature)
+        except Exception as e:
+            self._finish(call, messages, model, "", error=e)
+            raise
+        finally:
+            _active_call.reset(token)
+        self._finish(call, messages, model, response)
+        return response
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        call, token = self._begin()
+        try:
+            response = await self.provider.generate_response_async(
+                messages, model, temperature
+            )
+        except Exception as e:
+            self._finish(call, messages, model, "", error=e)
+            raise
+        finally:
+            _active_call.reset(token)
+        self._finish(call, messages, model, response)
+        return response
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        # Generators share the consumer's context, so the active call is not
+        # set here; streams record latency and tokens only
+        call = self._new_call()
+        deltas: List[str] = []
+        try:
+            for delta in self.provider.stream_response(messages, model, temperature):
+                deltas.append(delta)
+                yield delta
+        except Exception as e:
+            self._finish(call, messages, model, "".join(deltas), error=e)
+            raise
+        self._finish(call, messages, model, "".join(deltas))
+
+    async def stream_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> AsyncIterator[str]:
+        call = self._new_call()
+        deltas: List[str] = []
+        try:
+            stream = self.provider.stream_response_async(messages, model, temperature)
+            async for delta in stream:
+                deltas.append(delta)
+                yield delta
+        except Exception as e:
+            self._finish(call, messages, model, "".join(deltas), error=e)
+            raise
+        self._finish(call, messages, model, "".join(deltas))
+
+    def close(self) -> None:
+        """Nothing to release; the caller owns the provider and recorder."""
+        pass
+
+    def _new_call(self) -> Dict[str, Any]:
+        return {
+            "labels": _call_labels.get(),
+            "started": time.time(),
+            "start": time.perf_counter(),
+            "queue_wait": 0.0,
+            "cache_hit": False,
+            "coalesced": False,
+        }
+
+    def _begin(self) -> Tuple[Dict[str, Any], "Token[Optional[Dict[str, Any]]]"]:
+        call = self._new_call()
+        return call, _active_call.set(call)
+
+    def _finish(
+        self,
+        call: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        model: str,
+        response: str,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        elapsed = time.perf_counter() - call["start"]
+        counter = self._counters.setdefault(model, TokenCounter(model))
+        prompt_tokens = sum(counter.count_message(m) for m in messages)
+        completion_tokens = counter.count(response) if response else 0
+        free = call["cache_hit"] or call["coalesced"]
+        labels = call["labels"]
+        self.recorder.record(CallRecord(
+            agent=labels.get("agent", self.component),
+            stage=labels.get("stage"),
+            model=model,
+            started=call["started"],
+            queue_wait=call["queue_wait"],
+            latency=max(elapsed - call["queue_wait"], 0.0),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cache_hit=call["cache_hit"],
+            coalesced=call["coalesced"],
+            cost=(
+                0.0 if free
+                else estimate_cost(model, prompt_tokens, completion_tokens)
+            ),
+            error=type(error).__name__ if error is not None else None,
+        ))
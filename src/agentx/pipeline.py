@@ -0,0 +1,333 @@
+# pipeline.py
+
+import asyncio
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agentx.ai_agent import AIAgent
+from agentx.communication_manager import CommunicationManager
+from agentx.metrics import call_labels
+from agentx.tracing import span, submit_with_context
+
+
+@dataclass
+class PipelineStage:
+    """One agent turn in a pipeline.
+
+    Stages with no inputs receive the client input; every other stage starts
+    once all of its input stages have finished and broadcast their output.
+    """
+
+    name: str
+    agent_name: str
+    inputs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StageResult:
+    name: str
+    agent_name: str
+    response: str
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class PipelineResult:
+    stages: Dict[str, StageResult]
+    wall_time: float
+    critical_path: List[str]
+    critical_path_latency: float
+
+    def summary(self) -> str:
+        lines = [
+            f"Pipeline wall time: {self.wall_time:.2f}s",
+            f"Critical path ({self.critical_path_latency:.2f}s): "
+            + " -> ".join(self.critical_path),
+        ]
+        for result in sorted(self.stages.values(), key=lambda r: r.started):
+            lines.append(
+                f"  {result.name:<24} {result.duration:7.2f}s  {result.agent_name}"
+            )
+        return "\n".join(lines)
+
+
+class PipelineError(RuntimeError):
+    """Raised when a stage fails; carries the results of the stages that finished."""
+
+    def __init__(self, stage: str, completed: Dict[str, StageResult]):
+        super().__init__(f"Pipeline stage '{stage}' failed")
+        self.stage = stage
+        self.completed = completed
+
+
+class Pipeline:
+    """Dependency-graph scheduler for agent stages.
+
+    Ready stages run in parallel; each stage's response is fed to the other
+    agents through ``CommunicationManager.broadcast_message``.
+    """
+
+    def __init__(self, stages: List[PipelineStage]):
+        self.stages: Dict[str, PipelineStage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+            self.stages[stage.name] = stage
+        self.order = self._topological_order()
+        self.dependents: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for stage in self.stages.values():
+            for input_name in stage.inputs:
+                self.dependents[input_name].append(stage.name)
+
+    @classmethod
+    def from_config(cls, spec: List[Dict[str, Any]]) -> "Pipeline":
+        """Build a pipeline from a declarative spec, e.g. a YAML list of
+        ``{name, agent, inputs}`` mappings."""
+        return cls([
+            PipelineStage(
+                name=entry['name'],
+                agent_name=entry['agent'],
+                inputs=list(entry.get('inputs', [])),
+            )
+            for entry in spec
+        ])
+
+    def _topological_order(self) -> List[str]:
+        for stage in self.stages.values():
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' has unknown inputs: {unknown}")
+
+        order: List[str] = []
+        remaining = {name: set(stage.inputs) for name, stage in self.stages.items()}
+        while remaining:
+            ready = [name for name, inputs in remaining.items() if not inputs]
+            if not ready:
+                raise ValueError(
+                    f"Pipeline has a dependency cycle among: {sorted(remaining)}"
+                )
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for inputs in remaining.values():
+                inputs.difference_update(ready)
+        return order
+
+    def run(
+        self,
+        agents: List[AIAgent],
+        communication_manager: CommunicationManager,
+        client_input: str,
+        max_workers: Optional[int] = None,
+        on_stage_finished: Optional[Callable[[StageResult], None]] = None,
+        completed: Optional[Dict[str, StageResult]] = None,
+    ) -> PipelineResult:
+        """Run every stage on a thread pool, starting each as soon as its
+        inputs are done.
+
+        ``on_stage_finished`` is called from the scheduling thread with each
+        stage's result as it completes. Stages in ``completed`` (e.g. from a
+        checkpoint of an earlier run) are not run again.
+        """
+        agents_by_name = self._resolve_agents(agents)
+        waiting, results = self._initial_state(completed)
+        failed: Optional[str] = None
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+
+        with span("run", stages=len(self.stages)), ThreadPoolExecutor(
+            max_workers=max_workers or len(self.stages), thread_name_prefix="stage"
+        ) as executor:
+            running: Dict["Future[StageResult]", str] = {}
+
+            def submit_ready() -> None:
+                for name in [name for name, inputs in waiting.items() if not inputs]:
+                    del waiting[name]
+                    future = submit_with_context(
+                        executor, self._run_stage, self.stages[name], agents_by_name,
+                        communication_manager, client_input,
+                    )
+                    running[future] = name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logging.error("Pipeline stage %s failed: %s", name, e)
+                        if failed is None:
+                            failed, error = name, e
+                        continue
+                    if on_stage_finished is not None:
+                        on_stage_finished(results[name])
+                    for dependent in self.dependents[name]:
+                        waiting[dependent].discard(name)
+                # Stop scheduling new work after a failure; let running stages finish
+                if failed is None:
+                    submit_ready()
+
+        if failed is not None:
+            raise PipelineError(failed, results) from error
+        return self._finish(results, time.perf_counter() - start)
+
+    async def run_async(
+        self,
+        agents: List[AIAgent],
+        communication_manager: CommunicationManager,
+        client_input: str,
+        on_stage_finished: Optional[Callable[[StageResult], None]] = None,
+        completed: Optional[Dict[str, StageResult]] = None,
+    ) -> PipelineResult:
+        """Awaitable variant of ``run``: ready stages run as tasks on the
+        current loop."""
+        agents_by_name = self._resolve_agents(agents)
+        waiting, results = self._initial_state(completed)
+        failed: Optional[str] = None
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+        running: Dict["asyncio.Task[StageResult]", str] = {}
+
+        def submit_ready() -> None:
+            for name in [name for name, inputs in waiting.items() if not inputs]:
+                del waiting[name]
+                task = asyncio.ensure_future(self._run_stage_async(
+                    self.stages[name], agents_by_name, communication_manager,
+                    client_input,
+                ))
+                running[task] = name
+
+        with span("run", stages=len(self.stages)):
+            submit_ready()
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        results[name] = task.result()
+                    except Exception as e:
+                        logging.error("Pipeline stage %s failed: %s", name, e)
+                        if failed is None:
+                            failed, error = name, e
+                        continue
+                    if on_stage_finished is not None:
+                        on_stage_finished(results[name])
+                    for dependent in self.dependents[name]:
+                        waiting[dependent].discard(name)
+                if failed is None:
+                    submit_ready()
+
+        if failed is not None:
+            raise PipelineError(failed, results) from error
+        return self._finish(results, time.perf_counter() - start)
+
+    def _initial_state(
+        self, completed: Optional[Dict[str, StageResult]]
+    ) -> Tuple[Dict[str, set], Dict[str, StageResult]]:
+        results = {
+            name: result for name, result in (completed or {}).items()
+            if name in self.stages
+        }
+        waiting = {
+            name: set(stage.inputs) - set(results)
+            for name, stage in self.stages.items()
+            if name not in results
+        }
+        if results:
+            logging.info("Skipping completed pipeline stages: %s", sorted(results))
+        return waiting, results
+
+    def _resolve_agents(self, agents: List[AIAgent]) -> Dict[str, AIAgent]:
+        agents_by_name = {agent.name: agent for agent in agents}
+        missing = {
+            stage.agent_name for stage in self.stages.values()
+            if stage.agent_name not in agents_by_name
+        }
+        if missing:
+            raise ValueError(
+                f"No agent registered for pipeline stages: {sorted(missing)}"
+            )
+        return agents_by_name
+
+    def _run_stage(
+        self,
+        stage: PipelineStage,
+        agents_by_name: Dict[str, AIAgent],
+        communication_manager: CommunicationManager,
+        client_input: str,
+    ) -> StageResult:
+        agent = agents_by_name[stage.agent_name]
+        started = time.perf_counter()
+        logging.info("Pipeline stage %s started (%s)", stage.name, agent.name)
+        with call_labels(stage=stage.name), \
+                span(f"stage {stage.name}", "stage", agent=agent.name):
+            response = agent.get_response("" if stage.inputs else client_input)
+            communication_manager.broadcast_message(agent, response)
+        return StageResult(
+            stage.name, agent.name, response, started, time.perf_counter()
+        )
+
+    async def _run_stage_async(
+        self,
+        stage: PipelineStage,
+        agents_by_name: Dict[str, AIAgent],
+        communication_manager: CommunicationManager,
+        client_input: str,
+    ) -> StageResult:
+        agent = agents_by_name[stage.agent_name]
+        started = time.perf_counter()
+        logging.info("Pipeline stage %s started (%s)", stage.name, agent.name)
+        with call_labels(stage=stage.name), \
+                span(f"stage {stage.name}", "stage", agent=agent.name):
+            response = await agent.get_response_async(
+                "" if stage.inputs else client_input
+            )
+            await communication_manager.broadcast_message_async(agent, response)
+        return StageResult(
+            stage.name, agent.name, response, started, time.perf_counter()
+        )
+
+    def _finish(
+        self, results: Dict[str, StageResult], wall_time: float
+    ) -> PipelineResult:
+        critical_path, latency = self.critical_path(results)
+        return PipelineResult(results, wall_time, critical_path, latency)
+
+    def critical_path(self, results: Dict[str, StageResult]) -> Tuple[List[str], float]:
+        """Longest chain of dependent stage durations through the graph."""
+        path_latency: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self.order:
+            if name not in results:
+                continue
+            best_input = max(
+                (i for i in self.stages[name].inputs if i in path_latency),
+                key=lambda i: path_latency[i],
+                default=None,
+            )
+            base = path_latency[best_input] if best_input is not None else 0.0
+            path_latency[name] = base + results[name].duration
+            previous[name] = best_input
+
+        if not path_latency:
+            return [], 0.0
+        last = max(path_latency, key=lambda n: path_latency[n])
+        latency = path_latency[last]
+        path = []
+        end: Optional[str] = last
+        while end is not None:
+            path.append(end)
+            end = previous[end]
+        return list(reversed(path)), latency
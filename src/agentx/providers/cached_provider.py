@@ -0,0 +1,294 @@
+# providers/cached_provider.py
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+
+from agentx.ai_model_provider import AIModelProvider, request_key
+from agentx.metrics import note_cache_hit
+
+
+class MemoryCacheTier:
+    """Thread-safe in-memory LRU with an optional TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, created = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(
+        self, key: str, response: str, created: Optional[float] = None
+    ) -> None:
+        if created is None:
+            created = time.time()
+        with self._lock:
+            self._entries[key] = (response, created)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheTier:
+    """Persistent cache tier in a SQLite file.
+
+    Entries older than ``ttl`` seconds are treated as misses and purged; once
+    the table exceeds ``max_entries`` the least recently used rows are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        self._conn.commit()
+        self._purge_expired()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return row[0], row[1]
+
+    def set(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed)"
+                " VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def _purge_expired(self) -> None:
+        if self.ttl is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingProvider(AIModelProvider):
+    """Content-addressed response cache around any ``AIModelProvider``.
+
+    Requests are keyed on a hash of ``(model, temperature, messages)`` and
+    looked up in an in-memory LRU, then in an optional SQLite tier. Only calls
+    at or below ``max_temperature`` are cached, so deterministic work such as
+    topic classification hits the cache while creative agent turns always go
+    to the model. Agents opt in by being given a ``CachingProvider``.
+    """
+
+    def __init__(
+        self,
+        provider: AIModelProvider,
+        memory_entries: int = 1024,
+        disk_path: Optional[Union[str, Path]] = None,
+        disk_entries: int = 10000,
+        ttl: Optional[float] = None,
+        max_temperature: float = 0.3,
+    ):
+        self.provider = provider
+        self.max_temperature = max_temperature
+        self.memory = MemoryCacheTier(memory_entries, ttl)
+        self.disk = (
+            SQLiteCacheTier(disk_path, disk_entries, ttl)
+            if disk_path is not None else None
+        )
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        if temperature > self.max_temperature:
+            self._count("bypassed")
+            return self.provider.generate_response(messages, model, temperature)
+
+        key = request_key(messages, model, temperature)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = self.provider.generate_response(messages, model, temperature)
+        self._store(key, response)
+        return response
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        if temperature > self.max_temperature:
+            self._count("bypassed")
+            return await self.provider.generate_response_async(
+                messages, model, temperature
+            )
+
+        key = request_key(messages, model, temperature)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = await self.provider.generate_response_async(
+            messages, model, temperature
+        )
+        self._store(key, response)
+        return response
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        if temperature > self.max_temperature:
+            self._count("bypassed")
+            yield from self.provider.stream_response(messages, model, temperature)
+            return
+
+        key = request_key(messages, model, temperature)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        deltas = []
+        for delta in self.provider.stream_response(messages, model, temperature):
+            deltas.append(delta)
+            yield delta
+        # Only complete streams are cached
+        self._store(key, "".join(deltas))
+
+    async def stream_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> AsyncIterator[str]:
+        if temperature > self.max_temperature:
+            self._count("bypassed")
+            stream = self.provider.stream_response_async(messages, model, temperature)
+            async for delta in stream:
+                yield delta
+            return
+
+        key = request_key(messages, model, temperature)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        deltas = []
+        stream = self.provider.stream_response_async(messages, model, temperature)
+        async for delta in stream:
+            deltas.append(delta)
+            yield delta
+        self._store(key, "".join(deltas))
+
+    @property
+    def hits(self) -> int:
+        return self.stats["hits"]
+
+    @property
+    def misses(self) -> int:
+        return self.stats["misses"]
+
+    def close(self) -> None:
+        """Close the disk tier; the wrapped provider is owned by the caller."""
+        if self.disk is not None:
+            self.disk.close()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        response = self.memory.get(key)
+        if response is not None:
+            self._count("hits", "memory_hits")
+            note_cache_hit()
+            return response
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                response, created = entry
+                # Promote to the memory tier, keeping the original age for TTL
+                self.memory.set(key, response, created)
+                self._count("hits", "disk_hits")
+                note_cache_hit()
+                return response
+
+        self._count("misses")
+        return None
+
+    def _store(self, key: str, response: str) -> None:
+        self.memory.set(key, response)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, response)
+            except sqlite3.Error as e:
+                logging.warning("Could not persist cached response: %s", e)
+
+    def _count(self, *names: str) -> None:
+        with self._stats_lock:
+            for name in names:
+                self.stats[name] += 1
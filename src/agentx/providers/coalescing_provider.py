@@ -0,0 +1,162 @@
+# providers/coalescing_provider.py
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from agentx.ai_model_provider import AIModelProvider, request_key
+from agentx.metrics import note_coalesced
+from agentx.tracing import span
+
+
+class _LeaderAbandoned(Exception):
+    """Set on a shared future whose leader was cancelled or interrupted."""
+
+
+class CoalescingProvider(AIModelProvider):
+    """Single-flight layer around any ``AIModelProvider``.
+
+    While a request is in flight, identical requests (same
+    ``request_key``) wait for its result instead of issuing a duplicate
+    call. Threads and coroutines share one in-flight table, so a coroutine
+    can wait on a call started by a worker thread and vice versa. Errors
+    are shared too: every waiter sees the leader's exception. A leader that
+    is cancelled or interrupted (a ``BaseException``) only fails itself; its
+    waiters retry, and one of them leads the new call.
+
+    Streaming calls pass straight through, since their deltas go to one
+    consumer.
+    """
+
+    def __init__(
+        self, provider: AIModelProvider, max_temperature: Optional[float] = 0.3
+    ):
+        self.provider = provider
+        # Sampled calls above max_temperature stay independent, since callers
+        # asking twice expect two different answers; None coalesces everything
+        self.max_temperature = max_temperature
+        self.stats: Dict[str, int] = {"calls": 0, "coalesced": 0}
+        self._in_flight: Dict[str, "Future[str]"] = {}
+        self._lock = threading.Lock()
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        if not self._coalesces(temperature):
+            return self.provider.generate_response(messages, model, temperature)
+
+        key = request_key(messages, model, temperature)
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                with span("coalesced wait", "queue"):
+                    response = future.result()
+            except _LeaderAbandoned:
+                self._uncount_wait()
+                continue
+            note_coalesced()
+            return response
+        try:
+            response = self.provider.generate_response(messages, model, temperature)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, response)
+        return response
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        if not self._coalesces(temperature):
+            return await self.provider.generate_response_async(
+                messages, model, temperature
+            )
+
+        key = request_key(messages, model, temperature)
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                with span("coalesced wait", "queue"):
+                    # Shielded so a cancelled waiter does not cancel the
+                    # future the leader and other waiters share
+                    response = await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderAbandoned:
+                self._uncount_wait()
+                continue
+            note_coalesced()
+            return response
+        try:
+            response = await self.provider.generate_response_async(
+                messages, model, temperature
+            )
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, response)
+        return response
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        return self.provider.stream_response(messages, model, temperature)
+
+    def stream_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> AsyncIterator[str]:
+        return self.provider.stream_response_async(messages, model, temperature)
+
+    @property
+    def saved_calls(self) -> int:
+        """Provider calls avoided by waiting on an identical in-flight request."""
+        return self.stats["coalesced"]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def close(self) -> None:
+        """Nothing to release; the wrapped provider is owned by the caller."""
+        pass
+
+    def _coalesces(self, temperature: float) -> bool:
+        return self.max_temperature is None or temperature <= self.max_temperature
+
+    def _join(self, key: str) -> Tuple["Future[str]", bool]:
+        """Return the in-flight future for ``key`` and whether the caller leads it."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.stats["calls"] += 1
+            return future, True
+
+    def _uncount_wait(self) -> None:
+        # The wait saved nothing; the retry is counted when it joins again
+        with self._lock:
+            self.stats["coalesced"] -= 1
+
+    def _settle(
+        self,
+        key: str,
+        future: "Future[str]",
+        response: str = "",
+        error: Optional[BaseException] = None,
+    ) -> None:
+        # Later identical requests start a fresh call once this one is settled
+        with self._lock:
+            del self._in_flight[key]
+        if isinstance(error, Exception):
+            future.set_exception(error)
+        elif error is not None:
+            # Cancellation and interrupts belong to the leader alone
+            future.set_exception(_LeaderAbandoned())
+        else:
+            future.set_result(response)
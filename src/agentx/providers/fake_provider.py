@@ -0,0 +1,144 @@
+# providers/fake_provider.py
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from agentx.ai_model_provider import AIModelProvider, request_key
+from agentx.communication_manager import DEFAULT_TOPIC_KEYWORDS, TopicCategory
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+_FILLER = (
+    "we recommend that the team review the current approach and agree on "
+    "clear next steps with the client while tracking risks and assumptions "
+    "across the engagement so that every decision is documented"
+).split()
+_VOCABULARY = _FILLER + [
+    k for keywords in DEFAULT_TOPIC_KEYWORDS.values() for k in keywords
+]
+
+_CLASSIFICATION_PROMPT = "categorize it into one or more of these categories"
+_BATCH_ITEM = re.compile(r"^\s*(\d+)\. ", re.MULTILINE)
+
+
+class FakeProviderError(RuntimeError):
+    """Injected failure; ``status_code`` is 429 for simulated rate limits."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FakeProvider(AIModelProvider):
+    """Deterministic stand-in for a model API, for tests and benchmarks.
+
+    Every reply, latency and injected failure is drawn from a generator
+    seeded by ``seed``, the request's content and how many times that
+    request was seen before, so a run is reproducible regardless of thread
+    or task scheduling. Replies are filler text mixed with topic keywords;
+    topic classification prompts get well-formed category answers.
+
+    Latency is ``latency`` seconds on average, drawn from one of
+    ``LATENCY_DISTRIBUTIONS`` (``spread`` is the uniform half-width as a
+    fraction of the mean, or the lognormal sigma).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        distribution: str = "constant",
+        spread: float = 0.5,
+        response_words: Tuple[int, int] = (80, 200),
+        failure_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}")
+        self.latency = latency
+        self.distribution = distribution
+        self.spread = spread
+        self.response_words = response_words
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self._sleep = sleep
+        self.stats: Dict[str, int] = {"calls": 0, "failures": 0, "rate_limited": 0}
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        rng = self._rng(messages, model, temperature)
+        delay = self.sample_latency(rng)
+        if delay:
+            self._sleep(delay)
+        return self._reply(rng, messages)
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        rng = self._rng(messages, model, temperature)
+        delay = self.sample_latency(rng)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._reply(rng, messages)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.latency <= 0 or self.distribution == "constant":
+            return max(self.latency, 0.0)
+        if self.distribution == "uniform":
+            return rng.uniform(
+                self.latency * (1 - self.spread), self.latency * (1 + self.spread)
+            )
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.latency)
+        # Lognormal with the requested mean: a long tail of slow calls
+        sigma = self.spread
+        return rng.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+
+    def _rng(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> random.Random:
+        key = request_key(messages, model, temperature)
+        with self._lock:
+            attempt = self._seen.get(key, 0)
+            self._seen[key] = attempt + 1
+            self.stats["calls"] += 1
+        return random.Random(f"{self.seed}:{key}:{attempt}")
+
+    def _reply(self, rng: random.Random, messages: List[Dict[str, str]]) -> str:
+        # Draw both failure rolls so the reply stream does not depend on the rates
+        rate_limited = rng.random() < self.rate_limit_rate
+        failed = rng.random() < self.failure_rate
+        if rate_limited or failed:
+            with self._lock:
+                self.stats["rate_limited" if rate_limited else "failures"] += 1
+            if rate_limited:
+                raise FakeProviderError("Simulated rate limit", status_code=429)
+            raise FakeProviderError("Simulated provider failure")
+
+        prompt = messages[-1]["content"] if messages else ""
+        if _CLASSIFICATION_PROMPT in prompt:
+            return _classification_reply(rng, prompt)
+        count = rng.randint(*self.response_words)
+        words = [rng.choice(_VOCABULARY) for _ in range(count)]
+        return " ".join(words).capitalize() + "."
+
+
+def _classification_reply(rng: random.Random, prompt: str) -> str:
+    def categories() -> List[str]:
+        return [c.value for c in rng.sample(list(TopicCategory), rng.randint(1, 3))]
+
+    items = {int(number) for number in _BATCH_ITEM.findall(prompt)}
+    if "JSON object" in prompt and items:
+        return json.dumps({str(number): categories() for number in sorted(items)})
+    return ", ".join(categories())
@@ -1,38 +1,261 @@
-import openai
+import asyncio
 import os
-from typing import List, Dict
-from agentx.ai_model_provider import AIModelProvider
-from dotenv import load_dotenv
+import threading
+import weakref
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, List, Dict, Optional, cast
+from agentx.ai_model_provider import AIModelProvider, AsyncAIModelProvider
 import logging
 
-# Load environment variables from .env file
-load_dotenv()
+# The openai SDK (and httpx) take most of a second to import, so they are
+# imported when the first provider is created, not with this module
+if TYPE_CHECKING:
+    import httpx
+    import openai
+    from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load environment variables from a .env file, once per process."""
+    global _env_loaded
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _env_loaded = True
+
+
+def _get_api_key() -> str:
+    import openai
+
+    # Set up OpenAI API key securely
+    load_env()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OpenAI API key not found in environment variables.")
+    openai.api_key = api_key
+    return api_key
+
+
+def _pool_limits(
+    max_connections: int, max_keepalive_connections: int, keepalive_expiry: float
+) -> "httpx.Limits":
+    import httpx
+
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def _chat_messages(
+    messages: List[Dict[str, str]]
+) -> List["ChatCompletionMessageParam"]:
+    return cast(List["ChatCompletionMessageParam"], messages)
+
+
+def _chunk_delta(chunk: "ChatCompletionChunk") -> Optional[str]:
+    # Trailing chunks (finish reason, usage) carry no choices or no content
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
 
 
 class OpenAIProvider(AIModelProvider):
-    def __init__(self):
-        # Set up OpenAI API key securely
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OpenAI API key not found in environment variables.")
-        openai.api_key = api_key
+    """OpenAI chat completions provider backed by one pooled HTTP client.
+
+    The client (and its connection pool) is created once per provider and
+    reused for every call, so a single provider instance should be shared by
+    all agents. Call ``close()`` (or use the provider as a context manager)
+    to release the pooled connections.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        max_retries: int = 2,
+        base_url: Optional[str] = None,
+    ):
+        import httpx
+        import openai
+
+        api_key = _get_api_key()
+        self._http_client = httpx.Client(
+            limits=_pool_limits(
+                max_connections, max_keepalive_connections, keepalive_expiry
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        )
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=max_retries,
+            http_client=self._http_client,
+        )
 
     def generate_response(
         self, messages: List[Dict[str, str]], model: str, temperature: float
     ) -> str:
+        import openai
+
         try:
-            # Use client instance and chat completions endpoint
-            client = openai.OpenAI()
-            response = client.chat.completions.create(
+            # Reuse the pooled client and chat completions endpoint
+            response = self.client.chat.completions.create(
                 model=model,
-                messages=messages,
+                messages=_chat_messages(messages),
                 temperature=temperature,
             )
-            assistant_message = response.choices[0].message.content.strip()
+            assistant_message = (response.choices[0].message.content or "").strip()
             return assistant_message
         except openai.OpenAIError as e:
-            logging.error(f"OpenAI API error: {e}")
+            logging.error("OpenAI API error: %s", e)
             raise
         except Exception as e:
-            logging.error(f"Unexpected error: {e}")
-            raise
\ No newline at end of file
+            logging.error("Unexpected error: %s", e)
+            raise
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        import openai
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=_chat_messages(messages),
+                temperature=temperature,
+                stream=True,
+            )
+            try:
+                for chunk in stream:
+                    delta = _chunk_delta(chunk)
+                    if delta:
+                        yield delta
+            finally:
+                # Returns the connection to the pool if the caller stops early
+                stream.close()
+        except openai.OpenAIError as e:
+            logging.error("OpenAI API error: %s", e)
+            raise
+
+    def close(self) -> None:
+        """Close the pooled HTTP client and its keep-alive connections."""
+        self.client.close()
+        self._http_client.close()
+
+
+class AsyncOpenAIProvider(AsyncAIModelProvider):
+    """asyncio-native OpenAI provider.
+
+    One ``AsyncOpenAI`` client (and connection pool) is created per event
+    loop that uses the provider, so hundreds of concurrent consultations on
+    one loop share a single pool. ``generate_response`` remains available as
+    a blocking wrapper for sync callers.
+
+    ``close()`` only releases the client of the provider's private loop (the
+    one behind ``generate_response``). A client is bound to the loop that
+    created it and can only be closed there, so async callers must
+    ``await provider.aclose()`` (or use ``async with``) on each of their
+    loops before it ends.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        max_retries: int = 2,
+        base_url: Optional[str] = None,
+    ):
+        import httpx
+
+        super().__init__()
+        self._api_key = _get_api_key()
+        self._limits = _pool_limits(
+            max_connections, max_keepalive_connections, keepalive_expiry
+        )
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._max_retries = max_retries
+        self._base_url = base_url
+        self._clients: (
+            "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, openai.AsyncOpenAI]"
+        ) = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> "openai.AsyncOpenAI":
+        """The pooled client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            import httpx
+            import openai
+
+            client = openai.AsyncOpenAI(
+                api_key=self._api_key,
+                base_url=self._base_url,
+                max_retries=self._max_retries,
+                http_client=httpx.AsyncClient(
+                    limits=self._limits, timeout=self._timeout
+                ),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        import openai
+
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=_chat_messages(messages),
+                temperature=temperature,
+            )
+            assistant_message = (response.choices[0].message.content or "").strip()
+            return assistant_message
+        except openai.OpenAIError as e:
+            logging.error("OpenAI API error: %s", e)
+            raise
+        except Exception as e:
+            logging.error("Unexpected error: %s", e)
+            raise
+
+    async def stream_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> AsyncIterator[str]:
+        import openai
+
+        try:
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=_chat_messages(messages),
+                temperature=temperature,
+                stream=True,
+            )
+            try:
+                async for chunk in stream:
+                    delta = _chunk_delta(chunk)
+                    if delta:
+                        yield delta
+            finally:
+                await stream.close()
+        except openai.OpenAIError as e:
+            logging.error("OpenAI API error: %s", e)
+            raise
+
+    async def aclose(self) -> None:
+        """Close the client (and its connection pool) bound to the running loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
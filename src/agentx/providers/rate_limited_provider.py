@@ -0,0 +1,368 @@
+# providers/rate_limited_provider.py
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from agentx.ai_model_provider import AIModelProvider
+from agentx.context_window import TokenCounter
+from agentx.metrics import note_queue_wait
+from agentx.tracing import span
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for HTTP 429 responses, e.g. ``openai.RateLimitError``."""
+    return (
+        getattr(error, "status_code", None) == 429
+        or type(error).__name__ == "RateLimitError"
+    )
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """The server's ``Retry-After`` hint, if the error carries one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations.
+
+    ``reserve`` always succeeds and returns how long the caller must wait
+    before its reservation is covered, so callers are served in the order
+    they arrive and nobody polls.
+    """
+
+    def __init__(
+        self, per_minute: float, burst_seconds: float, clock: Callable[[], float]
+    ) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.scale = 1.0
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            # A request larger than the bucket waits for a full bucket, not forever
+            self._level -= min(amount, self.capacity)
+            if self._level >= 0:
+                return 0.0
+            return -self._level / (self.rate * self.scale)
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier reservation once the real cost is known."""
+        with self._lock:
+            self._refill()
+            self._level = min(self._level - amount, self.capacity)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated) * self.rate * self.scale
+        )
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    Client-side limiter on requests and tokens per minute, meant to be shared
+    by every agent in a process.
+
+    Rate-limit responses halve the effective rate and pause new requests for
+    the server's ``Retry-After`` (if any); each success then restores the
+    rate additively, so throughput settles just under the real quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        burst_seconds: float = 10.0,
+        min_scale: float = 0.1,
+        recovery_step: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute, burst_seconds, clock)
+            if requests_per_minute else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, burst_seconds, clock)
+            if tokens_per_minute else None
+        )
+        self.min_scale = min_scale
+        self.recovery_step = recovery_step
+        self.scale = 1.0
+        self._clock = clock
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.stats: Dict[str, float] = {
+            "requests": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+            "rate_limited": 0,
+            "max_queue_depth": 0,
+        }
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` tokens; return the seconds to wait."""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        with self._lock:
+            wait = max(wait, self._paused_until - self._clock())
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self.stats["wait_seconds"] += wait
+        return max(wait, 0.0)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until a request of ``tokens`` tokens may be sent; return the wait."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self._enter_queue()
+            try:
+                with span("rate limit wait", "queue", seconds=round(wait, 3)):
+                    time.sleep(wait)
+            finally:
+                self._leave_queue()
+        return wait
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self._enter_queue()
+            try:
+                with span("rate limit wait", "queue", seconds=round(wait, 3)):
+                    await asyncio.sleep(wait)
+            finally:
+                self._leave_queue()
+        return wait
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        if self.tokens is not None:
+            self.tokens.adjust(actual - estimated)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.scale < 1.0:
+                self._set_scale(min(1.0, self.scale + self.recovery_step))
+
+    def record_rate_limit(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.stats["rate_limited"] += 1
+            self._set_scale(max(self.min_scale, self.scale / 2))
+            if retry_after:
+                self._paused_until = max(
+                    self._paused_until, self._clock() + retry_after
+                )
+        logging.warning(
+            "Rate limited; throttling to %.0f%% of configured rate",
+            self.scale * 100,
+        )
+
+    def _set_scale(self, scale: float) -> None:
+        self.scale = scale
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                with bucket._lock:
+                    bucket._refill()
+                    bucket.scale = scale
+
+    def _enter_queue(self) -> None:
+        with self._lock:
+            self.queue_depth += 1
+            self.stats["max_queue_depth"] = max(
+                self.stats["max_queue_depth"], self.queue_depth
+            )
+
+    def _leave_queue(self) -> None:
+        with self._lock:
+            self.queue_depth -= 1
+
+
+class RateLimitedProvider(AIModelProvider):
+    """Rate limiting and retries around any ``AIModelProvider``.
+
+    Every call first takes a reservation from a shared ``RateLimiter``
+    (prompt tokens plus ``completion_tokens`` as an estimate, corrected once
+    the reply is known). Rate-limit errors feed back into the limiter and
+    are retried with jittered exponential backoff up to ``max_retries``
+    times; other errors propagate unchanged. Turn off the wrapped client's
+    own retries (``OpenAIProvider(max_retries=0)``), or each reservation may
+    send several requests and the limiter only sees their last 429.
+    """
+
+    def __init__(
+        self,
+        provider: AIModelProvider,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        limiter: Optional[RateLimiter] = None,
+        completion_tokens: int = 500,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.provider = provider
+        self.limiter = limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+        self.completion_tokens = completion_tokens
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats: Dict[str, int] = {"retries": 0, "failed": 0}
+        self._counters: Dict[str, TokenCounter] = {}
+        self._stats_lock = threading.Lock()
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        estimate = self._estimate_tokens(messages, model)
+        for attempt in range(self.max_retries + 1):
+            note_queue_wait(self.limiter.acquire(estimate))
+            try:
+                response = self.provider.generate_response(messages, model, temperature)
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                with span("rate limit backoff", "queue", attempt=attempt + 1):
+                    time.sleep(delay)
+                continue
+            self._on_success(messages, model, estimate, response)
+            return response
+        # _backoff re-raises on the last attempt
+        raise AssertionError("unreachable")
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        estimate = self._estimate_tokens(messages, model)
+        for attempt in range(self.max_retries + 1):
+            note_queue_wait(await self.limiter.acquire_async(estimate))
+            try:
+                response = await self.provider.generate_response_async(
+                    messages, model, temperature
+                )
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                with span("rate limit backoff", "queue", attempt=attempt + 1):
+                    await asyncio.sleep(delay)
+                continue
+            self._on_success(messages, model, estimate, response)
+            return response
+        # _backoff re-raises on the last attempt
+        raise AssertionError("unreachable")
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        estimate = self._estimate_tokens(messages, model)
+        for attempt in range(self.max_retries + 1):
+            note_queue_wait(self.limiter.acquire(estimate))
+            deltas: List[str] = []
+            try:
+                stream = self.provider.stream_response(
+                    messages, model, temperature
+                )
+                for delta in stream:
+                    deltas.append(delta)
+                    yield delta
+            except Exception as e:
+                # Deltas already handed to the caller cannot be taken back
+                if deltas:
+                    raise
+                delay = self._backoff(e, attempt)
+                with span("rate limit backoff", "queue", attempt=attempt + 1):
+                    time.sleep(delay)
+                continue
+            self._on_success(messages, model, estimate, "".join(deltas))
+            return
+
+    async def stream_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> AsyncIterator[str]:
+        estimate = self._estimate_tokens(messages, model)
+        for attempt in range(self.max_retries + 1):
+            note_queue_wait(await self.limiter.acquire_async(estimate))
+            deltas: List[str] = []
+            try:
+                async for delta in self.provider.stream_response_async(
+                    messages, model, temperature
+                ):
+                    deltas.append(delta)
+                    yield delta
+            except Exception as e:
+                if deltas:
+                    raise
+                delay = self._backoff(e, attempt)
+                with span("rate limit backoff", "queue", attempt=attempt + 1):
+                    await asyncio.sleep(delay)
+                continue
+            self._on_success(messages, model, estimate, "".join(deltas))
+            return
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers currently waiting on the limiter."""
+        return self.limiter.queue_depth
+
+    def close(self) -> None:
+        """Nothing to release; the wrapped provider is owned by the caller."""
+        pass
+
+    def _estimate_tokens(self, messages: List[Dict[str, str]], model: str) -> int:
+        if self.limiter.tokens is None:
+            return 0
+        counter = self._counters.setdefault(model, TokenCounter(model))
+        return sum(counter.count_message(m) for m in messages) + self.completion_tokens
+
+    def _on_success(
+        self, messages: List[Dict[str, str]], model: str, estimate: int, response: str
+    ) -> None:
+        self.limiter.record_success()
+        if estimate:
+            counter = self._counters[model]
+            actual = estimate - self.completion_tokens + counter.count(response)
+            self.limiter.record_usage(estimate, actual)
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        delay = self._on_error(error, attempt)
+        # Backoff counts as queueing, not model latency, in call metrics
+        note_queue_wait(delay)
+        return delay
+
+    def _on_error(self, error: Exception, attempt: int) -> float:
+        """Return the backoff before the next attempt, or re-raise ``error``."""
+        if not is_rate_limit_error(error) or attempt >= self.max_retries:
+            if is_rate_limit_error(error):
+                self._count("failed")
+            raise error
+        retry_after = retry_after_seconds(error)
+        self.limiter.record_rate_limit(retry_after)
+        self._count("retries")
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        logging.warning(
+            "Rate limited (attempt %s), retrying in %.2fs", attempt + 1, delay
+        )
+        return delay
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
@@ -0,0 +1,273 @@
+# tracing.py
+
+import contextvars
+import itertools
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from agentx.ai_model_provider import AIModelProvider
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float
+    end: Optional[float] = None
+    thread: str = ""
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def closed_at(self) -> float:
+        """``end`` of a span that has closed (only those reach the tracer's list)."""
+        assert self.end is not None, f"span {self.name!r} is still open"
+        return self.end
+
+
+# The innermost open span of the current thread or task. asyncio tasks
+# inherit it; work handed to other threads needs submit_with_context.
+_current_span: ContextVar[Optional[Span]] = ContextVar(
+    "agentx_current_span", default=None
+)
+
+
+class Tracer:
+    """
+    Collects hierarchical spans (run → stage → agent → provider call,
+    broadcast → classify → route → deliver) and exports them as a Chrome
+    trace, viewable as a flame chart in Perfetto or ``chrome://tracing``.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(
+        self, name: str, category: Optional[str] = None, **attributes: Any
+    ) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            category=category or name,
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent is not None else None,
+            start=time.perf_counter(),
+            thread=threading.current_thread().name,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The finished spans in Chrome's Trace Event Format.
+
+        Spans that overlap without nesting (concurrent stages on one event
+        loop, deliveries that outlive their broadcast) are laid out on
+        separate tracks, since each track must be a proper flame chart.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: (s.start, -s.closed_at))
+        tracks = _assign_tracks(spans)
+        events: List[Dict[str, Any]] = []
+        named = set()
+        for span in spans:
+            track = tracks[span.span_id]
+            if track not in named:
+                # Each track is named after the first (outermost) span on it
+                named.add(track)
+                events.append({
+                    "name": "thread_name", "ph": "M", "pid": 1, "tid": track,
+                    "args": {"name": f"{span.name} #{track}"},
+                })
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "pid": 1,
+                "tid": track,
+                "ts": (span.start - self._origin) * 1e6,
+                "dur": (span.closed_at - span.start) * 1e6,
+                "args": {
+                    **{key: _jsonable(value) for key, value in span.attributes.items()},
+                    "thread": span.thread,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                },
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def _assign_tracks(spans: List[Span]) -> Dict[int, int]:
+    """Give each span (sorted by start) a track where it nests under its
+    parent if possible."""
+    stacks: List[List[Span]] = []
+    tracks: Dict[int, int] = {}
+    by_id = {span.span_id: span for span in spans}
+
+    def top(track: int, now: float) -> Optional[Span]:
+        stack = stacks[track]
+        while stack and stack[-1].closed_at <= now:
+            stack.pop()
+        return stack[-1] if stack else None
+
+    for span in spans:
+        parent = by_id.get(span.parent_id) if span.parent_id is not None else None
+        track = tracks.get(parent.span_id) if parent is not None else None
+        if not (
+            parent is not None and track is not None
+            and top(track, span.start) is parent and span.closed_at <= parent.closed_at
+        ):
+            track = next(
+                (t for t in range(len(stacks)) if top(t, span.start) is None), None
+            )
+            if track is None:
+                track = len(stacks)
+                stacks.append([])
+        stacks[track].append(span)
+        tracks[span.span_id] = track
+    return tracks
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    return str(value)
+
+
+# Process-wide tracer; span() is a no-op while none is installed
+_tracer: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """Install ``tracer`` for the whole process; returns the previous one."""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+@contextmanager
+def trace_to(path: Optional[Union[str, Path]]) -> Iterator[Optional[Tracer]]:
+    """Trace the block and write a Chrome trace to ``path`` when it exits
+    (even on error). Does nothing when ``path`` is None."""
+    if path is None:
+        yield None
+        return
+    tracer = Tracer()
+    previous = set_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_tracer(previous)
+        tracer.export_chrome_trace(path)
+        logging.info(
+            "Wrote %s spans to %s (open in https://ui.perfetto.dev)",
+            len(tracer.spans), path,
+        )
+
+
+def span(
+    name: str, category: Optional[str] = None, **attributes: Any
+) -> ContextManager[Optional[Span]]:
+    tracer = _tracer
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name, category, **attributes)
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the innermost open span, if tracing."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def submit_with_context(
+    executor: Executor, fn: Callable[..., _T], *args: Any, **kwargs: Any
+) -> "Future[_T]":
+    """``executor.submit`` that carries the caller's span and call labels along."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class TracedProvider(AIModelProvider):
+    """Opens a span around every call to the wrapped provider.
+
+    Wrap the provider that talks to the API, so provider spans measure
+    the model call itself and rate-limit waits show up beside them.
+    """
+
+    def __init__(self, provider: AIModelProvider):
+        self.provider = provider
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        with span(f"provider {model}", "provider", model=model, messages=len(messages)):
+            return self.provider.generate_response(messages, model, temperature)
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        with span(f"provider {model}", "provider", model=model, messages=len(messages)):
+            return await self.provider.generate_response_async(
+                messages, model, temperature
+            )
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        # A span cannot stay open across yields to the consumer
+        return self.provider.stream_response(messages, model, temperature)
+
+    def stream_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> AsyncIterator[str]:
+        return self.provider.stream_response_async(messages, model, temperature)
+
+    def close(self) -> None:
+        """Nothing to release; the wrapped provider is owned by the caller."""
+        pass
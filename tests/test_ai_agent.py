@@ -0,0 +1,114 @@
+# tests/test_ai_agent.py
+
+import asyncio
+from typing import Dict, Iterator, List
+from unittest.mock import Mock
+from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider, AsyncAIModelProvider
+
+
+class StaticProvider(AIModelProvider):
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        return "Test response"
+
+
+class ChunkedProvider(AIModelProvider):
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        return "".join(self.stream_response(messages, model, temperature))
+
+    def stream_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> Iterator[str]:
+        yield from ["Hello", ", ", "world "]
+
+
+class EchoAsyncProvider(AsyncAIModelProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        self.calls += 1
+        await asyncio.sleep(0)
+        return f"echo: {messages[-1]['content']}"
+
+
+def make_agent(provider: AIModelProvider) -> AIAgent:
+    return AIAgent(
+        name="Test Agent",
+        role_description="who tests things.",
+        responsibilities=["Test"],
+        model="gpt-4",
+        ai_provider=provider,
+    )
+
+
+def test_get_response_records_conversation() -> None:
+    provider = Mock(spec=AIModelProvider)
+    provider.generate_response.return_value = "Test response"
+    agent = make_agent(provider)
+
+    assert agent.get_response("hello") == "Test response"
+    assert [m["role"] for m in agent.messages] == ["system", "user", "assistant"]
+    assert agent.latest_response == "Test response"
+
+
+def test_get_response_async_with_sync_provider() -> None:
+    agent = make_agent(StaticProvider())
+
+    assert asyncio.run(agent.get_response_async("hello")) == "Test response"
+    assert agent.messages[-1] == {"role": "assistant", "content": "Test response"}
+
+
+def test_async_provider_sync_wrapper() -> None:
+    provider = EchoAsyncProvider()
+    try:
+        agent = make_agent(provider)
+        assert agent.get_response("one") == "echo: one"
+        assert agent.get_response("two") == "echo: two"
+    finally:
+        provider.close()
+    assert provider.calls == 2
+
+
+def test_many_agents_on_one_loop() -> None:
+    provider = EchoAsyncProvider()
+    agents = [make_agent(provider) for _ in range(200)]
+
+    async def run_all() -> List[str]:
+        return await asyncio.gather(
+            *(
+                agent.get_response_async(f"brief {i}")
+                for i, agent in enumerate(agents)
+            )
+        )
+
+    responses = asyncio.run(run_all())
+    assert responses == [f"echo: brief {i}" for i in range(200)]
+
+
+def test_stream_response_yields_deltas_then_records_reply() -> None:
+    agent = make_agent(ChunkedProvider())
+
+    stream = agent.stream_response("hi")
+    assert next(stream) == "Hello"
+    # Nothing is recorded until the stream is exhausted
+    assert agent.latest_response == ""
+    assert list(stream) == [", ", "world "]
+    assert agent.messages[-1] == {"role": "assistant", "content": "Hello, world"}
+
+
+def test_stream_response_async_falls_back_to_whole_response() -> None:
+    agent = make_agent(EchoAsyncProvider())
+
+    async def collect() -> List[str]:
+        return [delta async for delta in agent.stream_response_async("hi")]
+
+    assert asyncio.run(collect()) == ["echo: hi"]
+    assert agent.latest_response == "echo: hi"
@@ -0,0 +1,154 @@
+# tests/test_ai_consultancy_agents.py
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pytest
+import yaml
+from unittest.mock import Mock, patch
+from agentx.ai_consultancy_agents import AIConsultancy, ConversationStore
+
+AGENT_NAMES = [
+    "AI Business Analyst", "AI IT Consultant", "AI Solution Architect", "AI Tech Lead"
+]
+
+
+@pytest.fixture
+def config_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    # Start each test without the process-wide client
+    monkeypatch.setattr("agentx.ai_consultancy_agents._clients", {})
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({
+        "agents": [
+            {
+                "name": name,
+                "role_description": "who helps",
+                "responsibilities": ["Help"],
+                "model": "GPT35",
+            }
+            for name in AGENT_NAMES
+        ]
+    }))
+    return str(path)
+
+
+def _slow_completion(
+    delay: float = 0.0, barrier: Optional[threading.Barrier] = None
+) -> Callable[..., Mock]:
+    def create(**kwargs: Any) -> Mock:
+        if barrier is not None:
+            # Only passes once every agent's request is in flight at once
+            barrier.wait(timeout=5)
+        time.sleep(delay)
+        if "Tech Lead" in kwargs["messages"][0]["content"]:
+            raise TimeoutError("request timed out")
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = "ok"
+        return response
+    return create
+
+
+@patch("openai.OpenAI")
+def test_concurrent_processing_keeps_order_and_errors(
+    mock_openai: Mock, config_path: str
+) -> None:
+    barrier = threading.Barrier(len(AGENT_NAMES))
+    create = mock_openai.return_value.chat.completions.create
+    create.side_effect = _slow_completion(barrier=barrier)
+    consultancy = AIConsultancy(config_path, max_concurrency=4, agent_timeout=5)
+
+    responses = consultancy.process_client_request("Build a scalable app")
+
+    assert not barrier.broken
+    assert list(responses) == AGENT_NAMES
+    assert responses["AI Business Analyst"] == "ok"
+    assert responses["AI Tech Lead"].startswith(
+        "Error: Error processing request with AI Tech Lead"
+    )
+    for call in mock_openai.return_value.chat.completions.create.call_args_list:
+        assert call.kwargs["timeout"] == 5
+
+
+@patch("openai.OpenAI")
+def test_sequential_processing_is_default(mock_openai: Mock, config_path: str) -> None:
+    mock_openai.return_value.chat.completions.create.side_effect = _slow_completion()
+    consultancy = AIConsultancy(config_path)
+
+    assert consultancy.max_concurrency == 1
+    responses = consultancy.process_client_request("Build a scalable app")
+    assert list(responses) == AGENT_NAMES
+    create = mock_openai.return_value.chat.completions.create
+    assert "timeout" not in create.call_args.kwargs
+
+
+@patch("openai.OpenAI")
+def test_explicit_arguments_override_the_execution_config(
+    mock_openai: Mock, config_path: str
+) -> None:
+    path = Path(config_path)
+    config = yaml.safe_load(path.read_text())
+    config["execution"] = {"max_concurrency": 4, "agent_timeout": 30}
+    path.write_text(yaml.safe_dump(config))
+
+    configured = AIConsultancy(config_path)
+    assert (configured.max_concurrency, configured.agent_timeout) == (4, 30)
+    # Falsy values are explicit too
+    explicit = AIConsultancy(config_path, max_concurrency=0, agent_timeout=0)
+    assert (explicit.max_concurrency, explicit.agent_timeout) == (0, 0)
+
+
+@patch("openai.OpenAI")
+def test_turns_are_appended_to_one_conversation_log(
+    mock_openai: Mock, config_path: str, tmp_path: Path
+) -> None:
+    mock_openai.return_value.chat.completions.create.side_effect = _slow_completion()
+    with AIConsultancy(config_path) as consultancy:
+        consultancy.process_client_request("first")
+        consultancy.process_client_request("second")
+        store = consultancy.conversation_store
+        session = consultancy.agent_session("AI Business Analyst")
+
+    logs = [p.name for p in (tmp_path / "conversations").iterdir()]
+    assert logs == ["conversations.jsonl"]
+    records = list(store.read(session))
+    # Each turn appends only its new messages
+    roles = [r["role"] for r in records]
+    assert roles == ["system", "user", "assistant", "user", "assistant"]
+    assert [r["content"] for r in store.tail(session, lines=2)] == ["second", "ok"]
+
+
+@patch("openai.OpenAI")
+def test_agents_share_one_client_per_process(
+    mock_openai: Mock, config_path: str
+) -> None:
+    first = AIConsultancy(config_path)
+    second = AIConsultancy(config_path)
+
+    clients = {id(agent.client) for c in (first, second) for agent in c.agents.values()}
+    assert clients == {id(mock_openai.return_value)}
+    # The per-agent timeout is the whole budget, so the SDK does not retry
+    mock_openai.assert_called_once_with(api_key="sk-test", max_retries=0)
+
+    client = Mock()
+    injected = AIConsultancy(config_path, client=client)
+    assert all(agent.client is client for agent in injected.agents.values())
+    assert mock_openai.call_count == 1
+
+
+def test_conversation_store_tail_follows_complete_lines(tmp_path: Path) -> None:
+    store = ConversationStore(tmp_path / "log.jsonl", fsync_interval=0)
+    store.append("a", [{"role": "user", "content": "one"}])
+    with open(store.path, "a") as f:
+        f.write('{"session": "a", "role": "user", "content": "tor')
+
+    follower = store.tail("a", follow=True, poll_interval=0.01)
+    assert next(follower)["content"] == "one"
+    with open(store.path, "a") as f:
+        f.write('n"}\n')
+    assert next(follower)["content"] == "torn"
+    store.close()
@@ -0,0 +1,99 @@
+# tests/test_batch.py
+
+import json
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+from agentx.batch import Brief, load_briefs, run_batch
+
+
+def test_load_briefs_from_jsonl_and_csv(tmp_path: Path) -> None:
+    jsonl = tmp_path / "briefs.jsonl"
+    jsonl.write_text(
+        '{"id": "acme", "brief": "Scale our checkout"}\n'
+        "\n"
+        '"Secure our data"\n'
+        '{"client_input": "Migrate to the cloud"}\n'
+    )
+    assert load_briefs(jsonl) == [
+        Brief("acme", "Scale our checkout"),
+        Brief("brief-0002", "Secure our data"),
+        Brief("brief-0003", "Migrate to the cloud"),
+    ]
+
+    csv_path = tmp_path / "briefs.csv"
+    csv_path.write_text('id,text\nacme,"Scale our checkout, fast"\n,Secure our data\n')
+    assert load_briefs(csv_path) == [
+        Brief("acme", "Scale our checkout, fast"),
+        Brief("brief-0002", "Secure our data"),
+    ]
+
+
+def test_load_briefs_rejects_bad_rows(tmp_path: Path) -> None:
+    path = tmp_path / "briefs.jsonl"
+    path.write_text('{"id": "a", "notes": "no brief here"}\n')
+    with pytest.raises(ValueError, match="none of the fields"):
+        load_briefs(path)
+
+    path.write_text('{"id": "a", "brief": "one"}\n{"id": "a", "brief": "two"}\n')
+    with pytest.raises(ValueError, match="duplicate"):
+        load_briefs(path)
+
+
+def test_slow_brief_does_not_block_the_others(tmp_path: Path) -> None:
+    release = threading.Event()
+    finished: List[str] = []
+
+    def run_brief(brief: Brief) -> str:
+        if brief.id == "slow":
+            # Only let the slow brief finish once every fast one has
+            assert release.wait(5)
+        else:
+            finished.append(brief.id)
+            if len(finished) == 3:
+                release.set()
+        return f"# Report for {brief.text}"
+
+    briefs = [Brief("slow", "a"), Brief("b", "b"), Brief("c", "c"), Brief("d", "d")]
+    report = run_batch(briefs, run_brief, tmp_path, max_workers=2)
+
+    lines = (tmp_path / "results.jsonl").read_text().splitlines()
+    # b and c finish (and are written) while the slow brief is still running
+    assert [json.loads(line)["id"] for line in lines][:2] == ["b", "c"]
+    assert (tmp_path / "slow.md").read_text() == "# Report for a"
+    assert not report.failures
+    assert len(report.results) == 4
+
+
+def test_failures_are_reported_and_summarised(tmp_path: Path) -> None:
+    def run_brief(brief: Brief) -> str:
+        if brief.id == "bad":
+            raise RuntimeError("model unavailable")
+        return "report"
+
+    report = run_batch([Brief("ok", "x"), Brief("bad", "y")], run_brief, tmp_path)
+
+    assert [(r.id, r.error) for r in report.failures] == [("bad", "model unavailable")]
+    assert not (tmp_path / "bad.md").exists()
+    assert "FAILED bad: model unavailable" in report.summary()
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["briefs"] == 2
+    assert summary["failed"] == 1
+    assert summary["throughput"] > 0
+
+
+def test_rerun_replaces_results_and_write_errors_fail_one_brief(tmp_path: Path) -> None:
+    run_batch([Brief("old", "x")], lambda brief: "report", tmp_path)
+    # A directory where the report should go makes only that write fail
+    (tmp_path / "blocked.md").mkdir()
+
+    briefs = [Brief("ok", "x"), Brief("blocked", "y")]
+    report = run_batch(briefs, lambda brief: "report", tmp_path)
+
+    assert [r.id for r in report.failures] == ["blocked"]
+    text = (tmp_path / "results.jsonl").read_text()
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert sorted(line["id"] for line in lines) == ["blocked", "ok"]
+    assert json.loads((tmp_path / "summary.json").read_text())["briefs"] == 2
@@ -0,0 +1,101 @@
+# tests/test_cached_provider.py
+
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import Mock
+from agentx.ai_model_provider import AIModelProvider
+from agentx.providers.cached_provider import CachingProvider
+
+MESSAGES = [{"role": "user", "content": "Classify this"}]
+
+
+def make_inner() -> Mock:
+    inner = Mock(spec=AIModelProvider)
+    inner.generate_response.side_effect = (
+        lambda messages, model, temperature: f"answer {model}"
+    )
+    return inner
+
+
+def test_low_temperature_calls_are_cached() -> None:
+    inner = make_inner()
+    provider = CachingProvider(inner)
+
+    expected = "answer gpt-3.5-turbo"
+    assert provider.generate_response(MESSAGES, "gpt-3.5-turbo", 0.3) == expected
+    assert provider.generate_response(list(MESSAGES), "gpt-3.5-turbo", 0.3) == expected
+    assert provider.generate_response(MESSAGES, "gpt-4", 0.3) == "answer gpt-4"
+
+    assert inner.generate_response.call_count == 2
+    assert (provider.hits, provider.misses) == (1, 2)
+
+
+def test_high_temperature_calls_bypass_cache() -> None:
+    inner = make_inner()
+    provider = CachingProvider(inner)
+
+    provider.generate_response(MESSAGES, "gpt-4", 0.7)
+    provider.generate_response(MESSAGES, "gpt-4", 0.7)
+
+    assert inner.generate_response.call_count == 2
+    assert provider.stats["bypassed"] == 2
+
+
+def test_disk_tier_survives_restart_and_expires(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    inner = make_inner()
+    with CachingProvider(inner, disk_path=path) as provider:
+        provider.generate_response(MESSAGES, "gpt-3.5-turbo", 0.0)
+
+    with CachingProvider(inner, disk_path=path) as provider:
+        response = provider.generate_response(MESSAGES, "gpt-3.5-turbo", 0.0)
+        assert response == "answer gpt-3.5-turbo"
+        assert provider.stats["disk_hits"] == 1
+    assert inner.generate_response.call_count == 1
+
+    with CachingProvider(inner, disk_path=path, ttl=0.01) as provider:
+        time.sleep(0.02)
+        provider.generate_response(MESSAGES, "gpt-3.5-turbo", 0.0)
+        assert provider.misses == 1
+    assert inner.generate_response.call_count == 2
+
+
+def test_tiers_evict_least_recently_used(tmp_path: Path) -> None:
+    provider = CachingProvider(
+        make_inner(),
+        memory_entries=2,
+        disk_path=tmp_path / "cache.sqlite3",
+        disk_entries=2,
+    )
+    for model in ["a", "b", "c"]:
+        provider.generate_response(MESSAGES, model, 0.0)
+
+    assert len(provider.memory) == 2
+    assert provider.disk is not None and len(provider.disk) == 2
+    provider.close()
+
+
+def test_async_calls_share_the_cache() -> None:
+    inner = make_inner()
+    inner.generate_response_async = Mock(side_effect=AssertionError("should hit cache"))
+    provider = CachingProvider(inner)
+    provider.generate_response(MESSAGES, "gpt-3.5-turbo", 0.3)
+
+    coroutine = provider.generate_response_async(MESSAGES, "gpt-3.5-turbo", 0.3)
+    result = asyncio.run(coroutine)
+    assert result == "answer gpt-3.5-turbo"
+
+
+def test_streamed_responses_are_cached_once_complete() -> None:
+    inner = make_inner()
+    inner.stream_response.side_effect = (
+        lambda messages, model, temperature: iter(["ans", "wer"])
+    )
+    provider = CachingProvider(inner)
+
+    assert list(provider.stream_response(MESSAGES, "gpt-4", 0.0)) == ["ans", "wer"]
+    assert list(provider.stream_response(MESSAGES, "gpt-4", 0.0)) == ["answer"]
+    assert provider.generate_response(MESSAGES, "gpt-4", 0.0) == "answer"
+    assert inner.stream_response.call_count == 1
+    assert inner.generate_response.call_count == 0
@@ -0,0 +1,124 @@
+# tests/test_checkpoint.py
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider
+from agentx.checkpoint import RunCheckpoint
+from agentx.communication_manager import CommunicationManager
+from agentx.message_store import SQLiteMessageStore
+from agentx.pipeline import (
+    Pipeline, PipelineError, PipelineResult, PipelineStage, StageResult
+)
+
+PIPELINE = Pipeline([
+    PipelineStage("ba", "AI Business Analyst"),
+    PipelineStage("it", "AI IT Consultant", inputs=["ba"]),
+    PipelineStage("pm", "AI Project Manager", inputs=["it"]),
+])
+NAMES = ["AI Business Analyst", "AI IT Consultant", "AI Project Manager"]
+
+
+class CountingProvider(AIModelProvider):
+    def __init__(self, fail_for: Optional[str] = None) -> None:
+        self.fail_for = fail_for
+        self.calls: List[str] = []
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        name = messages[0]["content"][len("You are "):].split(",")[0]
+        self.calls.append(name)
+        if name == self.fail_for:
+            raise RuntimeError("model unavailable")
+        return f"{name}: the business plan and project timeline look fine"
+
+
+def run(
+    provider: AIModelProvider,
+    checkpoint: RunCheckpoint,
+    message_store: Optional[SQLiteMessageStore] = None,
+) -> Tuple[PipelineResult, List[AIAgent]]:
+    agents = make_agents(provider)
+    manager = CommunicationManager(
+        agents=agents, ai_provider=provider,
+        message_store=message_store, session_id=checkpoint.run_id,
+    )
+    completed = checkpoint.completed_stages()
+    checkpoint.restore_agents(agents, completed)
+    result = PIPELINE.run(
+        agents, manager, checkpoint.client_input,
+        on_stage_finished=lambda stage: checkpoint.save_stage(stage, agents),
+        completed=completed,
+    )
+    return result, agents
+
+
+def make_agents(provider: AIModelProvider) -> List[AIAgent]:
+    return [
+        AIAgent(name, "who helps.", ["Help"], "gpt-4", provider) for name in NAMES
+    ]
+
+
+def test_resume_skips_completed_stages(tmp_path: Path) -> None:
+    checkpoint = RunCheckpoint.create("client brief", tmp_path)
+    failing = CountingProvider(fail_for="AI Project Manager")
+    with pytest.raises(PipelineError):
+        run(failing, checkpoint)
+    assert set(checkpoint.completed_stages()) == {"ba", "it"}
+
+    provider = CountingProvider()
+    result, agents = run(provider, RunCheckpoint.load(checkpoint.run_id, tmp_path))
+
+    # Only the failed stage is re-run, with the broadcasts it had received
+    assert provider.calls == ["AI Project Manager"]
+    assert set(result.stages) == {"ba", "it", "pm"}
+    pm = agents[2]
+    assert [m.get("sender") for m in pm.messages].count("AI Business Analyst") == 1
+    latest = agents[0].latest_response
+    assert latest is not None and latest.startswith("AI Business Analyst")
+
+
+def test_resumed_run_appends_to_the_stored_session(tmp_path: Path) -> None:
+    checkpoint = RunCheckpoint.create("client brief", tmp_path)
+    with SQLiteMessageStore(tmp_path / "messages.sqlite3") as store:
+        with pytest.raises(PipelineError):
+            run(CountingProvider(fail_for="AI Project Manager"), checkpoint, store)
+        before = store.messages(session_id=checkpoint.run_id)
+
+        run(CountingProvider(), RunCheckpoint.load(checkpoint.run_id, tmp_path), store)
+        after = store.messages(session_id=checkpoint.run_id)
+
+    # The resumed run's broadcast gets a new id instead of replacing the first
+    assert [m["id"] for m in after] == [0, 1, 2]
+    assert [m["sender"] for m in after] == NAMES
+    assert after[:2] == before
+
+
+def test_snapshot_leaves_out_broadcasts_of_unfinished_stages(tmp_path: Path) -> None:
+    checkpoint = RunCheckpoint.create("client brief", tmp_path)
+    agents = make_agents(CountingProvider())
+    pm = agents[2]
+    pm.receive_message(
+        {"role": "assistant", "content": "plan", "sender": "AI Business Analyst"}
+    )
+    # The IT Consultant's stage is still running, but its broadcast reached
+    # the PM
+    pm.receive_message(
+        {"role": "assistant", "content": "audit", "sender": "AI IT Consultant"}
+    )
+    stage = StageResult("ba", "AI Business Analyst", "plan", 0.0, 1.0)
+    checkpoint.save_stage(stage, agents)
+
+    restored = make_agents(CountingProvider())
+    RunCheckpoint.load(checkpoint.run_id, tmp_path).restore_agents(restored)
+    assert [m.get("sender") for m in restored[2].messages if "sender" in m] == [
+        "AI Business Analyst"
+    ]
+
+
+def test_unknown_run_id_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        RunCheckpoint.load("missing", tmp_path)
@@ -0,0 +1,178 @@
+# tests/test_coalescing_provider.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pytest
+from agentx.ai_model_provider import AIModelProvider
+from agentx.providers.coalescing_provider import CoalescingProvider
+
+MESSAGES = [{"role": "user", "content": "Classify this"}]
+
+
+class SlowProvider(AIModelProvider):
+    def __init__(
+        self, delay: float = 0.05, error: Optional[Exception] = None
+    ) -> None:
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"answer {messages[-1]['content']}"
+
+    async def generate_response_async(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"answer {messages[-1]['content']}"
+
+
+def test_identical_threaded_calls_share_one_request() -> None:
+    inner = SlowProvider()
+    provider = CoalescingProvider(inner)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(provider.generate_response, MESSAGES, "gpt-4", 0.3)
+            for _ in range(8)
+        ]
+        other = executor.submit(
+            provider.generate_response,
+            [{"role": "user", "content": "other"}],
+            "gpt-4",
+            0.3,
+        )
+        results = [future.result() for future in futures]
+
+    assert results == ["answer Classify this"] * 8
+    assert other.result() == "answer other"
+    assert inner.calls == 2
+    assert provider.saved_calls == 7
+    assert provider.in_flight == 0
+
+
+def test_async_callers_coalesce_with_each_other() -> None:
+    inner = SlowProvider()
+    provider = CoalescingProvider(inner)
+
+    async def run_all() -> List[str]:
+        return await asyncio.gather(
+            *(
+                provider.generate_response_async(MESSAGES, "gpt-4", 0.3)
+                for _ in range(5)
+            )
+        )
+
+    assert asyncio.run(run_all()) == ["answer Classify this"] * 5
+    assert inner.calls == 1
+    assert provider.stats == {"calls": 1, "coalesced": 4}
+
+
+def test_waiters_share_the_leader_error_and_next_call_retries() -> None:
+    inner = SlowProvider(error=RuntimeError("boom"))
+    provider = CoalescingProvider(inner)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(provider.generate_response, MESSAGES, "gpt-4", 0.3)
+            for _ in range(3)
+        ]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+    assert inner.calls == 1
+
+    inner.error = None
+    assert provider.generate_response(MESSAGES, "gpt-4", 0.3) == "answer Classify this"
+    assert inner.calls == 2
+
+
+def test_sampled_calls_can_opt_out() -> None:
+    inner = SlowProvider(delay=0.01)
+    provider = CoalescingProvider(inner, max_temperature=0.3)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(
+            lambda _: provider.generate_response(MESSAGES, "gpt-4", 0.7), range(3)
+        ))
+    assert inner.calls == 3
+    assert provider.saved_calls == 0
+
+
+def test_identical_sampled_calls_are_sent_separately_by_default() -> None:
+    # Both calls must be in flight at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    class BarrierProvider(AIModelProvider):
+        def generate_response(
+            self, messages: List[Dict[str, str]], model: str, temperature: float
+        ) -> str:
+            barrier.wait()
+            return "sampled"
+
+    provider = CoalescingProvider(BarrierProvider())
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(
+            lambda _: provider.generate_response(MESSAGES, "gpt-4", 0.7), range(2)
+        ))
+    assert results == ["sampled", "sampled"]
+    assert provider.saved_calls == 0
+
+
+def test_cancelled_leader_hands_the_call_to_a_waiter() -> None:
+    class HangingFirstCall(AIModelProvider):
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def generate_response(
+            self, messages: List[Dict[str, str]], model: str, temperature: float
+        ) -> str:
+            raise NotImplementedError
+
+        async def generate_response_async(
+            self, messages: List[Dict[str, str]], model: str, temperature: float
+        ) -> str:
+            self.calls += 1
+            if self.calls == 1:
+                await asyncio.Event().wait()
+            await asyncio.sleep(0)
+            return "answer"
+
+    inner = HangingFirstCall()
+    provider = CoalescingProvider(inner)
+
+    async def run_all() -> List[str]:
+        leader = asyncio.ensure_future(
+            provider.generate_response_async(MESSAGES, "gpt-4", 0.3)
+        )
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.ensure_future(
+                provider.generate_response_async(MESSAGES, "gpt-4", 0.3)
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    # The waiters neither see the leader's CancelledError nor hang on it
+    assert asyncio.run(run_all()) == ["answer", "answer"]
+    assert inner.calls == 2
+    assert provider.stats == {"calls": 2, "coalesced": 1}
+    assert provider.in_flight == 0
@@ -1,49 +1,412 @@
 # tests/test_communication_manager.py
 
+import asyncio
+import io
+import threading
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set
 from unittest.mock import Mock, patch
-from agentx.communication_manager import CommunicationManager, TopicCategory
+from agentx.communication_manager import (
+    DEFAULT_TOPIC_KEYWORDS,
+    ClassificationBatcher,
+    CommunicationManager,
+    KeywordTopicMatcher,
+    ReportWriter,
+    TopicCategory,
+    TopicRouter,
+    VectorTopicRouter,
+    load_topic_keywords,
+)
 from agentx.providers.openai_provider import OpenAIProvider
 from agentx.ai_agent import AIAgent
 
+
 @pytest.fixture
-def mock_ai_provider():
+def mock_ai_provider() -> Mock:
     provider = Mock(spec=OpenAIProvider)
     provider.generate_response.return_value = "Test response"
     return provider
 
+
 @pytest.fixture
-def mock_agent():
+def mock_agent() -> Mock:
     agent = Mock(spec=AIAgent)
     agent.name = "Test Agent"
     return agent
 
+
 @pytest.fixture
-def communication_manager(mock_ai_provider):
+def communication_manager(mock_ai_provider: Mock) -> CommunicationManager:
     return CommunicationManager(agents=[], ai_provider=mock_ai_provider)
 
-def test_analyze_message_content(communication_manager):
+
+def test_analyze_message_content(communication_manager: CommunicationManager) -> None:
     # Test business-related content
     business_message = "We need to analyze the ROI of this project"
     topics = communication_manager._analyze_message_content(business_message)
     assert TopicCategory.BUSINESS in topics
 
-def test_analyze_message_content_technical(communication_manager):
+
+def test_analyze_message_content_technical(
+    communication_manager: CommunicationManager
+) -> None:
     # Test technical content
     tech_message = "The API integration needs to be implemented"
     topics = communication_manager._analyze_message_content(tech_message)
     assert TopicCategory.TECHNICAL in topics
 
-def test_empty_message_content(communication_manager):
+
+def test_empty_message_content(communication_manager: CommunicationManager) -> None:
     # Test empty content
     empty_message = ""
     topics = communication_manager._analyze_message_content(empty_message)
     assert len(topics) == 0
 
+
 @patch('agentx.communication_manager.CommunicationManager._ai_analyze_content')
-def test_ai_fallback_analysis(mock_ai_analyze, communication_manager):
+def test_ai_fallback_analysis(
+    mock_ai_analyze: Mock, communication_manager: CommunicationManager
+) -> None:
     mock_ai_analyze.return_value = {TopicCategory.BUSINESS}
     message = "This is a very ambiguous message"
     topics = communication_manager._analyze_message_content(message)
     assert mock_ai_analyze.called
-    assert TopicCategory.BUSINESS in topics
\ No newline at end of file
+    assert TopicCategory.BUSINESS in topics
+
+
+def test_broadcast_message_async_delivers_to_relevant_agents(
+    mock_ai_provider: Mock
+) -> None:
+    sender = AIAgent("AI Business Analyst", "analyst", [], "gpt-4", mock_ai_provider)
+    recipient = AIAgent("AI Tech Lead", "lead", [], "gpt-4", mock_ai_provider)
+    manager = CommunicationManager(
+        agents=[sender, recipient], ai_provider=mock_ai_provider
+    )
+
+    asyncio.run(manager.broadcast_message_async(sender, "The API integration is ready"))
+
+    assert recipient.messages[-1]["content"] == "The API integration is ready"
+    assert manager.get_message_history()[-1]["sender"] == "AI Business Analyst"
+
+
+def test_keyword_matcher_single_pass_semantics() -> None:
+    matcher = KeywordTopicMatcher(DEFAULT_TOPIC_KEYWORDS)
+    topics = matcher.match("Our System Design covers the new requirements")
+    assert topics == {
+        TopicCategory.ARCHITECTURE, TopicCategory.TECHNICAL, TopicCategory.BUSINESS
+    }
+    # Keywords only match at word starts
+    assert matcher.match("digital capital") == set()
+
+
+def test_keyword_matcher_rejects_longer_words() -> None:
+    matcher = KeywordTopicMatcher(
+        {TopicCategory.TECHNICAL: ["api"], TopicCategory.DEVOPS: ["git"]}
+    )
+    # Keywords only match up to a word end, allowing common inflections
+    assert matcher.match("Our apiary is on GitHub") == set()
+    assert matcher.match("Two APIs, tracked in git") == {
+        TopicCategory.TECHNICAL, TopicCategory.DEVOPS
+    }
+
+
+def test_topic_keywords_from_yaml(tmp_path: Path, mock_ai_provider: Mock) -> None:
+    path = tmp_path / "topics.yaml"
+    path.write_text("topic_keywords:\n  security: [phishing]\n  business: [Revenue]\n")
+    manager = CommunicationManager(
+        agents=[],
+        ai_provider=mock_ai_provider,
+        topic_keywords=load_topic_keywords(str(path)),
+    )
+    assert manager._analyze_message_content("Phishing hurts revenue") == {
+        TopicCategory.SECURITY, TopicCategory.BUSINESS
+    }
+
+
+def test_history_records_topics_and_recipients_once(mock_ai_provider: Mock) -> None:
+    sender = AIAgent("AI Business Analyst", "analyst", [], "gpt-4", mock_ai_provider)
+    tech_lead = AIAgent("AI Tech Lead", "lead", [], "gpt-4", mock_ai_provider)
+    manager = CommunicationManager(
+        agents=[sender, tech_lead], ai_provider=mock_ai_provider
+    )
+    manager.broadcast_message(sender, "The API integration is ready")
+    manager.broadcast_message(sender, "Budget approved by stakeholders")
+
+    with patch.object(manager, "_analyze_message_content") as analyze:
+        interactions = manager.get_agent_interactions("AI Tech Lead")
+        sent = manager.get_agent_interactions("AI Business Analyst")
+    analyze.assert_not_called()
+
+    assert [m["content"] for m in interactions] == ["The API integration is ready"]
+    assert interactions[0]["topics"] == ["technical"]
+    assert interactions[0]["recipients"] == ["AI Tech Lead"]
+    assert len(sent) == 2
+    # Agents receive the chat message with its topics, not the history record
+    assert set(tech_lead.messages[-1]) == {"role", "content", "sender", "topics"}
+
+
+def test_routing_index_tracks_runtime_registration(mock_ai_provider: Mock) -> None:
+    sender = AIAgent("AI Business Analyst", "analyst", [], "gpt-4", mock_ai_provider)
+    markdown = AIAgent(
+        "AI Markdown Output Agent", "formatter", [], "gpt-4", mock_ai_provider
+    )
+    manager = CommunicationManager(
+        agents=[sender, markdown], ai_provider=mock_ai_provider
+    )
+    specialist = AIAgent(
+        "AI Security Specialist", "specialist", [], "gpt-4", mock_ai_provider
+    )
+    auditor = AIAgent("AI Auditor", "auditor", [], "gpt-4", mock_ai_provider)
+
+    manager.register_agent(specialist, topics={TopicCategory.SECURITY})
+    topics = {TopicCategory.SECURITY, TopicCategory.BUSINESS}
+    manager.register_agent(auditor, topics=topics)
+    assert manager._get_relevant_agents(topics, sender) == [specialist, auditor]
+
+    manager.unregister_agent("AI Security Specialist")
+    assert manager._get_relevant_agents(topics, sender) == [auditor]
+    assert specialist not in manager.agents
+    # Agents without topics, like the Markdown Output Agent, are never routed to
+    assert markdown not in manager._get_relevant_agents(set(TopicCategory), sender)
+
+
+class SlowReceiver(AIAgent):
+    def __init__(
+        self,
+        name: str,
+        provider: Mock,
+        delay: float = 0.0,
+        fail: bool = False,
+        barrier: Optional[threading.Barrier] = None,
+    ) -> None:
+        super().__init__(name, "receiver", [], "gpt-4", provider)
+        self.delay = delay
+        self.fail = fail
+        self.barrier = barrier
+
+    def receive_message(self, message: Dict[str, str]) -> None:
+        if self.barrier is not None:
+            # Only passes once every receiver is being delivered to at once
+            self.barrier.wait(timeout=5)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("receiver offline")
+        super().receive_message(message)
+
+
+def test_parallel_delivery_isolates_slow_and_failing_recipients(
+    mock_ai_provider: Mock
+) -> None:
+    sender = AIAgent("AI Business Analyst", "analyst", [], "gpt-4", mock_ai_provider)
+    barrier = threading.Barrier(4)
+    receivers = [
+        SlowReceiver(f"Receiver {i}", mock_ai_provider, barrier=barrier)
+        for i in range(4)
+    ]
+    broken = SlowReceiver("Broken Receiver", mock_ai_provider, fail=True)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        manager = CommunicationManager(
+            agents=[sender], ai_provider=mock_ai_provider, delivery_executor=executor
+        )
+        for agent in receivers + [broken]:
+            manager.register_agent(agent, topics={TopicCategory.BUSINESS})
+
+        manager.broadcast_message(sender, "Budget review")
+
+    # Serial delivery would leave the first receiver alone at the barrier
+    assert not barrier.broken
+    assert all(r.messages[-1]["content"] == "Budget review" for r in receivers)
+    assert broken.messages == []
+
+
+def test_parallel_delivery_preserves_per_recipient_order(
+    mock_ai_provider: Mock
+) -> None:
+    sender = AIAgent("AI Business Analyst", "analyst", [], "gpt-4", mock_ai_provider)
+    slow = SlowReceiver("Slow Receiver", mock_ai_provider, delay=0.02)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        manager = CommunicationManager(
+            agents=[sender], ai_provider=mock_ai_provider,
+            delivery_executor=executor, delivery_timeout=0.001,
+        )
+        manager.register_agent(slow, topics={TopicCategory.BUSINESS})
+        for i in range(5):
+            asyncio.run(manager.broadcast_message_async(sender, f"budget update {i}"))
+
+    expected = [f"budget update {i}" for i in range(5)]
+    assert [m["content"] for m in slow.messages] == expected
+
+
+def test_report_writer_streams_sections_in_document_order(
+    mock_ai_provider: Mock
+) -> None:
+    names = [
+        "AI Business Analyst",
+        "AI IT Consultant",
+        "AI Solution Architect",
+        "AI Tech Lead",
+    ]
+    agents = [AIAgent(name, "role", [], "gpt-4", mock_ai_provider) for name in names]
+    output = io.StringIO()
+    report = ReportWriter(agents, [output])
+
+    # Technical Assessment waits for the Business Analysis section ahead of it
+    agents[1].latest_response = "it"
+    report.agent_finished("AI IT Consultant")
+    assert "Technical Assessment" not in output.getvalue()
+
+    agents[0].latest_response = "ba"
+    report.agent_finished("AI Business Analyst")
+    assert "### Technical Assessment\nit" in output.getvalue()
+
+    # Architecture & Design needs both the Solution Architect and Tech Lead
+    agents[2].latest_response = "sa"
+    report.agent_finished("AI Solution Architect")
+    assert "Architecture & Design" not in output.getvalue()
+    agents[3].latest_response = "tl"
+    report.agent_finished("AI Tech Lead")
+    assert "### AI Tech Lead Assessment\ntl" in output.getvalue()
+
+    final = report.finish()
+    assert output.getvalue() == final
+    manager = CommunicationManager(agents=agents, ai_provider=mock_ai_provider)
+    assert manager.review_and_collate_responses() == final
+
+
+def test_classification_batcher_splits_one_json_reply(mock_ai_provider: Mock) -> None:
+    mock_ai_provider.generate_response.return_value = (
+        'Here you go: {"1": ["Business"], "2": ["Technical", "Security"]}'
+    )
+    # A long max_wait, so only the batch size triggers a send
+    batcher = ClassificationBatcher(
+        mock_ai_provider, model="small-model", max_batch_size=2, max_wait=60
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(batcher.classify, "quarterly numbers")
+        second = executor.submit(batcher.classify, "login hardening")
+        assert first.result() == {TopicCategory.BUSINESS}
+        assert second.result() == {TopicCategory.TECHNICAL, TopicCategory.SECURITY}
+
+    assert mock_ai_provider.generate_response.call_count == 1
+    call = mock_ai_provider.generate_response.call_args.kwargs
+    assert call["model"] == "small-model"
+    assert "1. quarterly numbers" in call["messages"][0]["content"]
+    assert batcher.stats == {"requests": 2, "batches": 1, "fallbacks": 0}
+
+
+def test_classification_batcher_falls_back_to_single_calls(
+    mock_ai_provider: Mock
+) -> None:
+    replies = iter(["not json at all", "business", "devops"])
+    mock_ai_provider.generate_response.side_effect = lambda **kwargs: next(replies)
+    batcher = ClassificationBatcher(mock_ai_provider, max_batch_size=2, max_wait=60)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(batcher.classify, ["a", "b"]))
+
+    # Each caller makes its own single call, in whichever order they wake
+    assert {frozenset(topics) for topics in results} == {
+        frozenset({TopicCategory.BUSINESS}), frozenset({TopicCategory.DEVOPS})
+    }
+    assert mock_ai_provider.generate_response.call_count == 3
+    assert batcher.stats["fallbacks"] == 2
+
+
+def test_ambiguous_broadcasts_are_batched_across_sessions(
+    mock_ai_provider: Mock
+) -> None:
+    reply = '{"1": ["business"], "2": ["business"]}'
+    mock_ai_provider.generate_response.return_value = reply
+    batcher = ClassificationBatcher(mock_ai_provider, max_batch_size=2, max_wait=60)
+    managers = [
+        CommunicationManager(
+            agents=[], ai_provider=mock_ai_provider, classification_batcher=batcher
+        )
+        for _ in range(2)
+    ]
+
+    async def classify_all() -> List[Set[TopicCategory]]:
+        return await asyncio.gather(
+            *(manager._analyze_message_content_async("hmm") for manager in managers)
+        )
+
+    assert asyncio.run(classify_all()) == [{TopicCategory.BUSINESS}] * 2
+    assert mock_ai_provider.generate_response.call_count == 1
+
+
+def test_classification_batcher_flush_sends_pending_items(
+    mock_ai_provider: Mock
+) -> None:
+    reply = '{"1": ["security"], "2": ["devops"]}'
+    mock_ai_provider.generate_response.return_value = reply
+    batcher = ClassificationBatcher(mock_ai_provider, max_wait=60)
+
+    futures = [batcher._submit("a"), batcher._submit("b")]
+    assert not any(future.done() for future in futures)
+    batcher.flush()
+
+    assert [future.result() for future in futures] == [
+        {TopicCategory.SECURITY}, {TopicCategory.DEVOPS}
+    ]
+    assert batcher.stats == {"requests": 2, "batches": 1, "fallbacks": 0}
+
+
+def test_classification_batcher_close_sends_pending_items_once(
+    mock_ai_provider: Mock
+) -> None:
+    reply = '{"1": ["security"], "2": ["devops"]}'
+    mock_ai_provider.generate_response.return_value = reply
+    batcher = ClassificationBatcher(mock_ai_provider, max_batch_size=3, max_wait=60)
+
+    futures = [batcher._submit("a"), batcher._submit("b")]
+    batcher.close()
+    assert [future.result() for future in futures] == [
+        {TopicCategory.SECURITY}, {TopicCategory.DEVOPS}
+    ]
+
+    # After close nothing is queued; each caller makes its own call
+    late = [batcher._submit(content) for content in "cde"]
+    assert [future.result() for future in late] == [None] * 3
+    assert mock_ai_provider.generate_response.call_count == 1
+    assert batcher.stats == {"requests": 5, "batches": 1, "fallbacks": 0}
+
+
+def test_vector_router_classifies_without_keyword_hits() -> None:
+    pytest.importorskip("numpy")
+    router = VectorTopicRouter()
+
+    # No keyword matches, but inflections and related vocabulary do
+    assert router.route("The encrypted credentials were leaked in a breach") == {
+        TopicCategory.SECURITY
+    }
+    assert router.route("Please estimate the deliverables and staffing") == {
+        TopicCategory.PROJECT_MANAGEMENT
+    }
+    assert router.route("Let's have lunch") is None
+    assert router.stats == {"routed": 2, "escalated": 1}
+
+
+def test_local_router_runs_before_llm_fallback(mock_ai_provider: Mock) -> None:
+    class FixedRouter(TopicRouter):
+        def __init__(self, topics: Optional[Set[TopicCategory]]) -> None:
+            self.topics = topics
+
+        def route(self, content: str) -> Optional[Set[TopicCategory]]:
+            return self.topics
+
+    manager = CommunicationManager(
+        agents=[],
+        ai_provider=mock_ai_provider,
+        topic_router=FixedRouter({TopicCategory.DEVOPS}),
+    )
+    assert manager._analyze_message_content("hmm") == {TopicCategory.DEVOPS}
+    assert not mock_ai_provider.generate_response.called
+
+    # Below the router's confidence threshold the LLM is still consulted
+    manager.topic_router = FixedRouter(None)
+    mock_ai_provider.generate_response.return_value = "business"
+    assert manager._analyze_message_content("hmm") == {TopicCategory.BUSINESS}
@@ -0,0 +1,113 @@
+# tests/test_context_window.py
+
+from typing import Any, Dict
+from unittest.mock import Mock, patch
+from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider
+from agentx.context_window import (
+    HistoryCompactor,
+    RecentMessagesPolicy,
+    TokenCounter,
+    TopicRelevancePolicy,
+)
+
+
+def message(role: str, content: str, **extra: Any) -> Dict[str, Any]:
+    return dict(role=role, content=content, **extra)
+
+
+HISTORY = [
+    message("system", "sys"),
+    message(
+        "assistant", "old security note",
+        sender="AI IT Consultant", topics=["security"],
+    ),
+    message(
+        "assistant", "budget note",
+        sender="AI Business Analyst", topics=["business"],
+    ),
+    message("user", "question"),
+    message(
+        "assistant", "latest design",
+        sender="AI Solution Architect", topics=["architecture"],
+    ),
+]
+COUNTS = [10, 30, 30, 10, 20]
+
+
+def test_token_counter_counts_words_and_punctuation() -> None:
+    counter = TokenCounter("unknown-model")
+    with patch.object(counter, "_get_encoding", return_value=None):
+        assert counter.count("Hello, world!") == 4
+
+
+def test_recent_messages_policy_keeps_system_and_recent_tail() -> None:
+    keep = RecentMessagesPolicy().select(HISTORY, COUNTS, budget=45)
+    assert keep == [0, 3, 4]
+
+
+def test_topic_relevance_policy_drops_least_relevant_broadcasts() -> None:
+    policy = TopicRelevancePolicy({"security", "architecture"})
+    assert policy.select(HISTORY, COUNTS, budget=70) == [0, 1, 3, 4]
+    # Falls back to recency once every broadcast that can go is gone
+    assert policy.select(HISTORY, COUNTS, budget=30) == [0, 4]
+
+
+def test_agent_trims_history_and_counts_incrementally() -> None:
+    provider = Mock(spec=AIModelProvider)
+    provider.generate_response.return_value = "ok " * 20
+    agent = AIAgent(
+        "AI Tech Lead", "lead", [], "gpt-4", provider, max_context_tokens=80
+    )
+
+    counter = agent.token_counter
+    with patch.object(
+        counter, "count_message", wraps=counter.count_message
+    ) as count:
+        for turn in range(5):
+            agent.get_response(f"turn {turn}")
+        # Each message is tokenized once (system, 5 inputs, 4 earlier replies)
+        assert count.call_count == 10
+
+    assert len(agent.messages) < 11
+
+    sent = provider.generate_response.call_args.kwargs["messages"]
+    assert sent[0]["role"] == "system"
+    assert sent[-1] == {"role": "user", "content": "turn 4"}
+    assert agent.context_tokens <= 80
+
+
+def test_agent_compacts_old_broadcasts_into_rolling_summary() -> None:
+    summarizer = Mock(spec=AIModelProvider)
+    summarizer.generate_response.side_effect = ["summary one", "summary two"]
+    provider = Mock(spec=AIModelProvider)
+    provider.generate_response.return_value = "reply"
+    compactor = HistoryCompactor(summarizer, threshold_tokens=40, keep_recent=1)
+    agent = AIAgent(
+        "AI Tech Lead", "lead", [], "gpt-4", provider, compactor=compactor
+    )
+
+    for i in range(3):
+        agent.receive_message(
+            message("assistant", f"broadcast {i} " * 5, sender="AI Architect")
+        )
+    agent.get_response("turn 1")
+
+    assert [m["content"] for m in agent.messages[1:]] == [
+        HistoryCompactor.SUMMARY_HEADER + "summary one", "turn 1", "reply",
+    ]
+    sent = summarizer.generate_response.call_args.kwargs["messages"]
+    assert "broadcast 2" in sent[1]["content"]
+
+    agent.receive_message(
+        message("assistant", "later broadcast " * 10, sender="AI Architect")
+    )
+    agent.get_response("turn 2")
+
+    # Incremental: only the previous summary and the newly aged broadcast are sent
+    prompt = summarizer.generate_response.call_args.kwargs["messages"][1]["content"]
+    assert "summary one" in prompt and "later broadcast" in prompt
+    assert "broadcast 0" not in prompt
+    assert [m.get("summary") for m in agent.messages].count(True) == 1
+    assert agent.messages[1]["content"].endswith("summary two")
+    assert agent.context_tokens == sum(agent._token_counts)
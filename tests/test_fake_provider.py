@@ -0,0 +1,80 @@
+# tests/test_fake_provider.py
+
+import asyncio
+import statistics
+from typing import List
+
+import pytest
+from agentx.communication_manager import _parse_batch_categories, _parse_categories
+from agentx.providers.fake_provider import FakeProvider, FakeProviderError
+from agentx.providers.rate_limited_provider import is_rate_limit_error
+
+MESSAGES = [{"role": "user", "content": "Assess our security posture"}]
+
+
+def test_replies_are_deterministic_per_seed_and_request() -> None:
+    first, second = FakeProvider(seed=1), FakeProvider(seed=1)
+    replies = [first.generate_response(MESSAGES, "gpt-4", 0.7) for _ in range(3)]
+
+    again = [second.generate_response(MESSAGES, "gpt-4", 0.7) for _ in range(3)]
+    assert again == replies
+    # Repeats of a request differ from each other, as sampled replies would
+    assert len(set(replies)) == 3
+    assert FakeProvider(seed=2).generate_response(MESSAGES, "gpt-4", 0.7) != replies[0]
+    assert 80 <= len(replies[0].split()) <= 200
+
+
+def test_async_matches_sync() -> None:
+    reply = FakeProvider().generate_response(MESSAGES, "gpt-4", 0.7)
+    coroutine = FakeProvider().generate_response_async(MESSAGES, "gpt-4", 0.7)
+    assert asyncio.run(coroutine) == reply
+
+
+def test_injected_failures() -> None:
+    provider = FakeProvider(failure_rate=0.3, rate_limit_rate=0.1)
+    outcomes = []
+    for number in range(500):
+        messages = [{"role": "user", "content": str(number)}]
+        try:
+            provider.generate_response(messages, "gpt-4", 0.7)
+            outcomes.append("ok")
+        except FakeProviderError as e:
+            outcomes.append("rate_limited" if is_rate_limit_error(e) else "failed")
+
+    assert outcomes.count("rate_limited") == provider.stats["rate_limited"]
+    assert outcomes.count("failed") == provider.stats["failures"]
+    assert 25 <= provider.stats["rate_limited"] <= 80
+    assert 100 <= provider.stats["failures"] <= 200
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "exponential", "lognormal"])
+def test_latency_distributions_have_the_requested_mean(distribution: str) -> None:
+    delays: List[float] = []
+    provider = FakeProvider(
+        latency=0.2, distribution=distribution, sleep=delays.append
+    )
+    for number in range(2000):
+        messages = [{"role": "user", "content": str(number)}]
+        provider.generate_response(messages, "gpt-4", 0.7)
+
+    assert statistics.mean(delays) == pytest.approx(0.2, rel=0.1)
+
+
+def test_classification_prompts_get_parseable_answers() -> None:
+    provider = FakeProvider()
+    prompt = "categorize it into one or more of these categories: ..."
+    single = provider.generate_response(
+        [{"role": "user", "content": prompt}], "gpt-3.5-turbo", 0.3
+    )
+    assert _parse_categories(single)
+
+    batch_prompt = (
+        "categorize it into one or more of these categories: ...\n"
+        "Return only a JSON object mapping every item number to a list\n\n"
+        "        1. first item\n\n        2. second item"
+    )
+    batch = provider.generate_response(
+        [{"role": "user", "content": batch_prompt}], "gpt-3.5-turbo", 0.3
+    )
+    parsed = _parse_batch_categories(batch, 2)
+    assert set(parsed) == {0, 1} and all(parsed.values())
@@ -0,0 +1,60 @@
+# tests/test_import_time.py
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+SRC = str(Path(__file__).parent.parent / "src")
+
+# Everything a batch job or a test session imports up front
+MODULES = [
+    "agentx.ai_consultancy_agents",
+    "agentx.communication_manager",
+    "agentx.pipeline",
+    "agentx.metrics",
+    "agentx.tracing",
+    "agentx.logging_config",
+    "agentx.providers.openai_provider",
+    "agentx.providers.cached_provider",
+    "agentx.providers.coalescing_provider",
+    "agentx.providers.rate_limited_provider",
+    "agentx.providers.fake_provider",
+]
+
+# Imported on first provider use or config load, never at import time
+LAZY = {"openai", "httpx", "yaml", "dotenv", "tiktoken"}
+
+# Measured at ~120 ms; importing the openai SDK alone takes ~650 ms
+BUDGET_SECONDS = 0.4
+
+
+def import_times() -> List[Tuple[str, int, float]]:
+    """``python -X importtime`` for MODULES in a fresh interpreter, as
+    (module, nesting depth, cumulative seconds) tuples."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(MODULES)}"],
+        env={"PYTHONPATH": SRC}, capture_output=True, text=True, check=True,
+    )
+    times: List[Tuple[str, int, float]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        times.append((name.strip(), depth, int(cumulative) / 1e6))
+    return times
+
+
+def test_heavy_dependencies_are_not_imported_eagerly() -> None:
+    imported = {name.split(".")[0] for name, _, _ in import_times()}
+    assert not imported & LAZY
+
+
+def test_import_time_budget() -> None:
+    # Top-level entries only: nested imports are counted in their importer
+    total = sum(
+        seconds for name, depth, seconds in import_times()
+        if depth == 0 and name.startswith("agentx")
+    )
+    assert total < BUDGET_SECONDS, f"importing agentx took {total:.3f}s"
@@ -0,0 +1,76 @@
+# tests/test_logging_config.py
+
+import logging
+import logging.handlers
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from agentx.logging_config import configure_logging, shutdown_logging
+
+SRC = str(Path(__file__).parent.parent / "src")
+
+
+@pytest.fixture
+def root_logger() -> Iterator[logging.Logger]:
+    root = logging.getLogger()
+    level, handlers = root.level, list(root.handlers)
+    yield root
+    shutdown_logging()
+    root.setLevel(level)
+    assert root.handlers == handlers
+
+
+def test_importing_the_consultancy_does_not_configure_logging(tmp_path: Path) -> None:
+    script = (
+        "import logging, agentx.ai_consultancy_agents;"
+        "print(len(logging.getLogger().handlers))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, env={"PYTHONPATH": SRC},
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "0"
+    assert not (tmp_path / "ai_consultancy.log").exists()
+
+
+def test_records_go_through_a_queue_to_a_rotating_file(
+    root_logger: logging.Logger, tmp_path: Path
+) -> None:
+    path = tmp_path / "logs" / "run.log"
+    configure_logging(
+        path, fmt="%(levelname)s %(message)s", max_bytes=200, backup_count=2,
+        console=False,
+    )
+
+    handler = root_logger.handlers[-1]
+    assert isinstance(handler, logging.handlers.QueueHandler)
+    for number in range(20):
+        logging.info("Message %s sent to %s", number, "AI Tech Lead")
+    logging.debug("filtered out")
+    shutdown_logging()
+
+    names = sorted(p.name for p in path.parent.iterdir())
+    assert names == ["run.log", "run.log.1", "run.log.2"]
+    lines = path.read_text().splitlines()
+    assert lines[-1] == "INFO Message 19 sent to AI Tech Lead"
+    assert "filtered out" not in path.read_text()
+
+
+def test_blocking_mode_and_reconfiguring_replace_the_handlers(
+    root_logger: logging.Logger, tmp_path: Path
+) -> None:
+    configure_logging(tmp_path / "first.log", console=False)
+    configure_logging(
+        tmp_path / "second.log", fmt="%(message)s", non_blocking=False, console=False
+    )
+
+    added = [
+        h for h in root_logger.handlers
+        if isinstance(h, logging.handlers.RotatingFileHandler)
+    ]
+    assert len(added) == 1
+    logging.warning("written directly")
+    assert (tmp_path / "second.log").read_text() == "written directly\n"
@@ -0,0 +1,67 @@
+# tests/test_message_store.py
+
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from unittest.mock import Mock
+
+from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider
+from agentx.communication_manager import CommunicationManager
+from agentx.message_store import SQLiteMessageStore
+
+NAMES = ["AI Business Analyst", "AI IT Consultant", "AI Solution Architect"]
+
+
+def make_manager(
+    store: Optional[SQLiteMessageStore] = None, **kwargs: Any
+) -> Tuple[CommunicationManager, List[AIAgent]]:
+    provider = Mock(spec=AIModelProvider)
+    agents = [AIAgent(name, "role", [], "gpt-4", provider) for name in NAMES]
+    manager = CommunicationManager(
+        agents=agents, ai_provider=provider, message_store=store, **kwargs
+    )
+    return manager, agents
+
+
+def test_history_survives_restart_and_is_queryable(tmp_path: Path) -> None:
+    path = tmp_path / "messages.sqlite3"
+    with SQLiteMessageStore(path, batch_size=10) as store:
+        manager, agents = make_manager(store, session_id="s1")
+        manager.broadcast_message(agents[0], "The security budget needs review")
+        manager.broadcast_message(agents[2], "Proposed architecture for the system")
+        assert store.sessions() == ["s1"]
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    with SQLiteMessageStore(path) as store:
+        messages = store.messages(session_id="s1")
+        assert [m["sender"] for m in messages] == [
+            "AI Business Analyst", "AI Solution Architect"
+        ]
+        assert messages[0]["topics"] == ["business", "security"]
+        architecture = store.messages(topic="architecture")
+        assert architecture[0]["content"] == "Proposed architecture for the system"
+        assert store.messages(recipient="AI Business Analyst") == []
+        interactions = store.agent_interactions("AI IT Consultant", "s1")
+        assert [m["id"] for m in interactions] == [0, 1]
+
+
+def test_hot_window_bounds_memory_but_not_history(tmp_path: Path) -> None:
+    with SQLiteMessageStore(tmp_path / "messages.sqlite3", batch_size=3) as store:
+        manager, agents = make_manager(store, history_window=2)
+        for i in range(5):
+            manager.broadcast_message(agents[0], f"security update {i}")
+
+        assert [m["id"] for m in manager.messages] == [3, 4]
+        assert len(manager.get_message_history()) == 5
+        assert len(manager.get_agent_interactions("AI IT Consultant")) == 5
+
+
+def test_hot_window_without_store_keeps_index_consistent() -> None:
+    manager, agents = make_manager(history_window=2)
+    for i in range(4):
+        manager.broadcast_message(agents[i % 2], f"security update {i}")
+
+    # The Business Analyst only sent updates 0 and 2, and 0 has been evicted
+    interactions = manager.get_agent_interactions("AI Business Analyst")
+    assert [m["content"] for m in interactions] == ["security update 2"]
+    assert len(manager._agent_message_ids["AI Solution Architect"]) == 2
@@ -0,0 +1,156 @@
+# tests/test_metrics.py
+
+import json
+import urllib.request
+from pathlib import Path
+from typing import List
+
+import pytest
+from agentx.ai_agent import AIAgent
+from agentx.communication_manager import CommunicationManager
+from agentx.metrics import (
+    CallRecord,
+    HistogramSink,
+    InstrumentedProvider,
+    JSONLTraceSink,
+    MetricsRecorder,
+    MetricsSink,
+    PrometheusSink,
+    call_labels,
+    estimate_cost,
+)
+from agentx.pipeline import Pipeline, PipelineStage
+from agentx.providers.cached_provider import CachingProvider
+from agentx.providers.fake_provider import FakeProvider, FakeProviderError
+from agentx.providers.rate_limited_provider import RateLimitedProvider, RateLimiter
+
+MESSAGES = [{"role": "user", "content": "Classify this"}]
+
+
+class ListSink(MetricsSink):
+    def __init__(self) -> None:
+        self.calls: List[CallRecord] = []
+
+    def record(self, call: CallRecord) -> None:
+        self.calls.append(call)
+
+
+def test_records_tokens_cost_labels_and_cache_hits() -> None:
+    sink = ListSink()
+    provider = InstrumentedProvider(
+        CachingProvider(FakeProvider()), MetricsRecorder([sink]), component="classifier"
+    )
+
+    provider.generate_response(MESSAGES, "gpt-4", 0.0)
+    with call_labels(agent="AI Tech Lead", stage="technical_direction"):
+        provider.generate_response(MESSAGES, "gpt-4", 0.0)
+
+    miss, hit = sink.calls
+    assert (miss.agent, miss.stage, miss.cache_hit) == ("classifier", None, False)
+    assert (hit.agent, hit.stage, hit.cache_hit) == (
+        "AI Tech Lead", "technical_direction", True
+    )
+    assert miss.prompt_tokens > 0 and miss.completion_tokens > 0
+    expected = estimate_cost("gpt-4", miss.prompt_tokens, miss.completion_tokens)
+    assert miss.cost == expected > 0
+    assert hit.cost == 0
+
+
+def test_queue_wait_is_separated_from_latency() -> None:
+    sink = ListSink()
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1)
+    provider = InstrumentedProvider(
+        RateLimitedProvider(FakeProvider(latency=0.01), limiter=limiter),
+        MetricsRecorder([sink]),
+    )
+
+    provider.generate_response(MESSAGES, "gpt-4", 0.7)
+    provider.generate_response(MESSAGES, "gpt-4", 0.7)
+
+    assert sink.calls[0].queue_wait == 0
+    assert sink.calls[1].queue_wait == pytest.approx(0.1, abs=0.02)
+    assert sink.calls[1].latency == pytest.approx(0.01, abs=0.02)
+
+
+def test_errors_are_recorded_and_reraised() -> None:
+    sink = ListSink()
+    provider = InstrumentedProvider(
+        FakeProvider(failure_rate=1.0), MetricsRecorder([sink])
+    )
+
+    with pytest.raises(FakeProviderError):
+        provider.generate_response(MESSAGES, "gpt-4", 0.7)
+    assert sink.calls[0].error == "FakeProviderError"
+
+
+def test_pipeline_calls_are_labelled_by_stage_and_agent() -> None:
+    histograms = HistogramSink()
+    recorder = MetricsRecorder([histograms])
+    fake = FakeProvider()
+    agents = [
+        AIAgent(
+            name, "who helps.", ["Help"], "gpt-4", InstrumentedProvider(fake, recorder)
+        )
+        for name in ("AI Business Analyst", "AI IT Consultant")
+    ]
+    manager = CommunicationManager(
+        agents=agents,
+        ai_provider=InstrumentedProvider(fake, recorder, component="classifier"),
+    )
+    Pipeline([
+        PipelineStage("ba", "AI Business Analyst"),
+        PipelineStage("it", "AI IT Consultant", inputs=["ba"]),
+    ]).run(agents, manager, "Improve our security")
+
+    groups = set(histograms.groups)
+    assert {("ba", "AI Business Analyst"), ("it", "AI IT Consultant")} <= groups
+    table = histograms.summary_table()
+    assert "AI Business Analyst" in table and "total" in table
+    calls = sum(stats.calls for stats in histograms.groups.values())
+    assert histograms.total.calls == calls
+
+
+def test_histogram_percentiles() -> None:
+    histograms = HistogramSink()
+    recorder = MetricsRecorder([histograms])
+    provider = InstrumentedProvider(FakeProvider(), recorder)
+    for number in range(100):
+        messages = [{"role": "user", "content": str(number)}]
+        provider.generate_response(messages, "gpt-4", 0.7)
+
+    latency = histograms.total.latency
+    assert latency.count == 100
+    assert 0 <= latency.percentile(50) <= latency.percentile(95) <= latency.max
+
+
+def test_prometheus_file_and_endpoint(tmp_path: Path) -> None:
+    sink = PrometheusSink(tmp_path / "metrics.prom", port=0)
+    try:
+        provider = InstrumentedProvider(FakeProvider(), MetricsRecorder([sink]))
+        with call_labels(agent='AI "Tech" Lead'):
+            provider.generate_response(MESSAGES, "gpt-4", 0.7)
+
+        url = f"http://127.0.0.1:{sink.port}/metrics"
+        body = urllib.request.urlopen(url).read().decode()
+    finally:
+        sink.close()
+
+    labels = 'agent="AI \\"Tech\\" Lead",model="gpt-4"'
+    assert f'agentx_provider_calls_total{{{labels},cache="miss"}} 1' in body
+    assert f'agentx_provider_latency_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+    assert "# TYPE agentx_provider_cost_dollars_total counter" in body
+    assert (tmp_path / "metrics.prom").read_text() == body
+
+
+def test_jsonl_trace(tmp_path: Path) -> None:
+    sink = JSONLTraceSink(tmp_path / "calls.jsonl")
+    with MetricsRecorder([sink]) as recorder:
+        provider = InstrumentedProvider(FakeProvider(), recorder)
+        provider.generate_response(MESSAGES, "gpt-3.5-turbo", 0.7)
+        provider.generate_response(MESSAGES, "gpt-3.5-turbo", 0.7)
+
+    text = (tmp_path / "calls.jsonl").read_text()
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert [line["model"] for line in lines] == ["gpt-3.5-turbo"] * 2
+    expected = {"queue_wait", "latency", "prompt_tokens", "cost", "cache_hit"}
+    assert expected <= set(lines[0])
@@ -0,0 +1,166 @@
+# tests/test_openai_provider.py
+
+import asyncio
+from typing import Any, AsyncIterator, Iterator, List, Optional, cast
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from agentx.providers.openai_provider import AsyncOpenAIProvider, OpenAIProvider
+
+
+@pytest.fixture
+def provider(monkeypatch: pytest.MonkeyPatch) -> Iterator[OpenAIProvider]:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    provider = OpenAIProvider(max_connections=5, max_keepalive_connections=2)
+    yield provider
+    provider.close()
+
+
+def _completion(content: str) -> Mock:
+    response = Mock()
+    response.choices = [Mock()]
+    response.choices[0].message.content = content
+    return response
+
+
+def test_missing_api_key_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        OpenAIProvider()
+
+
+def test_client_is_reused_across_calls(provider: OpenAIProvider) -> None:
+    client = provider.client
+    with patch.object(
+        client.chat.completions, "create", return_value=_completion(" hi ")
+    ) as create:
+        assert provider.generate_response([], "gpt-4", 0.7) == "hi"
+        assert provider.generate_response([], "gpt-4", 0.7) == "hi"
+    assert provider.client is client
+    assert create.call_count == 2
+
+
+def test_close_releases_connection_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    with OpenAIProvider() as provider:
+        http_client = provider._http_client
+        assert not http_client.is_closed
+    assert http_client.is_closed
+
+
+def _chunk(content: Optional[str]) -> Mock:
+    chunk = Mock()
+    chunk.choices = [Mock()] if content is not None else []
+    if content is not None:
+        chunk.choices[0].delta.content = content
+    return chunk
+
+
+def test_stream_response_yields_deltas_and_closes_stream(
+    provider: OpenAIProvider
+) -> None:
+    stream = Mock()
+    chunks = [_chunk("Hel"), _chunk("lo"), _chunk(None)]
+    stream.__iter__ = Mock(return_value=iter(chunks))
+    completions = provider.client.chat.completions
+    with patch.object(completions, "create", return_value=stream) as create:
+        assert list(provider.stream_response([], "gpt-4", 0.7)) == ["Hel", "lo"]
+    assert create.call_args.kwargs["stream"] is True
+    stream.close.assert_called_once()
+
+
+class _AsyncStream:
+    def __init__(self, chunks: List[Mock]) -> None:
+        self.chunks = chunks
+        self.close = AsyncMock()
+
+    async def __aiter__(self) -> AsyncIterator[Mock]:
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.fixture
+def async_clients(monkeypatch: pytest.MonkeyPatch) -> Iterator[List[Mock]]:
+    """Every mocked ``AsyncOpenAI`` client the provider creates, in order."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    clients: List[Mock] = []
+
+    def create_client(**kwargs: Any) -> Mock:
+        client = Mock()
+        client.chat.completions.create = AsyncMock(return_value=_completion(" hi "))
+        client.close = AsyncMock()
+        clients.append(client)
+        return client
+
+    with patch("openai.AsyncOpenAI", side_effect=create_client):
+        yield clients
+
+
+def test_async_generate_response(async_clients: List[Mock]) -> None:
+    provider = AsyncOpenAIProvider()
+
+    async def consult() -> str:
+        async with provider:
+            return await provider.generate_response_async([], "gpt-4", 0.7)
+
+    assert asyncio.run(consult()) == "hi"
+    (client,) = async_clients
+    assert client.chat.completions.create.call_args.kwargs["model"] == "gpt-4"
+
+
+def test_async_stream_response_yields_deltas_and_closes_stream(
+    async_clients: List[Mock]
+) -> None:
+    provider = AsyncOpenAIProvider()
+    stream = _AsyncStream([_chunk("Hel"), _chunk("lo"), _chunk(None)])
+
+    async def consult() -> List[str]:
+        async with provider:
+            client = cast(Mock, provider.client)
+            client.chat.completions.create.return_value = stream
+            deltas = provider.stream_response_async([], "gpt-4", 0.7)
+            return [delta async for delta in deltas]
+
+    assert asyncio.run(consult()) == ["Hel", "lo"]
+    (client,) = async_clients
+    assert client.chat.completions.create.call_args.kwargs["stream"] is True
+    stream.close.assert_awaited_once()
+
+
+def test_async_client_is_created_once_per_event_loop(
+    async_clients: List[Mock]
+) -> None:
+    provider = AsyncOpenAIProvider()
+
+    async def consult() -> None:
+        async with provider:
+            first = provider.client
+            await provider.generate_response_async([], "gpt-4", 0.7)
+            await provider.generate_response_async([], "gpt-4", 0.7)
+            assert provider.client is first
+
+    asyncio.run(consult())
+    asyncio.run(consult())
+    assert len(async_clients) == 2
+    assert [c.chat.completions.create.await_count for c in async_clients] == [2, 2]
+
+
+def test_async_aclose_closes_only_the_running_loops_client(
+    async_clients: List[Mock]
+) -> None:
+    provider = AsyncOpenAIProvider()
+    # A client bound to the provider's private loop, via the sync wrapper
+    provider.generate_response([], "gpt-4", 0.7)
+
+    async def consult() -> None:
+        provider.client
+        await provider.aclose()
+        assert asyncio.get_running_loop() not in provider._clients
+
+    asyncio.run(consult())
+    private, own = async_clients
+    own.close.assert_awaited_once()
+    private.close.assert_not_awaited()
+    provider.close()
+    private.close.assert_awaited_once()
+    assert provider._loop is None
@@ -0,0 +1,103 @@
+# tests/test_pipeline.py
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import pytest
+from unittest.mock import Mock
+from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider
+from agentx.communication_manager import CommunicationManager
+from agentx.pipeline import Pipeline, PipelineError, PipelineStage
+
+
+class SleepyProvider(AIModelProvider):
+    def __init__(self, delay: float = 0.1, fail_for: Optional[str] = None) -> None:
+        self.delay = delay
+        self.fail_for = fail_for
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        time.sleep(self.delay)
+        name = messages[0]["content"].split(",")[0]
+        if name == f"You are {self.fail_for}":
+            raise RuntimeError("model unavailable")
+        return f"{name} says the business budget is fine"
+
+
+def make_agents(provider: AIModelProvider, names: List[str]) -> List[AIAgent]:
+    return [
+        AIAgent(name, "who helps.", ["Help"], "gpt-4", provider) for name in names
+    ]
+
+
+PIPELINE = Pipeline([
+    PipelineStage("ba", "AI Business Analyst"),
+    PipelineStage("it", "AI IT Consultant", inputs=["ba"]),
+    PipelineStage("pm", "AI Project Manager", inputs=["ba"]),
+    PipelineStage("final", "AI Solution Architect", inputs=["it", "pm"]),
+])
+NAMES = [
+    "AI Business Analyst",
+    "AI IT Consultant",
+    "AI Project Manager",
+    "AI Solution Architect",
+]
+
+
+def test_ready_stages_run_in_parallel() -> None:
+    provider = SleepyProvider(delay=0.1)
+    agents = make_agents(provider, NAMES)
+    manager = CommunicationManager(agents=agents, ai_provider=provider)
+
+    result = PIPELINE.run(agents, manager, "client brief")
+
+    assert set(result.stages) == {"ba", "it", "pm", "final"}
+    assert result.stages["it"].started >= result.stages["ba"].finished
+    assert result.stages["final"].started >= max(
+        result.stages["it"].finished, result.stages["pm"].finished
+    )
+    # it and pm overlap, so the run takes three stage latencies, not four
+    assert result.wall_time < 0.39
+    assert result.critical_path[0] == "ba" and result.critical_path[-1] == "final"
+    assert len(result.critical_path) == 3
+    assert agents[0].messages[1] == {"role": "user", "content": "client brief"}
+    assert len(manager.get_message_history()) == 4
+
+
+def test_run_async_matches_sync_schedule() -> None:
+    provider = SleepyProvider(delay=0.05)
+    agents = make_agents(provider, NAMES)
+    manager = CommunicationManager(agents=agents, ai_provider=provider)
+
+    result = asyncio.run(PIPELINE.run_async(agents, manager, "client brief"))
+
+    assert result.critical_path_latency <= result.wall_time + 1e-6
+    assert result.stages["final"].started >= result.stages["pm"].finished
+
+
+def test_failed_stage_stops_dependents() -> None:
+    provider = SleepyProvider(delay=0, fail_for="AI IT Consultant")
+    agents = make_agents(provider, NAMES)
+    manager = CommunicationManager(agents=agents, ai_provider=provider)
+
+    with pytest.raises(PipelineError) as excinfo:
+        PIPELINE.run(agents, manager, "client brief")
+
+    assert excinfo.value.stage == "it"
+    assert "final" not in excinfo.value.completed
+    assert "ba" in excinfo.value.completed
+
+
+def test_invalid_graphs_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        Pipeline([
+            PipelineStage("a", "A", inputs=["b"]),
+            PipelineStage("b", "B", inputs=["a"]),
+        ])
+    with pytest.raises(ValueError):
+        Pipeline.from_config([{"name": "a", "agent": "A", "inputs": ["missing"]}])
+    with pytest.raises(ValueError):
+        PIPELINE.run([], Mock(spec=CommunicationManager), "brief")
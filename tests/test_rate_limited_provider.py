@@ -0,0 +1,93 @@
+# tests/test_rate_limited_provider.py
+
+import asyncio
+import threading
+import time
+from typing import List
+from unittest.mock import Mock
+import pytest
+from agentx.ai_model_provider import AIModelProvider
+from agentx.providers.rate_limited_provider import RateLimiter, RateLimitedProvider
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_requests_per_minute_spaces_out_calls() -> None:
+    inner = Mock(spec=AIModelProvider)
+    inner.generate_response.return_value = "ok"
+    # Burst of 2, then 20 requests per second
+    limiter = RateLimiter(requests_per_minute=1200, burst_seconds=0.1)
+    provider = RateLimitedProvider(inner, limiter=limiter)
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=provider.generate_response, args=(MESSAGES, "gpt-4", 0.7)
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.perf_counter() - start >= 0.09
+    assert inner.generate_response.call_count == 4
+    assert limiter.stats["throttled"] == 2
+    assert limiter.stats["max_queue_depth"] >= 1
+    assert provider.queue_depth == 0
+
+
+def test_rate_limit_errors_back_off_and_retry() -> None:
+    inner = Mock(spec=AIModelProvider)
+    inner.generate_response.side_effect = [RateLimitError("slow down"), "ok"]
+    provider = RateLimitedProvider(inner, requests_per_minute=6000, base_delay=0.01)
+
+    assert provider.generate_response(MESSAGES, "gpt-4", 0.7) == "ok"
+    assert provider.stats["retries"] == 1
+    assert provider.limiter.stats["rate_limited"] == 1
+    # Halved on the 429, then one success's worth of recovery
+    assert provider.limiter.scale == pytest.approx(0.55)
+
+
+def test_gives_up_after_max_retries_and_passes_other_errors() -> None:
+    inner = Mock(spec=AIModelProvider)
+    inner.generate_response.side_effect = RateLimitError("slow down")
+    provider = RateLimitedProvider(inner, max_retries=2, base_delay=0.001)
+
+    with pytest.raises(RateLimitError):
+        provider.generate_response(MESSAGES, "gpt-4", 0.7)
+    assert inner.generate_response.call_count == 3
+    assert provider.stats == {"retries": 2, "failed": 1}
+
+    inner.generate_response.side_effect = ValueError("bad request")
+    with pytest.raises(ValueError):
+        provider.generate_response(MESSAGES, "gpt-4", 0.7)
+    assert provider.stats["retries"] == 2
+
+
+def test_async_calls_share_the_token_budget() -> None:
+    inner = Mock(spec=AIModelProvider)
+    inner.generate_response_async.return_value = "word " * 100
+    provider = RateLimitedProvider(
+        inner, tokens_per_minute=60000, completion_tokens=100,
+        limiter=RateLimiter(tokens_per_minute=60000, burst_seconds=0.1),
+    )
+
+    async def run_all() -> List[str]:
+        return await asyncio.gather(
+            *(
+                provider.generate_response_async(MESSAGES, "gpt-4", 0.7)
+                for _ in range(3)
+            )
+        )
+
+    start = time.perf_counter()
+    assert len(asyncio.run(run_all())) == 3
+    # ~100 tokens per call against a 100-token bucket refilling at 1000/s
+    # (estimates are corrected to the real reply size once it arrives)
+    assert time.perf_counter() - start >= 0.15
@@ -0,0 +1,206 @@
+# tests/test_tracing.py
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union, cast
+
+import pytest
+from agentx.ai_agent import AIAgent
+from agentx.ai_model_provider import AIModelProvider
+from agentx.communication_manager import CommunicationManager, _Mailbox
+from agentx.metrics import (
+    CallRecord, InstrumentedProvider, MetricsRecorder, MetricsSink
+)
+from agentx.pipeline import Pipeline, PipelineStage
+from agentx.providers.fake_provider import FakeProvider
+from agentx.tracing import Span, TracedProvider, Tracer, set_tracer, span, trace_to
+
+PIPELINE = Pipeline([
+    PipelineStage("ba", "AI Business Analyst"),
+    PipelineStage("it", "AI IT Consultant", inputs=["ba"]),
+    PipelineStage("sa", "AI Solution Architect", inputs=["ba"]),
+])
+NAMES = ["AI Business Analyst", "AI IT Consultant", "AI Solution Architect"]
+
+
+class BlockingProvider(AIModelProvider):
+    """Sync-only provider, so async callers go through the default executor."""
+
+    def generate_response(
+        self, messages: List[Dict[str, str]], model: str, temperature: float
+    ) -> str:
+        with span("blocking call"):
+            return FakeProvider().generate_response(messages, model, temperature)
+
+
+@pytest.fixture
+def tracer() -> Iterator[Tracer]:
+    tracer = Tracer()
+    previous = set_tracer(tracer)
+    yield tracer
+    set_tracer(previous)
+
+
+def build(provider: AIModelProvider) -> Tuple[List[AIAgent], CommunicationManager]:
+    agents = [
+        AIAgent(name, "who helps.", ["Help"], "gpt-4", provider) for name in NAMES
+    ]
+    return agents, CommunicationManager(agents=agents, ai_provider=provider)
+
+
+def ancestry(tracer: Tracer, start: Union[str, Span]) -> List[str]:
+    """
+    Names from ``start`` (a span, or the first span with that name) up to
+    its root.
+    """
+    by_id = {s.span_id: s for s in tracer.spans}
+    current: Optional[Span] = (
+        next(s for s in tracer.spans if s.name == start)
+        if isinstance(start, str) else start
+    )
+    chain = []
+    while current is not None:
+        chain.append(current.name)
+        parent_id = current.parent_id
+        current = by_id.get(parent_id) if parent_id is not None else None
+    return chain
+
+
+def test_spans_nest_across_stage_threads(tracer: Tracer) -> None:
+    agents, manager = build(TracedProvider(FakeProvider()))
+    PIPELINE.run(agents, manager, "Improve our security")
+
+    provider_calls = sorted(
+        ancestry(tracer, s)[1:] for s in tracer.spans if s.category == "provider"
+    )
+    assert provider_calls == [
+        ["agent AI Business Analyst", "stage ba", "run"],
+        ["agent AI IT Consultant", "stage it", "run"],
+        ["agent AI Solution Architect", "stage sa", "run"],
+    ]
+    assert ancestry(tracer, "classify") == [
+        "classify", "broadcast AI Business Analyst", "stage ba", "run"
+    ]
+    names = {s.name for s in tracer.spans}
+    assert {"route", "deliver", "receive AI IT Consultant"} <= names
+
+
+def test_spans_propagate_into_tasks_and_executor_threads(tracer: Tracer) -> None:
+    agents, manager = build(BlockingProvider())
+    asyncio.run(PIPELINE.run_async(agents, manager, "Improve our security"))
+
+    # The sync provider ran on the loop's executor, still under its agent span
+    assert ancestry(tracer, "blocking call") == [
+        "blocking call", "agent AI Business Analyst", "stage ba", "run"
+    ]
+    stages = [s for s in tracer.spans if s.name.startswith("stage ")]
+    run = next(s for s in tracer.spans if s.name == "run")
+    assert len(stages) == 3 and all(s.parent_id == run.span_id for s in stages)
+
+
+def test_chrome_trace_puts_overlapping_siblings_on_separate_tracks() -> None:
+    tracer = Tracer()
+
+    async def child(name: str) -> None:
+        with tracer.span(name):
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        with tracer.span("parent"):
+            with tracer.span("first"):
+                pass
+            await asyncio.gather(child("a"), child("b"))
+
+    asyncio.run(main())
+    events = tracer.chrome_trace()["traceEvents"]
+    tracks = {e["name"]: e["tid"] for e in events if e["ph"] == "X"}
+
+    assert tracks["first"] == tracks["parent"]
+    assert tracks["a"] != tracks["b"]
+    assert {tracks["a"], tracks["b"]} & {tracks["parent"]}
+    assert sum(e["ph"] == "M" for e in events) == 2
+
+
+def test_span_is_a_noop_without_a_tracer() -> None:
+    with span("untraced") as current:
+        assert current is None
+
+
+def test_trace_to_writes_even_when_the_run_fails(tmp_path: Path) -> None:
+    path = tmp_path / "trace.json"
+    with pytest.raises(RuntimeError):
+        with trace_to(path):
+            with span("doomed", attempt=1):
+                time.sleep(0.001)
+                raise RuntimeError("boom")
+
+    events = json.loads(path.read_text())["traceEvents"]
+    (event,) = [e for e in events if e["ph"] == "X"]
+    assert event["name"] == "doomed"
+    assert event["args"]["error"] == "RuntimeError"
+    assert event["args"]["attempt"] == 1
+    assert event["dur"] >= 1000
+    with span("after") as current:
+        assert current is None
+
+
+def test_queued_deliveries_keep_their_own_broadcast_as_parent(tracer: Tracer) -> None:
+    release = threading.Event()
+
+    class SlowAgent:
+        name = "AI Tech Lead"
+
+        def receive_message(self, message: Dict[str, str]) -> None:
+            if message["content"] == "first":
+                assert release.wait(5)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        mailbox = _Mailbox(cast(AIAgent, SlowAgent()), executor)
+        with span("broadcast 1"):
+            first = mailbox.put({"content": "first"})
+        # Queued behind the first delivery, so the same drain delivers it
+        with span("broadcast 2"):
+            second = mailbox.put({"content": "second"})
+        release.set()
+        first.result(5)
+        second.result(5)
+
+    receives = [s for s in tracer.spans if s.name == "receive AI Tech Lead"]
+    assert [ancestry(tracer, s) for s in receives] == [
+        ["receive AI Tech Lead", "broadcast 1"],
+        ["receive AI Tech Lead", "broadcast 2"],
+    ]
+
+
+def test_streamed_turns_are_labelled_and_traced(tracer: Tracer) -> None:
+    class ListSink(MetricsSink):
+        def __init__(self) -> None:
+            self.calls: List[CallRecord] = []
+
+        def record(self, call: CallRecord) -> None:
+            self.calls.append(call)
+
+    sink = ListSink()
+    provider = InstrumentedProvider(FakeProvider(), MetricsRecorder([sink]))
+    agent = AIAgent("AI Tech Lead", "who helps.", ["Help"], "gpt-4", provider)
+
+    deltas = []
+    for delta in agent.stream_response("Plan the rollout"):
+        # The agent's span is not current in the consumer between deltas
+        with span("consumer") as current:
+            deltas.append(delta)
+        assert current is not None and current.parent_id is None
+
+    async def consume() -> List[str]:
+        stream = agent.stream_response_async("And the tests?")
+        return [delta async for delta in stream]
+
+    assert asyncio.run(consume())
+    assert deltas and agent.latest_response
+    assert [call.agent for call in sink.calls] == ["AI Tech Lead"] * 2
+    agent_spans = [s for s in tracer.spans if s.name == "agent AI Tech Lead"]
+    assert len(agent_spans) == 2